@@ -0,0 +1,294 @@
+"""Benchmarks of the telofinder hot paths on synthetic genomes.
+
+Each synthetic genome is made of random chromosomes of --chrom_size bp with
+yeast-like terminal telomeres (C1-3A / TG1-3 repeats) at both ends and internal
+telomeric repeats inserted at --telomere_density per Mb. For each genome size,
+the following steps are timed:
+
+- window_metrics: compute_strand_metrics on both strands of every chromosome
+- raw_df: get_raw_df on the window metrics
+- consecutive_groups: get_consecutive_groups on each raw dataframe
+- classify_calls: classify_calls on the groups of each chromosome
+- merge_calls: merge_calls of the telomere calls of each chromosome
+- export_results: export_results of the whole genome, with the raw output
+- run_on_single_fasta: the whole pipeline, once per --threads value
+
+Results are written as JSON so that runs on different commits can be compared:
+
+    python benchmarks/benchmark.py --sizes 1 10 100 --threads 1 4 -o bench.json
+    python benchmarks/benchmark.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import telofinder.telofinder as tf
+from telofinder.fasta import iter_seq_ends
+
+
+def make_repeat(rng, length, right=False):
+    """Yeast telomeric repeat: C1-3A on the left end of the W strand, TG1-3 on the right end"""
+    units = []
+    while sum(len(unit) for unit in units) < length:
+        units.append("C" * rng.integers(1, 4) + "A")
+    repeat = "".join(units)[:length]
+    if right:
+        repeat = repeat[::-1].translate(str.maketrans("ACGT", "TGCA"))
+    return repeat
+
+
+def make_chromosome(rng, size, telomere_density, telomere_len=300, its_len=100):
+    """Random chromosome with terminal telomeres and internal telomeric repeats
+
+    :param size: chromosome size in bp
+    :param telomere_density: number of internal telomeric repeats per Mb
+    :return: the chromosome sequence
+    """
+    seq = np.frombuffer(b"ACGT", dtype=np.uint8)[rng.integers(0, 4, size)].copy()
+    nb_its = rng.poisson(telomere_density * size / 1e6)
+    for pos in rng.integers(telomere_len, size - telomere_len - its_len, nb_its):
+        its = make_repeat(rng, its_len, right=rng.random() < 0.5)
+        seq[pos : pos + its_len] = np.frombuffer(its.encode(), dtype=np.uint8)
+    seq[:telomere_len] = np.frombuffer(make_repeat(rng, telomere_len).encode(), np.uint8)
+    seq[-telomere_len:] = np.frombuffer(
+        make_repeat(rng, telomere_len, right=True).encode(), np.uint8
+    )
+    return seq.tobytes().decode()
+
+
+def write_genome(path, genome_size, chrom_size, telomere_density, seed=0):
+    """Write a synthetic genome of genome_size bp to a fasta file"""
+    rng = np.random.default_rng(seed)
+    with open(path, "w") as fas:
+        for i in range(max(1, genome_size // chrom_size)):
+            seq = make_chromosome(rng, min(chrom_size, genome_size), telomere_density)
+            fas.write(f">chr{i + 1}\n")
+            for start in range(0, len(seq), 60):
+                fas.write(seq[start : start + 60] + "\n")
+
+
+def timeit(func, repeats):
+    """Run func repeats times
+
+    :return: the list of durations in seconds and the last result of func
+    """
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+    return durations, result
+
+
+def bench_genome(fasta_path, args, record):
+    """Time each step of the pipeline on all chromosomes of a genome"""
+    seqs = list(iter_seq_ends(fasta_path, args.nb_scanned_nt))
+
+    durations, metrics = timeit(
+        lambda: [
+            (
+                tf.compute_strand_metrics(tf.encode_sequence(seq.left), strands="W")["W"],
+                tf.compute_strand_metrics(tf.encode_sequence(seq.right), strands="C")["C"],
+            )
+            for seq in seqs
+        ],
+        args.repeats,
+    )
+    record("window_metrics", durations)
+
+    def get_raw_dfs():
+        raw_dfs = []
+        for seq, (metrics_W, metrics_C) in zip(seqs, metrics):
+            nb_windows = len(metrics_W["entropy"])
+            raw_dfs.append(
+                tf.get_raw_df(
+                    "strain",
+                    seq.name,
+                    np.arange(nb_windows),
+                    seq.length - np.arange(nb_windows) - 1,
+                    metrics_W,
+                    {name: values[::-1] for name, values in metrics_C.items()},
+                    0.8,
+                    0.8,
+                )
+            )
+        return raw_dfs
+
+    durations, raw_dfs = timeit(get_raw_dfs, args.repeats)
+    record("raw_df", durations)
+
+    durations, groups = timeit(
+        lambda: [tf.get_consecutive_groups(raw_df) for raw_df in raw_dfs], args.repeats
+    )
+    record("consecutive_groups", durations)
+
+    durations, seq_calls = timeit(
+        lambda: [
+            tf.classify_calls(chrom_groups, seq.length, "strain", seq.name)
+            for seq, chrom_groups in zip(seqs, groups)
+        ],
+        args.repeats,
+    )
+    record("classify_calls", durations)
+
+    durations, _ = timeit(
+        lambda: [
+            tf.merge_calls(calls, seq.length, distance=20)
+            for seq, calls in zip(seqs, seq_calls)
+        ],
+        args.repeats,
+    )
+    record("merge_calls", durations)
+
+    results = tf.run_on_single_fasta(
+        fasta_path, 0.8, 0.8, args.nb_scanned_nt, max(args.threads)
+    )
+    with tempfile.TemporaryDirectory() as outdir:
+        durations, _ = timeit(
+            lambda: tf.export_results(*results, True, outdir, raw_format=args.raw_format),
+            args.repeats,
+        )
+    record("export_results", durations)
+
+    for threads in args.threads:
+        durations, _ = timeit(
+            lambda: tf.run_on_single_fasta(
+                fasta_path, 0.8, 0.8, args.nb_scanned_nt, threads
+            ),
+            args.repeats,
+        )
+        record("run_on_single_fasta", durations, threads=threads)
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args):
+    results = {
+        "commit": get_commit(),
+        "date": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "parameters": {
+            "chrom_size": args.chrom_size,
+            "telomere_density": args.telomere_density,
+            "nb_scanned_nt": args.nb_scanned_nt,
+            "repeats": args.repeats,
+            "raw_format": args.raw_format,
+        },
+        "benchmarks": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in args.sizes:
+            genome_size = int(size * 1e6)
+            fasta_path = Path(tmpdir) / f"genome_{size}Mb.fasta"
+            write_genome(fasta_path, genome_size, args.chrom_size, args.telomere_density)
+
+            def record(name, durations, threads=1):
+                results["benchmarks"].append(
+                    {
+                        "name": name,
+                        "genome_size": genome_size,
+                        "threads": threads,
+                        "min": min(durations),
+                        "median": float(np.median(durations)),
+                        "durations": durations,
+                    }
+                )
+                print(
+                    f"{name:<20} {size:>7g} Mb  threads={threads:<3} {min(durations):.4f} s",
+                    flush=True,
+                )
+
+            bench_genome(fasta_path, args, record)
+
+    with open(args.output, "w") as out:
+        json.dump(results, out, indent=2)
+
+
+def compare(old_path, new_path):
+    """Print the ratio of the new to the old minimum durations of each benchmark"""
+    with open(old_path) as old, open(new_path) as new:
+        old_results, new_results = json.load(old), json.load(new)
+
+    def key(bench):
+        return bench["name"], bench["genome_size"], bench["threads"]
+
+    old_benchs = {key(bench): bench for bench in old_results["benchmarks"]}
+    print(f"{old_results['commit']} -> {new_results['commit']}")
+    for bench in new_results["benchmarks"]:
+        if key(bench) in old_benchs:
+            old_min = old_benchs[key(bench)]["min"]
+            name, genome_size, threads = key(bench)
+            print(
+                f"{name:<20} {genome_size / 1e6:>7g} Mb  threads={threads:<3}"
+                f" {old_min:.4f} s -> {bench['min']:.4f} s  x{bench['min'] / old_min:.2f}"
+            )
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes", nargs="+", type=float, default=[1, 10, 100], help="Genome sizes in Mb"
+    )
+    parser.add_argument(
+        "--threads", nargs="+", type=int, default=[1, 4], help="Numbers of threads"
+    )
+    parser.add_argument(
+        "--chrom_size", type=int, default=1000000, help="Chromosome size in bp"
+    )
+    parser.add_argument(
+        "--telomere_density",
+        type=float,
+        default=5,
+        help="Number of internal telomeric repeats per Mb",
+    )
+    parser.add_argument(
+        "-s",
+        "--nb_scanned_nt",
+        type=int,
+        default=-1,
+        help="Number of nucleotides scanned at each chromosome end, -1 for the whole sequence",
+    )
+    parser.add_argument("--raw_format", default="csv", choices=["csv", "parquet"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="Compare two benchmark result files instead of running the benchmarks",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run_benchmarks(args)
@@ -65,6 +65,7 @@ setup(
     # package_dir = {'telofinder': 'src/python_script'},
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={"parquet": ["pyarrow"]},
     package_data={
         "telofinder.data": ["*.*"],
     },
@@ -2,6 +2,6 @@ __version__ = "1.0.0"
 
 
 from .main import run_telofinder
-from .telofinder import classify_telomere
+from .calls import classify_telomere
 
 
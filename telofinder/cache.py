@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from collections import namedtuple
+from pathlib import Path
+
+
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "telofinder"
+)
+DEFAULT_CACHE_SIZE = 10 * 1024 ** 3
+
+ResultCache = namedtuple(
+    "ResultCache", ["cache_dir", "max_size"], defaults=[DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE]
+)
+ResultCache.__doc__ = """On-disk cache of the results of each fasta file. Entries are
+evicted, least recently used first, when the cache grows above max_size bytes."""
+
+
+def get_file_checksum(fasta_path):
+    """Compute the sha256 checksum of a file
+
+    :param fasta_path: path to the file
+    :return: hexadecimal checksum
+    """
+    checksum = hashlib.sha256()
+    with open(fasta_path, "rb") as fas:
+        for chunk in iter(lambda: fas.read(1024 ** 2), b""):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def get_entry_dir(
+    cache,
+    fasta_path,
+    strain,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    polynucleotide_list,
+    stop_after=None,
+    motif_sets=None,
+    raw=True,
+):
+    """Get the cache entry directory of a fasta file, keyed on its content and on
+    the parameters of the run. The directory holds one file per sequence.
+
+    :param cache: a ResultCache
+    :param fasta_path: path to fasta file
+    :param strain: strain name
+    :param raw: the entry holds the raw dataframes of the sequences, otherwise
+        only their telomere calls
+    :return: path to the entry directory
+    """
+    key = json.dumps(
+        [
+            CACHE_VERSION,
+            get_file_checksum(fasta_path),
+            strain,
+            polynuc_thres,
+            entropy_thres,
+            nb_scanned_nt,
+            list(polynucleotide_list),
+            stop_after,
+            None if motif_sets is None else [list(motif_set) for motif_set in motif_sets],
+            raw,
+        ]
+    )
+    return Path(cache.cache_dir) / hashlib.sha256(key.encode()).hexdigest()
+
+
+def load_seq_result(entry_dir, seq_index):
+    """Load the cached results of a sequence
+
+    :param entry_dir: cache entry directory of the fasta file
+    :param seq_index: index of the sequence in the fasta file
+    :return: the run_on_single_seq results, or None if not cached
+    """
+    try:
+        with open(entry_dir / f"{seq_index}.pkl", "rb") as pkl:
+            result = pickle.load(pkl)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    os.utime(entry_dir)
+    return result
+
+
+def save_seq_result(entry_dir, seq_index, result):
+    """Save the results of a sequence in the cache. The file is written under a
+    temporary name and then renamed so that interrupted runs never leave
+    truncated entries.
+
+    :param entry_dir: cache entry directory of the fasta file
+    :param seq_index: index of the sequence in the fasta file
+    :param result: the run_on_single_seq results
+    """
+    entry_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = entry_dir / f"{seq_index}.pkl.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as pkl:
+        pickle.dump(result, pkl, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, entry_dir / f"{seq_index}.pkl")
+    os.utime(entry_dir)
+
+
+def evict(cache):
+    """Remove the least recently used entries until the cache is smaller than its
+    maximum size
+
+    :param cache: a ResultCache
+    """
+    cache_dir = Path(cache.cache_dir)
+    if not cache_dir.is_dir():
+        return
+
+    entries = []
+    for entry_dir in cache_dir.iterdir():
+        if entry_dir.is_dir():
+            size = sum(path.stat().st_size for path in entry_dir.iterdir())
+            entries.append((entry_dir.stat().st_mtime, size, entry_dir))
+
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, entry_dir in sorted(entries):
+        if total_size <= cache.max_size:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total_size -= size
@@ -0,0 +1,204 @@
+import csv
+import os
+from collections import namedtuple
+from pathlib import Path
+
+
+TelomereCall = namedtuple(
+    "TelomereCall",
+    ["strain", "chrom", "side", "type", "start", "end", "chrom_size", "motif_set"],
+    defaults=[None],
+)
+TelomereCall.__doc__ = """Telomere call of a sequence, with 1-based start and end coordinates
+(both included). A chromosome end without any telomere gets placeholder calls with
+None start and end (see classify_calls). motif_set is the name of the MotifSet of
+the call, None with the default polynucleotides. Calls are plain tuples, they are
+only converted to dataframes at the output (see get_calls_df)."""
+
+CALL_COLUMNS = ["strain", "chrom", "side", "type", "start", "end", "len"]
+MERGED_CALL_COLUMNS = CALL_COLUMNS + ["chrom_size"]
+
+
+def classify_telomere(interval_chrom, chrom_len):
+    """From a list of tuples obtained from get_consecutive_groups, identify if
+    interval corresponds to terminal or interal telomere
+
+    :return: list of dictionaries of start, end, side and type, see classify_calls
+    """
+    return [
+        {"start": call.start, "end": call.end, "side": call.side, "type": call.type}
+        for call in classify_calls(interval_chrom, chrom_len)
+    ]
+
+
+def classify_calls(interval_chrom, chrom_len, strain=None, chrom=None, motif_set=None):
+    """From the runs of telomeric windows of get_consecutive_groups, identify the
+    terminal and internal telomeres of a sequence. A chromosome end without
+    telomere gets a terminal and an internal placeholder call with None start
+    and end.
+
+    :param interval_chrom: dictionary of the runs of each strand
+    :param chrom_len: length of the sequence
+    :param motif_set: name of the motif set of the calls, if any
+    :return: list of TelomereCall
+    """
+    calls = []
+
+    def add_call(side, call_type, start, end):
+        calls.append(
+            TelomereCall(strain, chrom, side, call_type, start, end, chrom_len, motif_set)
+        )
+
+    interval_W = interval_chrom["W"][:]
+    if interval_W == []:
+        add_call("Left", "term", None, None)
+        add_call("Left", "intern", None, None)
+    else:
+        if min(interval_W)[0] == 0:
+            add_call("Left", "term", 0 + 1, min(interval_W)[1] + 1 + 19)
+            interval_W.remove(min(interval_W))
+        for interval in interval_W:
+            add_call("Left", "intern", interval[0] + 1, interval[1] + 1 + 19)
+
+    interval_C = interval_chrom["C"][:]
+    if interval_C == []:
+        add_call("Right", "term", None, None)
+        add_call("Right", "intern", None, None)
+    else:
+        if max(interval_C)[1] == (chrom_len - 1):
+            add_call("Right", "term", max(interval_C)[0] + 1 - 19, max(interval_C)[1] + 1)
+            interval_C.remove(max(interval_C))
+        for interval in interval_C:
+            add_call("Right", "intern", interval[0] + 1 - 19, interval[1] + 1)
+
+    return calls
+
+
+def merge_calls(calls, chrom_len, distance=20):
+    """Merge the overlapping calls of a sequence, or calls closer than distance.
+    The intervals are those of 'bedtools sort' followed by 'bedtools merge -d
+    distance'. Each merged interval gets the side and type of the calls starting
+    at its start, and is terminal if it reaches a chromosome end.
+
+    :param calls: list of TelomereCall of a sequence, see classify_calls
+    :param chrom_len: length of the sequence
+    :param distance: maximum distance between two calls for them to be merged
+    :return: list of the merged TelomereCall, the calls themselves if they are
+        all placeholders
+    """
+    found = [call for call in calls if call.start is not None]
+    if not found:
+        return list(calls)
+
+    intervals = []
+    for call in sorted(found, key=lambda call: call.start):
+        if intervals and call.start - intervals[-1][1] <= distance:
+            intervals[-1][1] = max(intervals[-1][1], call.end)
+        else:
+            intervals.append([call.start, call.end])
+
+    merged = []
+    for start, end in intervals:
+        for call in found:
+            if call.start == start:
+                call_type = call.type
+                if end > chrom_len - 20 or start < 20:
+                    call_type = "term"
+                merged.append(call._replace(type=call_type, end=end))
+    return merged
+
+
+def get_call_columns(calls, merged=False):
+    """Columns of a telomere table, with a motif_set column if the calls have one
+
+    :param calls: list of TelomereCall
+    :param merged: columns of the merged telomere table, with chrom_size
+    :return: list of column names
+    """
+    columns = list(MERGED_CALL_COLUMNS if merged else CALL_COLUMNS)
+    if any(call.motif_set is not None for call in calls):
+        columns.insert(1, "motif_set")
+    return columns
+
+
+def get_call_rows(calls, columns):
+    """Rows of a telomere table, as tuples of the given columns, with a len column
+    computed from the start and end of each call"""
+    rows = []
+    for call in calls:
+        values = call._asdict()
+        values["len"] = None if call.start is None else call.end - call.start + 1
+        rows.append(tuple(values[column] for column in columns))
+    return rows
+
+
+def get_calls_df(calls, merged=False):
+    """Convert telomere calls to a telomere table, with nullable integer start,
+    end, len and chrom_size columns
+
+    :param calls: list of TelomereCall
+    :param merged: build the merged telomere table, with a chrom_size column
+    :return: telomere dataframe
+    """
+    import pandas as pd
+
+    columns = get_call_columns(calls, merged)
+    df = pd.DataFrame.from_records(get_call_rows(calls, columns), columns=columns)
+    for column in ["start", "end", "len", "chrom_size"]:
+        if column in df:
+            df[column] = pd.array(df[column].tolist(), dtype="Int64")
+    return df
+
+
+def get_bed_rows(calls):
+    """Bed intervals of telomere calls, named after the telomere type prefixed by
+    the motif set if any, see get_bed_df"""
+    return [
+        (
+            call.chrom,
+            call.start,
+            call.end,
+            call.type if call.motif_set is None else f"{call.motif_set}_{call.type}",
+        )
+        for call in calls
+        if call.start is not None
+    ]
+
+
+def append_rows(rows, path, columns=None, sep=","):
+    """Append rows to a csv or bed file in the same format as write_table,
+    without building a dataframe. The rows are flushed but not synced to disk,
+    the tables being rewritten at the end of the run. The header is only
+    written to an empty file.
+
+    :param rows: list of tuples, None values being written as empty fields
+    :param path: path of the output file
+    :param columns: header of the file, None for no header
+    :param sep: field separator
+    """
+    path = Path(path)
+    write_header = columns is not None and not (path.exists() and path.stat().st_size)
+    with open(path, "a", newline="") as out:
+        writer = csv.writer(out, delimiter=sep, lineterminator=os.linesep)
+        if write_header:
+            writer.writerow(columns)
+        writer.writerows(rows)
+        out.flush()
+
+
+def append_calls(calls, merged_calls, outdir):
+    """Append the telomere calls of a sequence to the telomere tables and bed
+    files of an output directory, see export_results
+
+    :param calls: list of TelomereCall
+    :param merged_calls: list of merged TelomereCall
+    :param outdir: output directory
+    """
+    outdir = Path(outdir)
+    for table_calls, name, bed_name, merged in [
+        (calls, "telom_df.csv", "telom.bed", False),
+        (merged_calls, "merged_telom_df.csv", "telom_merged.bed", True),
+    ]:
+        columns = get_call_columns(table_calls, merged)
+        append_rows(get_call_rows(table_calls, columns), outdir / name, columns)
+        append_rows(get_bed_rows(table_calls), outdir / bed_name, sep="\t")
@@ -0,0 +1,453 @@
+import gzip
+import io
+import mmap
+import sys
+from collections import deque, namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+
+SeqEnds = namedtuple("SeqEnds", ["name", "length", "left", "right"])
+SeqEnds.__doc__ = """Both ends of a sequence: 'left' holds its first bases and 'right' its
+last bases, both in the forward orientation. 'length' is the full sequence length."""
+
+FaiEntry = namedtuple(
+    "FaiEntry", ["name", "length", "offset", "line_bases", "line_width"]
+)
+FaiEntry.__doc__ = """One record of a samtools faidx (.fai) index"""
+
+FastaSeq = namedtuple(
+    "FastaSeq", ["path", "name", "length", "offset", "line_bases", "line_width"]
+)
+FastaSeq.__doc__ = """Location of a sequence in an indexed fasta file. This is what is sent
+to worker processes instead of the sequence itself."""
+
+BgzfSeq = namedtuple("BgzfSeq", ["path", "name", "length"])
+BgzfSeq.__doc__ = """Sequence of a bgzip compressed fasta file, read with random access
+through its .fai and .gzi indexes. Sent to worker processes like FastaSeq."""
+
+STDIN_PATH = "-"
+COMPRESSED_SUFFIXES = [".gz", ".bgz"]
+CHUNK_SIZE = 10 ** 7  # windows per chunk of the sequences scanned whole in parallel
+
+
+def get_scan_limit(length, nb_scanned_nt):
+    """Number of nucleotides to scan at each end of a sequence
+
+    :param length: sequence length
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :return: the number of nucleotides to scan at each end
+    """
+    if nb_scanned_nt == -1:
+        return length
+    return min(nb_scanned_nt, length)
+
+
+def get_seq_ends(seq_record, nb_scanned_nt):
+    """Get the ends of a Biopython SeqRecord
+
+    :param seq_record: a Biopython SeqRecord
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :return: a SeqEnds
+    """
+    return get_str_seq_ends(seq_record.name, str(seq_record.seq), nb_scanned_nt)
+
+
+def get_str_seq_ends(name, seq, nb_scanned_nt):
+    """Get the ends of a sequence held in a string
+
+    :param name: sequence name
+    :param seq: sequence
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :return: a SeqEnds
+    """
+    limit_seq = get_scan_limit(len(seq), nb_scanned_nt)
+    if limit_seq == len(seq):
+        return SeqEnds(name, len(seq), seq, seq)
+    return SeqEnds(name, len(seq), seq[:limit_seq], seq[len(seq) - limit_seq :])
+
+
+def read_fai(fai_path):
+    """Read a samtools faidx index
+
+    :param fai_path: path to the .fai index
+    :return: a list of FaiEntry
+    """
+    entries = []
+    with open(fai_path) as fai:
+        for line in fai:
+            name, length, offset, line_bases, line_width = line.split("\t")[:5]
+            entries.append(
+                FaiEntry(
+                    name, int(length), int(offset), int(line_bases), int(line_width)
+                )
+            )
+    return entries
+
+
+def build_fai(fasta_path):
+    """Build the samtools faidx index of a fasta file
+
+    :param fasta_path: path to fasta file
+    :return: a list of FaiEntry
+    :raises ValueError: if the lines of a sequence do not all have the same length
+    """
+    entries = []
+    name = None
+
+    def add_entry():
+        if name is not None:
+            entries.append(FaiEntry(name, length, offset, line_bases, line_width))
+
+    with open(fasta_path, "rb") as fas:
+        position = 0
+        for line in fas:
+            if line.startswith(b">"):
+                add_entry()
+                name = (line[1:].decode().split() or [""])[0]
+                offset = position + len(line)
+                length, line_bases, line_width, last_line = 0, 0, 0, False
+            elif name is not None:
+                bases = len(line.rstrip(b"\r\n"))
+                if line_width == 0:
+                    line_bases = bases
+                    line_width = len(line) if line.endswith(b"\n") else bases + 1
+                if (last_line and bases) or bases > line_bases or line_bases == 0:
+                    raise ValueError(
+                        f"Different line length in sequence '{name}' of '{fasta_path}'"
+                    )
+                if bases < line_bases or len(line) != line_width:
+                    last_line = True
+                length += bases
+            position += len(line)
+        add_entry()
+
+    return entries
+
+
+def write_fai(entries, fai_path):
+    """Write a samtools faidx index
+
+    :param entries: a list of FaiEntry
+    :param fai_path: path to the .fai index
+    """
+    with open(fai_path, "w") as fai:
+        for entry in entries:
+            fai.write("\t".join(str(field) for field in entry) + "\n")
+
+
+def load_fai(fasta_path):
+    """Get the index of a fasta file, reusing the .fai file next to it if it
+    is up to date, otherwise building it and saving it when possible.
+
+    :param fasta_path: path to fasta file
+    :return: a list of FaiEntry
+    :raises ValueError: if the fasta file cannot be indexed
+    """
+    fai_path = Path(f"{fasta_path}.fai")
+    if fai_path.exists() and fai_path.stat().st_mtime >= Path(fasta_path).stat().st_mtime:
+        return read_fai(fai_path)
+
+    entries = build_fai(fasta_path)
+    try:
+        write_fai(entries, fai_path)
+    except OSError:
+        pass
+    return entries
+
+
+def get_compression(fasta_path):
+    """Get the compression of a fasta file from its first bytes
+
+    :param fasta_path: path to fasta file
+    :return: 'bgzf' for a bgzip compressed file, 'gzip' for other gzip files,
+        None for uncompressed files
+    """
+    with open(fasta_path, "rb") as fas:
+        header = fas.read(16)
+    return get_header_compression(header)
+
+
+def get_header_compression(header):
+    """Get the compression of a file from its first 16 bytes, see get_compression"""
+    if header[:2] != b"\x1f\x8b":
+        return None
+    # bgzip blocks are gzip members with a 'BC' extra subfield
+    if len(header) >= 14 and header[3] & 4 and header[12:14] == b"BC":
+        return "bgzf"
+    return "gzip"
+
+
+def open_stdin():
+    """Open the standard input as a text fasta stream, decompressing it if it
+    is gzip or bgzip compressed"""
+    stdin = sys.stdin.buffer
+    if get_header_compression(stdin.peek(16)[:16]) is not None:
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=stdin))
+    return io.TextIOWrapper(stdin)
+
+
+def list_bgzf_seqs(fasta_path):
+    """Get the sequences of a bgzip compressed fasta file, building its .fai and
+    .gzi indexes next to it if needed
+
+    :param fasta_path: path to fasta file
+    :return: a list of BgzfSeq
+    :raises OSError: if the file cannot be indexed
+    """
+    import pysam
+
+    with pysam.FastaFile(str(fasta_path)) as fas:
+        return [
+            BgzfSeq(str(fasta_path), name, length)
+            for name, length in zip(fas.references, fas.lengths)
+        ]
+
+
+def list_fasta_seqs(fasta_path):
+    """Get the location of each sequence of a fasta file from its index
+
+    :param fasta_path: path to fasta file
+    :return: a list of FastaSeq
+    :raises ValueError: if the fasta file cannot be indexed
+    """
+    return [FastaSeq(str(fasta_path), *entry) for entry in load_fai(fasta_path)]
+
+
+@lru_cache(maxsize=16)
+def open_mmap(fasta_path, mtime_ns, size):
+    """Memory-map a fasta file. Mappings are cached per process, the file
+    modification time and size are part of the cache key."""
+    with open(fasta_path, "rb") as fas:
+        return mmap.mmap(fas.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+@lru_cache(maxsize=16)
+def open_bgzf(fasta_path, mtime_ns, size):
+    """Open an indexed bgzip compressed fasta file. Handles are cached per
+    process, the file modification time and size are part of the cache key."""
+    import pysam
+
+    return pysam.FastaFile(fasta_path)
+
+
+def read_bgzf_bases(bgzf_seq, start, end):
+    """Read the bases from start (included) to end (excluded) of a sequence of a
+    bgzip compressed fasta file, decompressing only the blocks holding them
+
+    :param bgzf_seq: a BgzfSeq
+    :param start: 0-based start coordinate
+    :param end: 0-based end coordinate (excluded)
+    :return: a uint8 numpy array of the bases as ASCII codes
+    """
+    import numpy as np
+
+    stat = Path(bgzf_seq.path).stat()
+    fas = open_bgzf(bgzf_seq.path, stat.st_mtime_ns, stat.st_size)
+    bases = fas.fetch(reference=bgzf_seq.name, start=start, end=end)
+    return np.frombuffer(bases.encode(), dtype=np.uint8)
+
+
+def read_bases(fasta_seq, start, end):
+    """Read the bases from start (included) to end (excluded) of an indexed
+    sequence straight from the memory-mapped fasta file, skipping line breaks
+
+    :param fasta_seq: a FastaSeq
+    :param start: 0-based start coordinate
+    :param end: 0-based end coordinate (excluded)
+    :return: a uint8 numpy array of the bases as ASCII codes
+    """
+    import numpy as np
+
+    stat = Path(fasta_seq.path).stat()
+    buffer = open_mmap(fasta_seq.path, stat.st_mtime_ns, stat.st_size)
+    line_bases, line_width = fasta_seq.line_bases, fasta_seq.line_width
+
+    def byte_offset(pos):
+        return fasta_seq.offset + (pos // line_bases) * line_width + pos % line_bases
+
+    bases = np.empty(end - start, dtype=np.uint8)
+    pos = start
+    while pos < end:
+        # the first (partial) line, then all full lines at once, then the last line
+        if pos % line_bases or end - pos < line_bases:
+            nb_bases = min(end, (pos // line_bases + 1) * line_bases) - pos
+            lines = np.frombuffer(
+                buffer, dtype=np.uint8, count=nb_bases, offset=byte_offset(pos)
+            )
+        else:
+            nb_lines = (end - pos) // line_bases
+            nb_bases = nb_lines * line_bases
+            lines = np.ndarray(
+                (nb_lines, line_bases),
+                dtype=np.uint8,
+                buffer=buffer,
+                offset=byte_offset(pos),
+                strides=(line_width, 1),
+            )
+        bases[pos - start : pos - start + nb_bases].reshape(lines.shape)[...] = lines
+        pos += nb_bases
+
+    return bases
+
+
+def read_seq_chunk(seq, start, end):
+    """Read the bases from start (included) to end (excluded) of an indexed
+    sequence, plain (FastaSeq) or bgzip compressed (BgzfSeq)
+
+    :param seq: a FastaSeq or a BgzfSeq
+    :param start: 0-based start coordinate
+    :param end: 0-based end coordinate (excluded)
+    :return: a uint8 numpy array of the bases as ASCII codes
+    """
+    if isinstance(seq, BgzfSeq):
+        return read_bgzf_bases(seq, start, end)
+    return read_bases(seq, start, end)
+
+
+def read_seq_ends(fasta_seq, nb_scanned_nt):
+    """Get the ends of an indexed sequence, read from the memory-mapped fasta file
+
+    :param fasta_seq: a FastaSeq or a BgzfSeq
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :return: a SeqEnds holding uint8 arrays of ASCII codes
+    """
+    limit_seq = get_scan_limit(fasta_seq.length, nb_scanned_nt)
+    left = read_seq_chunk(fasta_seq, 0, limit_seq)
+    if limit_seq == fasta_seq.length:
+        right = left
+    else:
+        right = read_seq_chunk(
+            fasta_seq, fasta_seq.length - limit_seq, fasta_seq.length
+        )
+    return SeqEnds(fasta_seq.name, fasta_seq.length, left, right)
+
+
+def parse_seq_ends(handle, nb_scanned_nt):
+    """Parse a fasta file keeping only the ends of each sequence in memory
+
+    :param handle: fasta file opened in text mode
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :return: a generator of SeqEnds
+    """
+    name = None
+
+    for line in handle:
+        if line.startswith(">"):
+            if name is not None:
+                yield get_parsed_seq_ends(name, length, head, tail, nb_scanned_nt)
+            name = (line[1:].split() or [""])[0]
+            length, head, head_len, tail, tail_len = 0, [], 0, deque(), 0
+            continue
+
+        if name is None:
+            continue
+        line = line.rstrip().replace(" ", "").replace("\r", "")
+        length += len(line)
+
+        if nb_scanned_nt == -1:
+            head.append(line)
+            continue
+
+        if head_len < nb_scanned_nt:
+            head.append(line)
+            head_len += len(line)
+        tail.append(line)
+        tail_len += len(line)
+        while len(tail) > 1 and tail_len - len(tail[0]) >= nb_scanned_nt:
+            tail_len -= len(tail.popleft())
+
+    if name is not None:
+        yield get_parsed_seq_ends(name, length, head, tail, nb_scanned_nt)
+
+
+def get_parsed_seq_ends(name, length, head, tail, nb_scanned_nt):
+    """Build a SeqEnds from the lines kept by parse_seq_ends"""
+    limit_seq = get_scan_limit(length, nb_scanned_nt)
+    left = "".join(head)[:limit_seq]
+    if limit_seq == length:
+        return SeqEnds(name, length, left, left)
+    return SeqEnds(name, length, left, "".join(tail)[-limit_seq:])
+
+
+def iter_seq_ends(fasta_path, nb_scanned_nt):
+    """Get the ends of each sequence of a fasta file, without loading whole
+    sequences in memory unless the whole sequence is scanned. Indexes the
+    fasta file if needed and reads from the memory-mapped file, or parses
+    the file if it cannot be indexed.
+
+    :param fasta_path: path to fasta file
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :return: a generator of SeqEnds
+    """
+    for seq in iter_fasta(fasta_path, nb_scanned_nt):
+        if isinstance(seq, (FastaSeq, BgzfSeq)):
+            seq = read_seq_ends(seq, nb_scanned_nt)
+        yield seq
+
+
+def get_indexed_seqs(fasta_path):
+    """Get the sequences of a fasta file from its index, building the index if
+    needed: a FastaSeq for each sequence of a plain fasta file, a BgzfSeq for
+    each sequence of a bgzip compressed file
+
+    :param fasta_path: path to fasta file, or '-' for the standard input
+    :return: a list of FastaSeq or BgzfSeq, None if the file cannot be indexed
+        and must be parsed as a stream (see parse_fasta)
+    """
+    if str(fasta_path) == STDIN_PATH:
+        return None
+
+    compression = get_compression(fasta_path)
+    if compression is None:
+        try:
+            return list_fasta_seqs(fasta_path)
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    if compression == "bgzf":
+        try:
+            return list_bgzf_seqs(fasta_path)
+        except (OSError, ValueError):
+            # e.g. irregular line lengths or a read-only directory for the indexes
+            return None
+    return None
+
+
+def parse_fasta(fasta_path, nb_scanned_nt):
+    """Parse the SeqEnds of a fasta file as a stream, one sequence at a time.
+    Gzip compressed files and the standard input (fasta_path '-'), compressed or
+    not, are decompressed on the fly, without decompressing them to disk.
+
+    :param fasta_path: path to fasta file, or '-' for the standard input
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :return: a generator of SeqEnds
+    """
+    if str(fasta_path) == STDIN_PATH:
+        yield from parse_seq_ends(open_stdin(), nb_scanned_nt)
+        return
+
+    if get_compression(fasta_path) is None:
+        with open(fasta_path) as handle:
+            yield from parse_seq_ends(handle, nb_scanned_nt)
+        return
+
+    with gzip.open(fasta_path, "rt") as handle:
+        yield from parse_seq_ends(handle, nb_scanned_nt)
+
+
+def iter_fasta(fasta_path, nb_scanned_nt):
+    """Get the sequences of a fasta file to send to worker processes: a FastaSeq
+    for each sequence if the file can be indexed, a BgzfSeq for each sequence of
+    a bgzip compressed file that can be indexed, otherwise the SeqEnds parsed
+    from the file (see parse_fasta).
+
+    :param fasta_path: path to fasta file, or '-' for the standard input
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :return: a generator of FastaSeq, BgzfSeq or SeqEnds
+    """
+    fasta_seqs = get_indexed_seqs(fasta_path)
+    if fasta_seqs is None:
+        yield from parse_fasta(fasta_path, nb_scanned_nt)
+    else:
+        yield from fasta_seqs
@@ -1,9 +1,15 @@
 import argparse
+import logging
 import os
+import sys
 from pathlib import Path
 
-from telofinder.telofinder import (run_on_single_seq, run_on_fasta_dir, 
-    run_on_single_fasta, export_results)
+from telofinder.cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE, ResultCache
+from telofinder.fasta import CHUNK_SIZE, STDIN_PATH
+from telofinder.motifs import MOTIF_SETS, parse_motif_set
+from telofinder.profiling import (collect_stages, get_report_stages, new_report,
+    stage, write_report)
+from telofinder.progress import LOG_FORMATS, log_event, setup_logging
 
 
 def output_dir_exists(force):
@@ -15,29 +21,85 @@ def output_dir_exists(force):
     dir_exists = os.path.isdir("telofinder_results")
     if dir_exists:
         if force:
-            print("Replacing the existing 'telofinder_results' directory.")
+            log_event(
+                "output_dir", "Replacing the existing 'telofinder_results' directory."
+            )
         else:
-            sys.exit(
-                print(
-                    "\n",
-                    "Warning!!! A directory called 'telofinder_results' already exists.",
-                    "\n",
-                    "delete this directory before running the script or use the option --force",
-                    "\n",
-                )
+            log_event(
+                "output_dir",
+                "Warning!!! A directory called 'telofinder_results' already exists, "
+                "delete this directory before running the script or use the option --force",
+                logging.ERROR,
             )
+            sys.exit(1)
+
+
+# options of a normal run that a threshold sweep does not support, with their dest
+SWEEP_UNSUPPORTED_OPTIONS = [
+    ("--raw", "raw"),
+    ("--raw_format", "raw_format"),
+    ("--cache_dir", "cache_dir"),
+    ("--cache_size", "cache_size"),
+    ("--chunk_size", "chunk_size"),
+    ("--track_store", "track_store"),
+    ("--profile", "profile"),
+    ("--cprofile", "cprofile"),
+]
+
+
+def parse_chunk_size(text):
+    """Parse the --chunk_size option, a number of windows or 0 not to split sequences
+
+    :param text: value given on the command line
+    :return: the chunk size, None not to split sequences
+    """
+    chunk_size = int(text)
+    if chunk_size < 0:
+        raise argparse.ArgumentTypeError(
+            f"invalid chunk size {chunk_size}, expected a number of windows or 0"
+        )
+    return chunk_size or None
+
+
+def parse_stop_after(text):
+    """Parse the --stop_after option, a number of windows of at least 0
+
+    :param text: value given on the command line
+    :return: the number of windows
+    """
+    stop_after = int(text)
+    if stop_after < 0:
+        raise argparse.ArgumentTypeError(
+            f"invalid number of windows {stop_after}, expected 0 or more"
+        )
+    return stop_after
 
 
 def parse_arguments():
     """Function to parse and reuse the arguments of the command line
 
-    :param fasta_path: path to a single fasta file or to a directory containing multiple fasta files
+    :param fasta_path: path to a single fasta file or to a directory containing multiple fasta files,
+        possibly gzip or bgzip compressed, or '-' to read the standard input
     :param force: force optional, overwrites the output directory otherwise exits program, optional
     :param entropy_threshold: optional, default = 0.8 
     :param polynuc_threshold: optional, default = 0.8
     :param nb_scanned_nt: number of scanned nucleotides at each chromosome end, optional, default = 20 000
-    :param threads: Number of threads to use. Multithreaded calculations currently occurs at the level of sequences within a fasta file."
+    :param threads: Number of threads to use. Multithreaded calculations occur at the level of sequences, across all fasta files."
     :param raw: Outputs raw_df.csv containing the values of all sliding windows
+    :param raw_format: format of the raw output, csv or parquet
+    :param no_cache: do not use the result cache
+    :param cache_dir: directory of the result cache
+    :param cache_size: maximum size of the result cache in megabytes
+    :param stop_after: stop scanning each chromosome end after this number of non telomeric windows
+    :param chunk_size: number of windows of the chunks of long sequences scanned whole in parallel
+    :param motif_set: telomeric motif set to scan instead of the default polynucleotides, repeatable
+    :param sweep_polynuc_thresholds: polynucleotide thresholds of a threshold sweep
+    :param sweep_entropy_thresholds: entropy thresholds of a threshold sweep
+    :param track_store: directory of a track store to write the window metrics to
+    :param profile: write a run report of the time and memory used by each stage
+    :param cprofile: directory to write cProfile statistics to
+    :param quiet: only log warnings and errors
+    :param log_format: format of the log, text or json
     :return: parser arguments
     """
     parser = argparse.ArgumentParser(
@@ -48,7 +110,10 @@ def parse_arguments():
     )
     parser.add_argument(
         "fasta_path",
-        help="Path to a single (multi)fasta file or to a directory containing multiple fasta files.",
+        help="Path to a single (multi)fasta file or to a directory containing multiple fasta files.\
+    Fasta files can be gzip or bgzip compressed (.gz, .bgz), bgzip files being read\
+    with random access to the chromosome ends. Use '-' to read a fasta file,\
+    compressed or not, from the standard input.",
     )
     parser.add_argument(
         "-f",
@@ -83,8 +148,9 @@ def parse_arguments():
         "--threads",
         default=1,
         type=int,
-        help="Number of threads to use. Multithreaded calculations currently occurs\
-    at the level of sequences within a fasta file.",
+        help="Number of threads to use. Multithreaded calculations occur at the level\
+    of sequences, the sequences of all fasta files being processed by a single pool\
+    of processes, largest first.",
     )
     parser.add_argument(
         "-r",
@@ -92,39 +158,303 @@ def parse_arguments():
         action="store_true",
         help="Outputs the raw dataframe (raw_df.csv) containing the values of all sliding windows.",
     )
+    parser.add_argument(
+        "--raw_format",
+        default="csv",
+        choices=["csv", "parquet"],
+        help="Format of the raw output: 'csv' (raw_df.csv) or 'parquet' (raw_df.parquet,\
+    compressed, with one row group per chromosome, requires pyarrow). default=csv",
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Do not use the result cache: recompute and do not save the results of\
+    every fasta file.",
+    )
+    parser.add_argument(
+        "--cache_dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory of the result cache. Results are cached per fasta file content and\
+    parameters, so that unchanged files are not recomputed and interrupted runs are\
+    resumed. default={DEFAULT_CACHE_DIR}",
+    )
+    parser.add_argument(
+        "--cache_size",
+        default=DEFAULT_CACHE_SIZE // 1024 ** 2,
+        type=int,
+        help=f"Maximum size of the result cache in megabytes, the least recently used\
+    results being removed first. default={DEFAULT_CACHE_SIZE // 1024 ** 2}",
+    )
+
+    parser.add_argument(
+        "--stop_after",
+        default=None,
+        type=parse_stop_after,
+        help="Adaptive scanning for terminal telomeres: stop scanning each chromosome\
+    end after this number of consecutive non telomeric windows past the last\
+    telomeric window, within the limit of --nb_scanned_nt. Values of at least 40\
+    give the same merged terminal telomeres as a full scan. Smaller values stop at\
+    shorter gaps between telomeric windows and can shorten the terminal telomeres,\
+    e.g. 1-275 instead of 1-364 with 0 for the left end of S288C chromosome III.\
+    default: scan all --nb_scanned_nt nucleotides",
+    )
+
+    parser.add_argument(
+        "--chunk_size",
+        default=CHUNK_SIZE,
+        type=parse_chunk_size,
+        help=f"With -s -1, sequences with more windows than this are split into chunks\
+    scored in parallel by the --threads processes, and stitched back before the\
+    telomeres are called. 0 not to split sequences. default={CHUNK_SIZE}",
+    )
+
+    parser.add_argument(
+        "--motif_set",
+        dest="motif_sets",
+        action="append",
+        type=parse_motif_set,
+        metavar="MOTIF_SET",
+        help=f"Telomeric motif set, scanned instead of the default polynucleotides, each\
+    set with its own thresholds and output columns. Can be given several times to\
+    scan several sets in one pass. Either one of {', '.join(MOTIF_SETS)} or\
+    name=MOTIF,MOTIF,...[:polynuc_threshold[:entropy_threshold]], with motifs of\
+    the same length written as the C-rich strand, e.g. 'ciliate=CCCCAA,CCCAAC,CCAACC,\
+    CAACCC,AACCCC,ACCCCA:0.8:1.1'. The -n and -e thresholds are then unused",
+    )
+    parser.add_argument(
+        "--sweep_polynuc_thresholds",
+        nargs="+",
+        type=float,
+        metavar="THRESHOLD",
+        help="Threshold sweep: call telomeres with each of these poly-nucleotide\
+    thresholds, combined with each of the --sweep_entropy_thresholds (or with -e).\
+    The window metrics are computed once per sequence, and sweep_summary.csv and\
+    sweep_merged_telom_df.csv are written instead of the usual outputs. With\
+    --motif_set, each pair replaces the thresholds of every set. Sweeps are not\
+    cached and do not support --raw, --raw_format, --cache_dir, --cache_size,\
+    --chunk_size, --track_store, --profile and --cprofile",
+    )
+    parser.add_argument(
+        "--sweep_entropy_thresholds",
+        nargs="+",
+        type=float,
+        metavar="THRESHOLD",
+        help="Threshold sweep: call telomeres with each of these entropy thresholds,\
+    combined with each of the --sweep_polynuc_thresholds (or with -n)",
+    )
+    parser.add_argument(
+        "--track_store",
+        default=None,
+        help="Directory of a track store to write the entropy and poly-nucleotide\
+    values of all windows to, one chunked array per strain, chromosome and strand.\
+    Telomeres can then be called again, regions loaded and plotted from the store\
+    (see telofinder.tracks) without scanning the fasta files. default: not written",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a run report (telofinder_results/run_report.json) of the wall time,\
+    CPU time and peak memory (RSS) of each stage (parsing, window_scoring, raw_df,\
+    grouping, classification, merge, export), per sequence, per fasta file and for\
+    the whole run.",
+    )
+    parser.add_argument(
+        "--cprofile",
+        default=None,
+        metavar="DIR",
+        help="Run the main process and each sequence under cProfile and write the\
+    statistics to DIR (main.prof and <strain>.<chromosome>.prof, to be read with\
+    pstats or snakeviz). Implies --profile",
+    )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="Only log warnings and errors, not the progress of the run.",
+    )
+    parser.add_argument(
+        "--log_format",
+        default="text",
+        choices=LOG_FORMATS,
+        help="Format of the log written to stderr: 'text' or 'json' (one JSON object\
+    per line, with the event name and data such as the numbers of finished and\
+    total sequences, bases per second and ETA). default=text",
+    )
+
+    args = parser.parse_args()
+    if args.sweep_polynuc_thresholds or args.sweep_entropy_thresholds:
+        unsupported = [
+            option
+            for option, dest in SWEEP_UNSUPPORTED_OPTIONS
+            if getattr(args, dest) != parser.get_default(dest)
+        ]
+        if unsupported:
+            parser.error(
+                f"{', '.join(unsupported)} cannot be used with a threshold sweep"
+            )
+    return args
 
-    return parser.parse_args()
 
 
+def run_telofinder(
+    fasta_path,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    threads,
+    raw,
+    stream=False,
+    cache=None,
+    raw_format="csv",
+    stop_after=None,
+    motif_sets=None,
+    track_store=None,
+    profile=None,
+    chunk_size=CHUNK_SIZE,
+):
+    """Run telofinder on a single fasta file or on a fasta directory
 
-def run_telofinder(fasta_path, polynuc_thres, entropy_thres, nb_scanned_nt, threads, raw):
-    """Run telofinder on a single fasta file or on a fasta directory"""
-    fasta_path = Path(fasta_path)
+    With stream=True, the results of each sequence are appended to the output
+    files as soon as they are computed and the raw dataframe is not kept in
+    memory (None is returned in its place). With a cache (a ResultCache), the
+    results of unchanged fasta files are loaded from the cache. raw_format is
+    the format of the raw output, 'csv' or 'parquet'. With stop_after, each
+    chromosome end is only scanned up to stop_after non telomeric windows past
+    its last telomeric window. motif_sets is a list of MotifSet to scan instead
+    of the default polynucleotides. With a track_store directory, the window
+    metrics are also written to a track store (see telofinder.tracks). profile is
+    a run report to collect the time and memory used by each stage into (see
+    telofinder.profiling.new_report). With nb_scanned_nt=-1, the sequences with
+    more than chunk_size windows are scored in chunks in parallel, None not to
+    split them.
+    fasta_path can be '-' to read a fasta file from the standard input, the
+    results are then not cached.
+    """
+    # imported here so that the command line and the package start without pandas
+    from telofinder.telofinder import (
+        export_results,
+        get_fasta_paths,
+        run_and_export,
+        run_on_fasta_dir,
+        run_on_single_fasta,
+    )
+
+    if str(fasta_path) == STDIN_PATH:
+        fasta_path, cache = STDIN_PATH, None
+    else:
+        fasta_path = Path(fasta_path)
 
-    if fasta_path.is_dir():
-        print(
-            f"Running in iterative mode on all '*.fasta', '*.fas', '*.fa', '*.fsa' files in '{fasta_path}'"
+    if fasta_path != STDIN_PATH and fasta_path.is_dir():
+        log_event(
+            "start",
+            f"Running in iterative mode on all '*.fasta', '*.fas', '*.fa', '*.fsa' files,"
+            f" possibly compressed (.gz, .bgz), in '{fasta_path}'",
+            fasta_path=str(fasta_path),
         )
+        if stream:
+            telom_df, merged_telom_df = run_and_export(
+                get_fasta_paths(fasta_path),
+                polynuc_thres,
+                entropy_thres,
+                nb_scanned_nt,
+                threads,
+                raw,
+                cache=cache,
+                raw_format=raw_format,
+                stop_after=stop_after,
+                motif_sets=motif_sets,
+                track_store=track_store,
+                profile=profile,
+                chunk_size=chunk_size,
+            )
+            return None, telom_df, merged_telom_df
+
         raw_df, telom_df, merged_telom_df = run_on_fasta_dir(
-            fasta_path, polynuc_thres, entropy_thres, nb_scanned_nt, threads
+            fasta_path,
+            polynuc_thres,
+            entropy_thres,
+            nb_scanned_nt,
+            threads,
+            cache,
+            stop_after,
+            motif_sets,
+            track_store,
+            profile,
+            chunk_size,
         )
-        export_results(raw_df, telom_df, merged_telom_df, raw)
+        with collect_stages(get_report_stages(profile)), stage("export"):
+            export_results(
+                raw_df, telom_df, merged_telom_df, raw, raw_format=raw_format
+            )
         return raw_df, telom_df, merged_telom_df
 
-    elif fasta_path.is_file():
-        print(f"Running in single fasta mode on '{fasta_path}'")
+    elif fasta_path == STDIN_PATH or fasta_path.is_file():
+        log_event(
+            "start",
+            f"Running in single fasta mode on '{fasta_path}'",
+            fasta_path=str(fasta_path),
+        )
+        if stream:
+            telom_df, merged_telom_df = run_and_export(
+                [fasta_path],
+                polynuc_thres,
+                entropy_thres,
+                nb_scanned_nt,
+                threads,
+                raw,
+                cache=cache,
+                raw_format=raw_format,
+                stop_after=stop_after,
+                motif_sets=motif_sets,
+                track_store=track_store,
+                profile=profile,
+                chunk_size=chunk_size,
+            )
+            return None, telom_df, merged_telom_df
 
         raw_df, telom_df, merged_telom_df = run_on_single_fasta(
-            fasta_path, polynuc_thres, entropy_thres, nb_scanned_nt, threads
+            fasta_path,
+            polynuc_thres,
+            entropy_thres,
+            nb_scanned_nt,
+            threads,
+            cache,
+            stop_after,
+            motif_sets,
+            track_store,
+            profile,
+            chunk_size,
         )
-        export_results(raw_df, telom_df, merged_telom_df, raw)
+        with collect_stages(get_report_stages(profile)), stage("export"):
+            export_results(
+                raw_df, telom_df, merged_telom_df, raw, raw_format=raw_format
+            )
         return raw_df, telom_df, merged_telom_df
     else:
         raise IOError(f"'{fasta_path}' is not a directory or a file.")
 
 def main():
     args = parse_arguments()
+    setup_logging(args.log_format, args.quiet)
     output_dir_exists(args.force)
+    if args.sweep_polynuc_thresholds or args.sweep_entropy_thresholds:
+        from telofinder.telofinder import get_fasta_paths, sweep_thresholds
+
+        fasta_path = Path(args.fasta_path)
+        sweep_thresholds(
+            get_fasta_paths(fasta_path) if fasta_path.is_dir() else [fasta_path],
+            args.sweep_polynuc_thresholds or [args.polynuc_threshold],
+            args.sweep_entropy_thresholds or [args.entropy_threshold],
+            args.nb_scanned_nt,
+            args.threads,
+            outdir="telofinder_results",
+            stop_after=args.stop_after,
+            motif_sets=args.motif_sets,
+        )
+        return
+    profile = None
+    if args.profile or args.cprofile:
+        profile = new_report(args.cprofile)
     run_telofinder(
         args.fasta_path,
         args.polynuc_threshold,
@@ -132,7 +462,19 @@ def main():
         args.nb_scanned_nt,
         args.threads,
         args.raw,
+        stream=True,
+        cache=None
+        if args.no_cache
+        else ResultCache(Path(args.cache_dir), args.cache_size * 1024 ** 2),
+        raw_format=args.raw_format,
+        stop_after=args.stop_after,
+        motif_sets=args.motif_sets,
+        track_store=args.track_store,
+        profile=profile,
+        chunk_size=args.chunk_size,
     )
+    if profile is not None:
+        write_report(profile, Path("telofinder_results") / "run_report.json")
 
 # Main program
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+from collections import namedtuple
+
+
+MotifSet = namedtuple(
+    "MotifSet",
+    ["name", "motifs", "polynuc_thres", "entropy_thres"],
+    defaults=[0.8, 0.8],
+)
+MotifSet.__doc__ = """Named set of telomeric motifs of the same length, written as the
+C-rich strand read from the chromosome end, with the thresholds of its telomere
+prediction. A window is telomeric when the fraction of its k-mers found in motifs
+is above polynuc_thres and its entropy is below entropy_thres."""
+
+MAX_MOTIF_LENGTH = 27  # k-mer codes are stored as int64 base 5 numbers
+
+
+def get_reverse_complement(motif):
+    """Reverse complement of a motif made of A, C, G and T
+
+    :param motif: motif
+    :return: reverse complement motif
+    """
+    return motif[::-1].translate(str.maketrans("ACGT", "TGCA"))
+
+
+def get_rotations(motif):
+    """All the rotations of a repeat unit, so that every k-mer of a perfect repeat
+    is a motif whatever its phase
+
+    :param motif: repeat unit
+    :return: list of the rotations of the repeat unit
+    """
+    return [motif[i:] + motif[:i] for i in range(len(motif))]
+
+
+MOTIF_SETS = {
+    # TG1-3 repeats of Saccharomyces cerevisiae (C1-3A on the C-rich strand)
+    "yeast": MotifSet("yeast", ["AC", "CA", "CC"], 0.8, 0.8),
+    # TTAGGG repeats of vertebrates (CCCTAA on the C-rich strand)
+    "vertebrate": MotifSet("vertebrate", get_rotations("CCCTAA"), 0.8, 1.1),
+    # TTTAGGG repeats of Arabidopsis thaliana (CCCTAAA on the C-rich strand)
+    "arabidopsis": MotifSet("arabidopsis", get_rotations("CCCTAAA"), 0.8, 1.1),
+    # TTTTAGGG repeats of Chlamydomonas reinhardtii (CCCTAAAA on the C-rich strand)
+    "chlamydomonas": MotifSet("chlamydomonas", get_rotations("CCCTAAAA"), 0.8, 1.1),
+}
+
+
+def get_motif_length(motif_set):
+    """Check the motifs of a motif set and get their length
+
+    :param motif_set: a MotifSet
+    :return: the length of the motifs
+    """
+    lengths = {len(motif) for motif in motif_set.motifs}
+    if len(lengths) != 1:
+        raise ValueError(
+            f"The motifs of '{motif_set.name}' must be of the same, non-zero length"
+        )
+    for motif in motif_set.motifs:
+        if not motif or set(motif.upper()) - set("ACGT"):
+            raise ValueError(
+                f"Invalid motif '{motif}' in '{motif_set.name}', only A, C, G and T are allowed"
+            )
+    length = lengths.pop()
+    if length > MAX_MOTIF_LENGTH:
+        raise ValueError(
+            f"The motifs of '{motif_set.name}' are longer than {MAX_MOTIF_LENGTH} nt"
+        )
+    return length
+
+
+def parse_motif_set(text):
+    """Parse a motif set given on the command line, either the name of one of
+    MOTIF_SETS or 'name=MOTIF,MOTIF,...[:polynuc_thres[:entropy_thres]]'
+
+    :param text: motif set definition
+    :return: a MotifSet
+    """
+    if text in MOTIF_SETS:
+        return MOTIF_SETS[text]
+    name, sep, definition = text.partition("=")
+    if not sep or not name:
+        raise ValueError(
+            f"Unknown motif set '{text}', expected one of {', '.join(MOTIF_SETS)}"
+            " or name=MOTIF,MOTIF,...[:polynuc_thres[:entropy_thres]]"
+        )
+    motifs, *thresholds = definition.split(":")
+    if len(thresholds) > 2:
+        raise ValueError(f"Too many thresholds in motif set '{text}'")
+    motif_set = MotifSet(
+        name,
+        [motif.upper() for motif in motifs.split(",")],
+        *[float(threshold) for threshold in thresholds],
+    )
+    get_motif_length(motif_set)
+    return motif_set
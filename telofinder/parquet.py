@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+
+RAW_COLUMNS = ["strain", "chrom", "pos", "strand"]
+METRIC_COLUMNS = ["entropy", "polynuc", "predict_telom"]
+
+
+def import_pyarrow():
+    """Import pyarrow, which is only needed for the parquet raw output"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "The parquet raw output requires pyarrow: pip install telofinder[parquet]"
+        )
+    return pyarrow
+
+
+def get_raw_schema(metric_columns=METRIC_COLUMNS):
+    """Arrow schema of the raw parquet output
+
+    :param metric_columns: names of the metric columns of the raw dataframe
+    """
+    pa = import_pyarrow()
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("strain", category),
+            ("chrom", category),
+            ("pos", pa.int32()),
+            ("strand", category),
+        ]
+        + [(name, pa.float32()) for name in metric_columns]
+    )
+
+
+def get_raw_table(raw_df):
+    """Convert a raw dataframe to an arrow table with strain, chrom, pos and strand
+    columns instead of the index
+
+    :param raw_df: raw dataframe indexed by (strain, chrom, position, strand)
+    :return: a pyarrow Table
+    """
+    pa = import_pyarrow()
+    index = raw_df.index.remove_unused_levels()
+    columns = {}
+    for i, name in enumerate(RAW_COLUMNS):
+        if name == "pos":
+            columns[name] = index.get_level_values(i).to_numpy(dtype=np.int32)
+        else:
+            # dictionary encoded from the index codes, without building the strings
+            columns[name] = pa.DictionaryArray.from_arrays(
+                pa.array(index.codes[i].astype(np.int32)),
+                pa.array(index.levels[i].astype(str), pa.string()),
+            )
+    for name in raw_df.columns:
+        columns[name] = raw_df[name].to_numpy(dtype=np.float32)
+    return pa.table(columns, schema=get_raw_schema(list(raw_df.columns)))
+
+
+def open_raw_writer(path, metric_columns=METRIC_COLUMNS, compression="zstd"):
+    """Open a parquet file for writing raw dataframes with write_raw_row_group.
+    The file is only valid once the writer is closed.
+
+    :param path: path to the parquet file
+    :param metric_columns: names of the metric columns of the raw dataframes
+    :param compression: parquet compression codec, default = zstd
+    :return: a pyarrow ParquetWriter
+    """
+    pa = import_pyarrow()
+    return pa.parquet.ParquetWriter(
+        path, get_raw_schema(metric_columns), compression=compression
+    )
+
+
+def write_raw_row_group(writer, raw_df):
+    """Write a raw dataframe, usually a single chromosome, as one row group
+
+    :param writer: a ParquetWriter from open_raw_writer
+    :param raw_df: raw dataframe
+    """
+    table = get_raw_table(raw_df)
+    writer.write_table(table, row_group_size=max(len(table), 1))
+
+
+def write_raw_parquet(raw_df, path, compression="zstd"):
+    """Write a raw dataframe to a parquet file with one row group per chromosome
+
+    :param raw_df: raw dataframe
+    :param path: path to the parquet file
+    :param compression: parquet compression codec, default = zstd
+    """
+    with open_raw_writer(path, list(raw_df.columns), compression) as writer:
+        for _, chrom_df in raw_df.groupby(level=[0, 1], sort=False, observed=True):
+            write_raw_row_group(writer, chrom_df)
+
+
+def load_raw_df(path, strains=None, chroms=None):
+    """Load a raw dataframe written as parquet (raw_df.parquet) or csv (raw_df.csv).
+    For parquet files, only the row groups of the selected strains and
+    chromosomes are read.
+
+    :param path: path to the raw output file
+    :param strains: list of strains to load, default is all strains
+    :param chroms: list of chromosomes to load, default is all chromosomes
+    :return: raw dataframe indexed by (strain, chrom, position, strand)
+    """
+    if str(path).endswith(".csv"):
+        metric_columns = list(pd.read_csv(path, nrows=0).columns[len(RAW_COLUMNS) :])
+        df = pd.read_csv(
+            path,
+            header=0,
+            names=RAW_COLUMNS + metric_columns,
+            dtype={"strain": str, "chrom": str, "strand": str},
+        )
+    else:
+        pa = import_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        metadata = parquet_file.metadata
+        selected = {"strain": strains, "chrom": chroms}
+        column_indices = {
+            metadata.schema.column(i).name: i for i in range(metadata.num_columns)
+        }
+
+        def is_selected(row_group):
+            for name, values in selected.items():
+                stats = row_group.column(column_indices[name]).statistics
+                if values is None or stats is None or not stats.has_min_max:
+                    continue
+                if not any(stats.min <= value <= stats.max for value in values):
+                    return False
+            return True
+
+        row_groups = [
+            i
+            for i in range(metadata.num_row_groups)
+            if is_selected(metadata.row_group(i))
+        ]
+        df = parquet_file.read_row_groups(row_groups).to_pandas()
+        metric_columns = [name for name in df.columns if name not in RAW_COLUMNS]
+
+    if strains is not None:
+        df = df[df["strain"].isin(strains)]
+    if chroms is not None:
+        df = df[df["chrom"].isin(chroms)]
+
+    index = pd.MultiIndex.from_arrays(
+        [
+            pd.Categorical(df["strain"].astype(str)),
+            pd.Categorical(df["chrom"].astype(str)),
+            df["pos"].to_numpy(dtype=np.int32),
+            pd.Categorical(df["strand"].astype(str), categories=["W", "C"]),
+        ]
+    )
+    return pd.DataFrame(
+        {name: df[name].to_numpy(dtype=np.float32) for name in metric_columns},
+        index=index,
+    )
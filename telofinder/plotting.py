@@ -3,15 +3,33 @@
 def plot_telom(telom_df):
     """Plotting the telomere detection on both left and right chromosome ends
     """
+    columns = ["polynuc", "entropy", "predict_telom"]
+    if "polynuc" not in telom_df:
+        # raw dataframe of motif sets
+        columns = list(telom_df.columns)
     df = telom_df.reset_index()
     for strand in ["W", "C"]:
+        if not (df.level_3 == strand).any():
+            continue
         ax = (
             df.query("level_3==@strand")
-            .loc[:, ["polynuc", "entropy", "predict_telom"]]
+            .loc[:, columns]
             .plot()
             .legend(loc="center left", bbox_to_anchor=(1, 0.5))
         )
         ax.set_title(strand)
 
 
+def plot_track_region(
+    store_dir, strain, chrom, start=None, end=None, polynuc_thres=0.8, entropy_thres=0.8
+):
+    """Plot the windows of a region of a sequence from a track store, loading only
+    the windows of the region (see telofinder.tracks.load_raw_region)
+    """
+    from telofinder.tracks import load_raw_region
 
+    plot_telom(
+        load_raw_region(
+            store_dir, strain, chrom, start, end, polynuc_thres, entropy_thres
+        )
+    )
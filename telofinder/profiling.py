@@ -0,0 +1,325 @@
+import cProfile
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import quote
+
+
+_stages = None  # stage statistics being recorded, None when not profiling
+_peak_rss = 0  # peak RSS of the process before the last reset_peak_rss
+
+
+def get_peak_rss():
+    """Peak resident set size of the current process in bytes, since the process
+    start or the last reset_peak_rss
+
+    :return: peak RSS in bytes
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset_peak_rss():
+    """Reset the peak resident set size of the current process, so that the peak
+    of each stage is measured on its own. Only supported on Linux, elsewhere the
+    peak is the peak since the process start.
+    """
+    global _peak_rss
+    _peak_rss = max(_peak_rss, get_peak_rss())
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def get_process_peak_rss():
+    """Peak resident set size of the current process in bytes since its start"""
+    return max(_peak_rss, get_peak_rss())
+
+
+def add_stage_stats(stages, name, wall, cpu, peak_rss):
+    """Add the wall time, CPU time and peak RSS of a run of a stage to a
+    dictionary of stage statistics. Times are summed and peaks maxed.
+    """
+    stats = stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "peak_rss": 0})
+    stats["wall"] += wall
+    stats["cpu"] += cpu
+    stats["peak_rss"] = max(stats["peak_rss"], peak_rss)
+
+
+@contextmanager
+def collect_stages(stages):
+    """Record the stages run in the context (see stage) into a dictionary of
+    stage statistics
+
+    :param stages: dictionary of stage statistics, None not to record the stages
+    """
+    global _stages
+    previous, _stages = _stages, stages
+    try:
+        yield stages
+    finally:
+        _stages = previous
+
+
+@contextmanager
+def stage(name):
+    """Record the wall time, CPU time and peak RSS of a stage of the run, when
+    stages are being collected (see collect_stages). Stages must not be nested.
+
+    :param name: stage name, e.g. parsing, window_scoring, grouping, classification,
+        merge or export
+    """
+    if _stages is None:
+        yield
+        return
+    stages = _stages
+    reset_peak_rss()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        add_stage_stats(
+            stages,
+            name,
+            time.perf_counter() - wall,
+            time.process_time() - cpu,
+            get_peak_rss(),
+        )
+
+
+@contextmanager
+def thread_stage(stages, name):
+    """Record the wall time, CPU time and peak RSS of a stage run by another thread
+    than the main thread, e.g. by the task feeder thread of a pool, into a
+    dictionary of stage statistics. Unlike stage, the stages being collected are
+    not used and the peak RSS, shared by all threads, is not reset: the peak RSS
+    of the process so far is recorded. The CPU time is the one of the thread.
+
+    :param stages: dictionary of stage statistics, None not to record the stage
+    :param name: stage name, see stage
+    """
+    if stages is None:
+        yield
+        return
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        add_stage_stats(
+            stages,
+            name,
+            time.perf_counter() - wall,
+            time.thread_time() - cpu,
+            get_peak_rss(),
+        )
+
+
+def get_cprofile_path(cprofile_dir, *names):
+    """Path of the cProfile statistics file of a task
+
+    :param cprofile_dir: directory of the cProfile statistics files
+    :param names: names of the task, e.g. strain and chromosome
+    :return: path to '<cprofile_dir>/<name>.<name>.prof'
+    """
+    name = ".".join(quote(str(name), safe="") for name in names)
+    return Path(cprofile_dir) / f"{name}.prof"
+
+
+@contextmanager
+def profile_task(enabled=True, cprofile_path=None):
+    """Profile a task, typically a sequence run by a worker process. The yielded
+    record gets the wall time, CPU time and peak RSS of the task and the statistics
+    of its stages. With cprofile_path, the task is also run under cProfile and its
+    statistics are dumped to that path, to be read with pstats or snakeviz.
+
+    :param enabled: profile the task, otherwise None is yielded
+    :param cprofile_path: path to the cProfile statistics file, None not to use cProfile
+    """
+    if not enabled:
+        yield None
+        return
+
+    record = {"pid": os.getpid(), "stages": {}}
+    profiler = None
+    if cprofile_path is not None:
+        Path(cprofile_path).parent.mkdir(parents=True, exist_ok=True)
+        profiler = cProfile.Profile()
+
+    reset_peak_rss()
+    wall, cpu = time.perf_counter(), time.process_time()
+    with collect_stages(record["stages"]):
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(cprofile_path)
+            record["wall"] = time.perf_counter() - wall
+            record["cpu"] = time.process_time() - cpu
+            record["peak_rss"] = max(
+                [stats["peak_rss"] for stats in record["stages"].values()]
+                + [get_peak_rss()]
+            )
+
+
+def new_report(cprofile_dir=None):
+    """Start a run report, to be passed as the profile argument of the telofinder
+    functions and written with write_report once the run is over. The wall time,
+    CPU time and peak RSS of each stage are collected per sequence, including in the
+    worker processes, and per fasta file.
+
+    :param cprofile_dir: directory where the cProfile statistics of the parent process
+        (main.prof) and of each sequence (<strain>.<chrom>.prof) are written, None
+        not to use cProfile
+    :return: a run report
+    """
+    report = {
+        "cprofile_dir": None if cprofile_dir is None else str(cprofile_dir),
+        "stages": {},
+        "files": {},
+        "sequences": [],
+        "start": time.time(),
+        "wall": time.perf_counter(),
+        "cpu": time.process_time(),
+        "cpu_children": get_children_cpu(),
+        "profiler": None,
+    }
+    if cprofile_dir is not None:
+        Path(cprofile_dir).mkdir(parents=True, exist_ok=True)
+        report["profiler"] = cProfile.Profile()
+        report["profiler"].enable()
+    return report
+
+
+def get_children_cpu():
+    """CPU time of the terminated child processes, e.g. of a closed pool"""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def get_report_stages(report, fasta_index=None):
+    """Dictionary of stage statistics of a fasta file of a run report, or of the
+    run itself, for collect_stages
+
+    :param report: a run report or None
+    :param fasta_index: index of the fasta file, None for the stages of the run
+        that are not specific to a file
+    :return: the dictionary of stage statistics, None without report
+    """
+    if report is None:
+        return None
+    if fasta_index is None:
+        return report["stages"]
+    return report["files"].setdefault(fasta_index, {"stages": {}})["stages"]
+
+
+def add_file_info(report, fasta_index, **info):
+    """Add information on a fasta file, e.g. its path and strain, to a run report"""
+    if report is not None:
+        report["files"].setdefault(fasta_index, {"stages": {}}).update(info)
+
+
+def add_sequence_record(report, fasta_index, record):
+    """Add the profile_task record of a sequence to a run report"""
+    if report is not None and record is not None:
+        report["sequences"].append({"fasta_index": fasta_index, **record})
+
+
+def summarize_stages(stages_list):
+    """Sum the statistics of several dictionaries of stage statistics"""
+    total = {}
+    for stages in stages_list:
+        for name, stats in stages.items():
+            add_stage_stats(total, name, **stats)
+    return total
+
+
+def write_report(report, path):
+    """Write a run report as JSON. The statistics of each sequence, of each fasta file
+    (its sequences and its stages run in the parent process) and of the whole run are
+    written, the sequences sorted by decreasing wall time. With cprofile_dir, the
+    cProfile statistics of the parent process are dumped to main.prof.
+
+    The sequences scored in chunks have one record per chunk, with the window
+    range of the chunk.
+
+    Times are in seconds and peak RSS in bytes. The CPU time of the run is split
+    between the parent process (cpu) and its terminated worker processes
+    (cpu_children).
+
+    :param report: a run report from new_report
+    :param path: path to the JSON file
+    :return: the written report, as a dictionary
+    """
+    if report["profiler"] is not None:
+        report["profiler"].disable()
+        report["profiler"].dump_stats(Path(report["cprofile_dir"]) / "main.prof")
+
+    sequences = sorted(report["sequences"], key=lambda seq: seq["wall"], reverse=True)
+    files = []
+    for fasta_index, file_record in sorted(report["files"].items()):
+        file_sequences = [seq for seq in sequences if seq["fasta_index"] == fasta_index]
+        stages = summarize_stages(
+            [file_record["stages"]] + [seq["stages"] for seq in file_sequences]
+        )
+        files.append(
+            {
+                "fasta_index": fasta_index,
+                **{key: value for key, value in file_record.items() if key != "stages"},
+                "nb_sequences": len({seq["chrom"] for seq in file_sequences}),
+                "length": sum(seq["length"] for seq in file_sequences),
+                "wall": sum(stats["wall"] for stats in stages.values()),
+                "cpu": sum(stats["cpu"] for stats in stages.values()),
+                "peak_rss": max(
+                    [stats["peak_rss"] for stats in stages.values()], default=0
+                ),
+                "stages": stages,
+            }
+        )
+
+    # peak of the parent process, including its stages measured after a reset
+    parent_peak_rss = max(
+        [get_process_peak_rss()]
+        + [
+            stats["peak_rss"]
+            for stages in [report["stages"]]
+            + [file_record["stages"] for file_record in report["files"].values()]
+            for stats in stages.values()
+        ]
+    )
+    run_report = {
+        "start": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(report["start"])),
+        "wall": time.perf_counter() - report["wall"],
+        "cpu": time.process_time() - report["cpu"],
+        "cpu_children": get_children_cpu() - report["cpu_children"],
+        "peak_rss": parent_peak_rss,
+        "peak_rss_workers": max([seq["peak_rss"] for seq in sequences], default=0),
+        "nb_sequences": len({(seq["fasta_index"], seq["chrom"]) for seq in sequences}),
+        "stages": summarize_stages(
+            [report["stages"]] + [file_record["stages"] for file_record in files]
+        ),
+        "files": files,
+        "sequences": sequences,
+    }
+    if report["cprofile_dir"] is not None:
+        run_report["cprofile_dir"] = report["cprofile_dir"]
+
+    with open(path, "w") as out:
+        json.dump(run_report, out, indent=2)
+    return run_report
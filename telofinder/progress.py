@@ -0,0 +1,246 @@
+import datetime
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import sys
+import time
+from contextlib import contextmanager
+
+from telofinder.fasta import get_scan_limit
+
+
+logger = logging.getLogger("telofinder")
+
+LOG_FORMATS = ["text", "json"]
+HEARTBEAT_INTERVAL = 60  # seconds without a finished sequence between progress reports
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format log records as JSON lines with the time, level, process id, event name,
+    message and event data of the record"""
+
+    def format(self, record):
+        line = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "pid": record.process,
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+            **getattr(record, "data", {}),
+        }
+        return json.dumps(line, default=str)
+
+
+def setup_logging(log_format="text", quiet=False, stream=None):
+    """Configure the telofinder logger for the command line. Without it, only
+    warnings are shown, on stderr.
+
+    :param log_format: 'text' for human readable lines or 'json' for one JSON
+        object per line (see JsonLinesFormatter)
+    :param quiet: only log warnings and errors
+    :param stream: stream to log to, default is stderr
+    :return: the handler of the logger
+    """
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format '{log_format}', expected one of {LOG_FORMATS}")
+    handler = logging.StreamHandler(sys.stderr if stream is None else stream)
+    if log_format == "json":
+        handler.setFormatter(JsonLinesFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%H:%M:%S"))
+    logger.handlers = [handler]
+    logger.setLevel(logging.WARNING if quiet else logging.INFO)
+    logger.propagate = False
+    return handler
+
+
+def log_event(event, message, level=logging.INFO, **data):
+    """Log an event of the run
+
+    :param event: event name, e.g. 'progress' or 'sequence_start'
+    :param message: human readable message
+    :param level: logging level
+    :param data: data of the event, written as fields of the JSON lines
+    """
+    logger.log(level, message, extra={"event": event, "data": data})
+
+
+def init_worker_logging(queue):
+    """Pool initializer sending all the log records of a worker process to the
+    parent process through a queue (see worker_events)"""
+    logger.handlers = [logging.handlers.QueueHandler(queue)]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+
+
+class WorkerEventHandler(logging.Handler):
+    """Handle the log records of the worker processes in the parent process: keep
+    track of the sequences, or chunks of sequences, being run by each worker and
+    log the records enabled for the telofinder logger"""
+
+    def __init__(self, progress):
+        super().__init__()
+        self.progress = progress
+
+    def emit(self, record):
+        event = getattr(record, "event", None)
+        data = getattr(record, "data", {})
+        if event in ["sequence_start", "chunk_start"]:
+            self.progress["running"][record.process] = (data["chrom"], record.created)
+        elif event in ["sequence_done", "chunk_done"]:
+            self.progress["running"].pop(record.process, None)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+@contextmanager
+def worker_events(progress):
+    """Collect the log records of the worker processes of a pool through a queue,
+    so that they are logged by the parent process instead of interleaving
+
+    :param progress: progress of the run, see new_progress
+    :return: the initializer and initargs arguments of the pool
+    """
+    queue = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(queue, WorkerEventHandler(progress))
+    listener.start()
+    try:
+        yield init_worker_logging, (queue,)
+    finally:
+        listener.stop()
+        queue.close()
+
+
+def new_progress(tasks, nb_scanned_nt):
+    """Start following the progress of a run
+
+    :param tasks: list of tasks from get_seq_tasks
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :return: the progress of the run
+    """
+    progress = {
+        "sizes": {},
+        "nb_done": 0,
+        "bases_done": 0,
+        "bases_computed": 0,
+        "bases_total": 0,
+        "start": time.perf_counter(),
+        "running": {},
+    }
+    for task in tasks:
+        add_progress_task(progress, task, nb_scanned_nt)
+    return progress
+
+
+def add_progress_task(progress, task, nb_scanned_nt):
+    """Add a sequence to the progress of a run, e.g. a sequence of a fasta file
+    parsed as a stream once the run has started
+
+    :param progress: progress of the run, see new_progress
+    :param task: a task of get_seq_tasks
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    """
+    fasta_index, seq_index, seq, strain = task
+    scanned = min(seq.length, 2 * get_scan_limit(seq.length, nb_scanned_nt))
+    progress["sizes"][(fasta_index, seq_index)] = (strain, seq.name, scanned)
+    progress["bases_total"] += scanned
+
+
+def format_duration(seconds):
+    """Format a duration in seconds as H:MM:SS"""
+    return str(datetime.timedelta(seconds=round(seconds)))
+
+
+def get_progress_data(progress):
+    """Current counts, throughput and estimated time left of a run"""
+    elapsed = time.perf_counter() - progress["start"]
+    bases_per_second = progress["bases_computed"] / elapsed if elapsed > 0 else 0
+    bases_left = progress["bases_total"] - progress["bases_done"]
+    eta = bases_left / bases_per_second if bases_per_second > 0 else None
+    return {
+        "nb_done": progress["nb_done"],
+        "nb_total": len(progress["sizes"]),
+        "bases_done": progress["bases_done"],
+        "bases_total": progress["bases_total"],
+        "elapsed": elapsed,
+        "bases_per_second": bases_per_second,
+        "eta": eta,
+    }
+
+
+def format_progress(data):
+    """Human readable summary of get_progress_data"""
+    eta = "?" if data["eta"] is None else format_duration(data["eta"])
+    return (
+        f"{data['nb_done']}/{data['nb_total']} sequences,"
+        f" {data['bases_per_second'] / 1e6:.2f} Mb/s, ETA {eta}"
+    )
+
+
+def update_progress(progress, task_key, cached=False):
+    """Count a finished sequence and log the progress of the run. Sequences loaded
+    from the cache are not counted in the throughput.
+
+    :param progress: progress of the run, see new_progress
+    :param task_key: tuple of the fasta index and sequence index of the sequence
+    :param cached: the results of the sequence were loaded from the cache
+    """
+    strain, chrom, scanned = progress["sizes"][task_key]
+    progress["nb_done"] += 1
+    progress["bases_done"] += scanned
+    if not cached:
+        progress["bases_computed"] += scanned
+    data = get_progress_data(progress)
+    done = "loaded from cache" if cached else "done"
+    log_event(
+        "progress",
+        f"chromosome {chrom} {done} ({format_progress(data)})",
+        strain=strain,
+        chrom=chrom,
+        cached=cached,
+        **data,
+    )
+
+
+def log_heartbeat(progress):
+    """Log the progress of a run and the sequences being run by each worker, to
+    tell slow sequences from stuck workers"""
+    now = time.time()
+    running = [
+        (pid, chrom, now - start)
+        for pid, (chrom, start) in list(progress["running"].items())
+    ]
+    data = get_progress_data(progress)
+    message = format_progress(data)
+    if running:
+        message += ", running: " + ", ".join(
+            f"{chrom} ({format_duration(seconds)} in process {pid})"
+            for pid, chrom, seconds in running
+        )
+    log_event(
+        "heartbeat",
+        message,
+        running=[
+            {"pid": pid, "chrom": chrom, "seconds": seconds}
+            for pid, chrom, seconds in running
+        ],
+        **data,
+    )
+
+
+def iter_with_heartbeat(results, progress, interval=HEARTBEAT_INTERVAL):
+    """Iterate over the results of Pool.imap or Pool.imap_unordered, logging a
+    heartbeat (see log_heartbeat) when no result comes for interval seconds
+
+    :param results: iterator from Pool.imap or Pool.imap_unordered
+    :param progress: progress of the run, see new_progress
+    :param interval: seconds between heartbeats
+    """
+    while True:
+        try:
+            yield results.next(timeout=interval)
+        except StopIteration:
+            return
+        except multiprocessing.TimeoutError:
+            log_heartbeat(progress)
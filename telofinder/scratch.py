@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+
+RawArrays = namedtuple("RawArrays", ["path", "columns", "nb_W", "nb_C"])
+RawArrays.__doc__ = """Descriptor of the metric columns of the raw dataframe of a
+sequence written by a worker process to a scratch file (see write_raw_arrays).
+It is returned to the parent process instead of the dataframe itself, the window
+positions being nb_W windows from the left end and nb_C windows from the right end."""
+
+MetricChunk = namedtuple("MetricChunk", ["path", "start", "names"])
+MetricChunk.__doc__ = """Descriptor of the raw dataframe columns of both strands of a chunk
+of a sequence written by a worker process to a scratch file (see write_metric_chunk).
+start is the W strand start of the first window of the chunk and names the names
+of the columns."""
+
+
+def new_scratch_dir(scratch_root=None):
+    """Create the scratch directory of a run, where the worker processes write the
+    raw arrays of their sequences
+
+    :param scratch_root: parent directory of the scratch directory, default is the
+        temporary directory (TMPDIR), e.g. /dev/shm to keep the arrays in memory
+    :return: path to the scratch directory
+    """
+    return Path(tempfile.mkdtemp(prefix="telofinder_scratch_", dir=scratch_root))
+
+
+def remove_scratch_dir(scratch_dir):
+    """Remove the scratch directory of a run and the arrays left in it"""
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def write_rows(path, rows, dtype):
+    """Write arrays of the same length as the rows of a .npy file, through a
+    memory map rather than a copy of all the rows
+
+    :param path: path to the .npy file
+    :param rows: list of arrays
+    :param dtype: numpy dtype of the file
+    """
+    values = np.lib.format.open_memmap(
+        path, mode="w+", dtype=dtype, shape=(len(rows), len(rows[0]))
+    )
+    for i, row in enumerate(rows):
+        values[i] = row
+    values.flush()
+    del values
+
+
+def open_rows(path):
+    """Memory-map a .npy scratch file, read-only. The file is removed once mapped,
+    its space is freed when the array is no longer used.
+
+    :param path: path to the .npy file
+    :return: the mapped array
+    """
+    values = np.load(path, mmap_mode="r")
+    os.unlink(path)
+    return values
+
+
+def write_raw_arrays(scratch_dir, name, raw_df, nb_W):
+    """Write the metric columns of a raw dataframe to a .npy scratch file, as a
+    float32 array of one row per column
+
+    :param scratch_dir: scratch directory of the run, see new_scratch_dir
+    :param name: file name of the sequence, unique in the run
+    :param raw_df: raw dataframe of the sequence, the W strand windows first
+    :param nb_W: number of W strand windows
+    :return: a RawArrays
+    """
+    path = Path(scratch_dir) / f"{name}.npy"
+    columns = list(raw_df.columns)
+    write_rows(path, [raw_df[column].to_numpy() for column in columns], np.float32)
+    return RawArrays(str(path), columns, nb_W, len(raw_df) - nb_W)
+
+
+def open_raw_arrays(raw_arrays):
+    """Memory-map the scratch file of a RawArrays, see open_rows
+
+    :param raw_arrays: a RawArrays
+    :return: float32 array of one row per metric column
+    """
+    return open_rows(raw_arrays.path)
+
+
+def write_metric_chunk(scratch_dir, name, start, columns):
+    """Write the raw dataframe columns of both strands of a chunk of a sequence
+    to a .npy scratch file, as a float32 array of one row per strand and column
+
+    :param scratch_dir: scratch directory of the run, see new_scratch_dir
+    :param name: file name of the chunk, unique in the run
+    :param start: W strand start of the first window of the chunk
+    :param columns: dictionary of the columns of each strand of the chunk, indexed
+        by W strand window start
+    :return: a MetricChunk
+    """
+    path = Path(scratch_dir) / f"{name}.npy"
+    names = list(columns["W"])
+    rows = [columns[strand][column] for strand in "WC" for column in names]
+    write_rows(path, rows, np.float32)
+    return MetricChunk(str(path), start, names)
+
+
+def open_metric_chunk(chunk):
+    """Memory-map the scratch file of a MetricChunk, see open_rows
+
+    :param chunk: a MetricChunk
+    :return: dictionary of the columns of each strand of the chunk
+    """
+    values = open_rows(chunk.path)
+    nb_columns = len(chunk.names)
+    return {
+        strand: {
+            column: values[strand_index * nb_columns + i]
+            for i, column in enumerate(chunk.names)
+        }
+        for strand_index, strand in enumerate("WC")
+    }
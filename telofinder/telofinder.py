@@ -1,28 +1,86 @@
 import sys
-from Bio import SeqIO
-from Bio.SeqRecord import SeqRecord
-from Bio.Seq import Seq
-import os.path
-import argparse
+import logging
+import os
 from pathlib import Path
 import pandas as pd
 import numpy as np
-from collections import Counter
-import pybedtools
+from collections import Counter, deque, namedtuple
+from itertools import chain
 from multiprocessing import Pool
 from functools import partial
-import pysam
 
-from telofinder.plotting import plot_telom
+from telofinder.calls import (
+    append_calls,
+    classify_calls,
+    classify_telomere,
+    get_calls_df,
+    merge_calls,
+)
+from telofinder.cache import evict, get_entry_dir, load_seq_result, save_seq_result
+from telofinder.fasta import (
+    CHUNK_SIZE,
+    COMPRESSED_SUFFIXES,
+    STDIN_PATH,
+    BgzfSeq,
+    FastaSeq,
+    SeqEnds,
+    get_scan_limit,
+    get_seq_ends,
+    get_indexed_seqs,
+    get_str_seq_ends,
+    iter_fasta,
+    parse_fasta,
+    read_seq_chunk,
+    read_seq_ends,
+)
+from telofinder.motifs import get_motif_length, get_reverse_complement
+from telofinder.parquet import open_raw_writer, write_raw_parquet, write_raw_row_group
+from telofinder.progress import (
+    add_progress_task,
+    iter_with_heartbeat,
+    log_event,
+    new_progress,
+    update_progress,
+    worker_events,
+)
+from telofinder.profiling import (
+    add_file_info,
+    add_sequence_record,
+    collect_stages,
+    get_cprofile_path,
+    get_report_stages,
+    profile_task,
+    stage,
+    thread_stage,
+)
+from telofinder.scratch import (
+    RawArrays,
+    new_scratch_dir,
+    open_metric_chunk,
+    open_raw_arrays,
+    remove_scratch_dir,
+    write_metric_chunk,
+    write_raw_arrays,
+)
+from telofinder.tracks import (
+    get_predict_column,
+    list_tracks,
+    load_raw_region,
+    write_tracks,
+)
 
 
 def get_strain_name(filename):
     """Function to get the strain name from the name of the fasta file
 
-    :param filename: path of fasta file
-    :return: sequence name
+    :param filename: path of fasta file, possibly compressed, or '-' for the standard input
+    :return: sequence name, 'stdin' for the standard input
     """
+    if str(filename) == STDIN_PATH:
+        return "stdin"
     filepath = Path(filename)
+    if filepath.suffix in COMPRESSED_SUFFIXES:
+        filepath = filepath.with_suffix("")
     return filepath.stem
 
 
@@ -125,108 +183,580 @@ def compute_metrics(window, polynucleotide_list=["AC", "CA", "CC"]):
     return metrics
 
 
-def get_consecutive_groups(df_chrom):
-    """From the raw dataframe get start and end of each telomere window.
-    Applied to detect start and end of telomere in nucleotide positions.
+POLYNUCLEOTIDE_LIST = ["AC", "CA", "CC"]
+
+BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate("ACGT"):
+    BASE_CODES[ord(_base)] = _code
+    BASE_CODES[ord(_base.lower())] = _code
+COMPLEMENT_CODES = np.array([3, 2, 1, 0, 4], dtype=np.uint8)
+
+
+def encode_sequence(sequence):
+    """Encode a DNA sequence into a uint8 array (A=0, C=1, G=2, T=3, other=4)
+
+    :param sequence: DNA sequence as a string, bytes or a uint8 array of ASCII codes
+    :return: a numpy uint8 array of the same length as the sequence
     """
-    df = df_chrom.reset_index()
-    chrom_groups = {}
-    for strand in ["W", "C"]:
-        nums = list(df.query("(level_3==@strand) and (predict_telom==1)").level_2)
-        nums = sorted(set(nums))
-        gaps = [[s, e] for s, e in zip(nums, nums[1:]) if s + 1 < e]
-        edges = iter(nums[:1] + sum(gaps, []) + nums[-1:])
-        chrom_groups[strand] = list(zip(edges, edges))
+    if isinstance(sequence, str):
+        sequence = sequence.encode("latin-1")
+    if isinstance(sequence, bytes):
+        sequence = np.frombuffer(sequence, dtype=np.uint8)
+    return BASE_CODES[sequence]
 
-        # [{"start":x, "end":y} for x, y in b["W"]]
 
-    return chrom_groups
+def reverse_complement_encoded(encoded):
+    """Reverse complement an encoded sequence (see encode_sequence)
 
+    :param encoded: encoded sequence
+    :return: the encoded reverse complement sequence
+    """
+    return COMPLEMENT_CODES[encoded[::-1]]
+
+
+def get_entropy_array(encoded, size):
+    """Vectorized version of get_entropy computed for all windows at once
 
-def classify_telomere(interval_chrom, chrom_len):
-    """From a list of tuples obtained from get_consecutive_groups, identify if
-    interval corresponds to terminal or interal telomere
+    :param encoded: encoded sequence (see encode_sequence)
+    :param size: size of the sliding window
+    :return: array of the entropy of each window, indexed by window start
     """
-    classif_dict_list = []
+    terms = get_entropy_terms(encoded, size)
+    # same summation order as get_entropy (A, T, G, C)
+    return terms[0] + terms[3] + terms[2] + terms[1]
 
-    interval_W = interval_chrom["W"][:]
-    if interval_W == []:
-        classif_dict_list.append(
-            {"start": None, "end": None, "side": "Left", "type": "term"}
-        )
-        classif_dict_list.append(
-            {"start": None, "end": None, "side": "Left", "type": "intern"}
-        )
-    elif min(interval_W)[0] == 0:
-        classif_dict_list.append(
-            {
-                "start": 0 + 1,
-                "end": min(interval_W)[1] + 1 + 19,
-                "side": "Left",
-                "type": "term",
-            }
-        )
-        interval_W.remove(min(interval_W))
-        for interval in interval_W:
-            classif_dict_list.append(
-                {
-                    "start": interval[0] + 1,
-                    "end": interval[1] + 1 + 19,
-                    "side": "Left",
-                    "type": "intern",
-                }
-            )
+
+def get_entropy_terms(encoded, size):
+    """Entropy term -p * log(p) of each base in all windows
+
+    :param encoded: encoded sequence (see encode_sequence)
+    :param size: size of the sliding window
+    :return: list of the arrays of the A, C, G and T terms, indexed by window start
+    """
+    terms = []
+    for code in range(4):
+        cumul = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(encoded == code, out=cumul[1:])
+        freq_base = (cumul[size:] - cumul[:-size]) / size
+        proba_base = np.zeros_like(freq_base)
+        present = freq_base > 0
+        proba_base[present] = -(freq_base[present] * np.log(freq_base[present]))
+        terms.append(proba_base)
+    return terms
+
+
+def get_polynuc_array(encoded, size, polynucleotide_list):
+    """Vectorized version of get_polynuc computed for all windows at once
+
+    :param encoded: encoded sequence (see encode_sequence)
+    :param size: size of the sliding window
+    :param polynucleotide_list: a list of dinucleotides made of A, C, G or T
+    :return: array of the polynucleotide proportion of each window, indexed by window start
+    """
+    dinuc = encoded[:-1].astype(np.int16) * 5 + encoded[1:]
+    dinuc_codes = [
+        encode_sequence(polynuc)[0] * 5 + encode_sequence(polynuc)[1]
+        for polynuc in polynucleotide_list
+    ]
+    cumul = np.zeros(len(dinuc) + 1, dtype=np.int64)
+    np.cumsum(np.isin(dinuc, dinuc_codes), out=cumul[1:])
+    return (cumul[size - 1 :] - cumul[: -(size - 1)]) / (size - 1)
+
+
+def compute_window_metrics(sequence, size=20, polynucleotide_list=POLYNUCLEOTIDE_LIST):
+    """Compute entropy and polynucleotide proportion of all the sliding windows of
+    a sequence at once. Gives the same values as calling compute_metrics on each window.
+
+    :param sequence: DNA sequence as a string or already encoded (see encode_sequence)
+    :param size: size of the sliding window, default value is 20
+    :param polynucleotide_list: a list of dinucleotides, default value is ["AC", "CA", "CC"]
+    :return: a dictionary of entropy and polynucleotide proportion arrays, indexed by window start
+    """
+    if size > len(sequence):
+        sys.exit("The window size must be smaller than the sequence")
+    if isinstance(sequence, str):
+        encoded = encode_sequence(sequence)
     else:
-        for interval in interval_W:
-            classif_dict_list.append(
-                {
-                    "start": interval[0] + 1,
-                    "end": interval[1] + 1 + 19,
-                    "side": "Left",
-                    "type": "intern",
-                }
+        encoded = sequence
+    return {
+        "entropy": get_entropy_array(encoded, size),
+        "polynuc": get_polynuc_array(encoded, size, polynucleotide_list),
+    }
+
+
+def get_kmer_codes(encoded, k):
+    """Rolling base 5 hash of all the k-mers of an encoded sequence. k-mers with
+    an ambiguous base (code 4) never match a motif made of A, C, G and T.
+
+    :param encoded: encoded sequence (see encode_sequence)
+    :param k: k-mer length, at most 27
+    :return: int64 array of the code of each k-mer, indexed by k-mer start
+    """
+    nb_kmers = len(encoded) - k + 1
+    codes = np.zeros(max(nb_kmers, 0), dtype=np.int64)
+    for i in range(k):
+        codes *= 5
+        codes += encoded[i : i + nb_kmers]
+    return codes
+
+
+def get_motif_array(kmer_codes, size, motifs):
+    """Generalization of get_polynuc_array to motifs of any length, from the
+    k-mer codes of the sequence (see get_kmer_codes)
+
+    :param kmer_codes: codes of the k-mers of the sequence, of the same length as the motifs
+    :param size: size of the sliding window
+    :param motifs: list of motifs of the same length, made of A, C, G or T
+    :return: array of the fraction of the k-mers of each window found in motifs, indexed by window start
+    """
+    k = len(motifs[0])
+    motif_codes = [get_kmer_codes(encode_sequence(motif), k)[0] for motif in motifs]
+    nb_kmers = size - k + 1
+    cumul = np.zeros(len(kmer_codes) + 1, dtype=np.int64)
+    np.cumsum(np.isin(kmer_codes, motif_codes), out=cumul[1:])
+    return (cumul[nb_kmers:] - cumul[:-nb_kmers]) / nb_kmers
+
+
+def compute_motif_metrics(sequence, motif_sets, size=20):
+    """Compute the entropy and the motif fraction of each motif set of all the
+    sliding windows of a sequence. The k-mers of each motif length are hashed
+    once for all the motif sets.
+
+    :param sequence: DNA sequence as a string or already encoded (see encode_sequence)
+    :param motif_sets: list of MotifSet
+    :param size: size of the sliding window, default value is 20
+    :return: a dictionary of the entropy array and of the motif fraction array of
+        each motif set by name, indexed by window start
+    """
+    if isinstance(sequence, str):
+        sequence = encode_sequence(sequence)
+    metrics = compute_strand_metrics(sequence, size, motif_sets=motif_sets, strands="W")
+    return metrics["W"]
+
+
+def compute_strand_metrics(
+    encoded,
+    size=20,
+    polynucleotide_list=POLYNUCLEOTIDE_LIST,
+    motif_sets=None,
+    strands="WC",
+):
+    """Compute the window metrics of the W and C strands from the encoded W strand
+    only. The C strand window covering the same bases as a W strand window has
+    the same base counts, complemented, and its polynucleotides are the reverse
+    complements of the W strand ones, so the entropy terms and the k-mer codes are
+    computed once for both strands. Values are the same as compute_window_metrics
+    or compute_motif_metrics on the reverse complement sequence.
+
+    :param encoded: encoded W strand sequence (see encode_sequence)
+    :param size: size of the sliding window, default value is 20
+    :param polynucleotide_list: a list of dinucleotides, default value is ["AC", "CA", "CC"]
+    :param motif_sets: list of MotifSet to compute instead of polynucleotide_list,
+        see compute_motif_metrics
+    :param strands: strands to compute, 'W', 'C' or 'WC'
+    :return: a dictionary of the metrics of each strand. Both are indexed by the
+        start of the window on the W strand: the C strand window starting at s
+        ends on the W strand at s + size - 1.
+    """
+    if size > len(encoded):
+        sys.exit("The window size must be smaller than the sequence")
+
+    if motif_sets is None:
+        motif_lists = {"polynuc": list(polynucleotide_list)}
+    else:
+        if len({motif_set.name for motif_set in motif_sets}) != len(motif_sets):
+            raise ValueError("The names of the motif sets must be unique")
+        motif_lists = {}
+        for motif_set in motif_sets:
+            if get_motif_length(motif_set) > size:
+                raise ValueError(
+                    f"The motifs of '{motif_set.name}' are longer than the window size"
+                )
+            motif_lists[motif_set.name] = [motif.upper() for motif in motif_set.motifs]
+
+    terms = get_entropy_terms(encoded, size)
+    terms_AT = terms[0] + terms[3]
+    kmer_codes = {}
+    for motifs in motif_lists.values():
+        k = len(motifs[0])
+        if k not in kmer_codes:
+            kmer_codes[k] = get_kmer_codes(encoded, k)
+
+    metrics = {}
+    for strand in strands:
+        # summation order of get_entropy (A, T, G, C) on the strand, where the
+        # C strand A is the W strand T and so on
+        if strand == "W":
+            entropy = terms_AT + terms[2] + terms[1]
+        else:
+            entropy = terms_AT + terms[1] + terms[2]
+        metrics[strand] = {"entropy": entropy}
+        for name, motifs in motif_lists.items():
+            if strand == "C":
+                motifs = [get_reverse_complement(motif) for motif in motifs]
+            metrics[strand][name] = get_motif_array(
+                kmer_codes[len(motifs[0])], size, motifs
             )
 
-    interval_C = interval_chrom["C"][:]
-    if interval_C == []:
-        classif_dict_list.append(
-            {"start": None, "end": None, "side": "Right", "type": "term"}
+    return metrics
+
+
+def predict_motif_telom(metrics, motif_set):
+    """Telomere prediction of a motif set from compute_motif_metrics results
+
+    :param metrics: dictionary of metrics arrays from compute_motif_metrics
+    :param motif_set: a MotifSet
+    :return: boolean array, True for telomeric windows
+    """
+    return (metrics["entropy"] < motif_set.entropy_thres) & (
+        metrics[motif_set.name] > motif_set.polynuc_thres
+    )
+
+
+def scan_windows_until_gap(
+    encoded,
+    polynuc_thres,
+    entropy_thres,
+    stop_after,
+    size=20,
+    polynucleotide_list=POLYNUCLEOTIDE_LIST,
+    block_size=256,
+    motif_sets=None,
+    strand="W",
+):
+    """Compute the window metrics of a strand block by block outward from the
+    chromosome end, and stop once stop_after consecutive windows past the last
+    telomeric window are not telomeric. The metrics are the same as
+    compute_strand_metrics for the windows that are scanned.
+
+    :param encoded: encoded W strand sequence (see encode_sequence), scanned from
+        its start for the W strand and from its end for the C strand
+    :param stop_after: number of non telomeric windows after which scanning stops
+    :param block_size: number of windows computed at once
+    :param motif_sets: list of MotifSet to compute instead of polynucleotide_list,
+        a window being telomeric for any of them
+    :param strand: 'W' or 'C'
+    :return: a dictionary of entropy and polynucleotide proportion arrays of the
+        scanned windows, indexed by distance from the chromosome end
+    :raises ValueError: if stop_after is negative
+    """
+    if stop_after < 0:
+        raise ValueError(f"stop_after must be 0 or more windows, got {stop_after}")
+
+    def predict_block(block):
+        if motif_sets is None:
+            return (block["entropy"] < entropy_thres) & (block["polynuc"] > polynuc_thres)
+        return np.any(
+            [predict_motif_telom(block, motif_set) for motif_set in motif_sets], axis=0
         )
-        classif_dict_list.append(
-            {"start": None, "end": None, "side": "Right", "type": "intern"}
+
+    nb_windows = len(encoded) - size + 1
+    blocks = []
+    last_telom = -1
+    start = 0
+
+    while start < max(nb_windows, 1):
+        end = min(start + block_size, nb_windows)
+        if strand == "W":
+            block_seq = encoded[start : end + size - 1]
+        else:
+            block_seq = encoded[max(nb_windows - end, 0) : len(encoded) - start]
+        block = compute_strand_metrics(
+            block_seq, size, polynucleotide_list, motif_sets, strand
+        )[strand]
+        if strand == "C":
+            block = {name: values[::-1] for name, values in block.items()}
+        predict_telom = np.flatnonzero(predict_block(block))
+        if len(predict_telom) > 0:
+            last_telom = start + predict_telom[-1]
+        blocks.append(block)
+        start = end
+        if start - last_telom > stop_after:
+            break
+
+    nb_scanned = min(start, last_telom + 1 + stop_after)
+    return {
+        metric: np.concatenate([block[metric] for block in blocks])[:nb_scanned]
+        for metric in blocks[0]
+    }
+
+
+def get_consecutive_groups(df_chrom, column="predict_telom"):
+    """From the raw dataframe get start and end of each telomere window.
+    Applied to detect start and end of telomere in nucleotide positions.
+
+    Runs of consecutive positive positions are found for each strand with a
+    single vectorized pass over the sorted positive positions.
+
+    :param column: telomere prediction column, default = predict_telom
+    """
+    positions = df_chrom.index.get_level_values(2).to_numpy()
+    strands = df_chrom.index.get_level_values(3)
+    predict_telom = df_chrom[column].to_numpy() == 1
+
+    return {
+        strand: get_position_runs(
+            np.unique(positions[predict_telom & (strands == strand)])
         )
-    elif max(interval_C)[1] == (chrom_len - 1):
-        classif_dict_list.append(
-            {
-                "start": max(interval_C)[0] + 1 - 19,
-                "end": max(interval_C)[1] + 1,
-                "side": "Right",
-                "type": "term",
-            }
+        for strand in ["W", "C"]
+    }
+
+
+def get_position_runs(nums):
+    """Get the runs of consecutive positions of a sorted array of positions
+
+    :param nums: sorted array of unique positions
+    :return: list of (start, end) tuples of the runs, both included
+    """
+    if len(nums) == 0:
+        return []
+    # a new run starts after each gap between consecutive positive positions
+    gaps = np.flatnonzero(np.diff(nums) > 1)
+    starts = nums[np.concatenate([[0], gaps + 1])]
+    ends = nums[np.concatenate([gaps, [len(nums) - 1]])]
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def get_raw_df(
+    strain, chrom, pos_W, pos_C, metrics_W, metrics_C, polynuc_thres, entropy_thres
+):
+    """Build the raw dataframe of one sequence column-wise from the window metrics
+    arrays of both strands. Metrics are stored as float32, positions as int32 and
+    strain, chromosome and strand index levels as categoricals.
+
+    :param strain: strain name
+    :param chrom: chromosome name
+    :param pos_W: positions of the W strand windows
+    :param pos_C: positions of the C strand windows
+    :param metrics_W: dictionary of metrics arrays of the W strand windows
+    :param metrics_C: dictionary of metrics arrays of the C strand windows
+    :param polynuc_thres: polynucleotide threshold for telomere prediction
+    :param entropy_thres: entropy threshold for telomere prediction
+    :return: the raw dataframe indexed by (strain, chrom, position, strand)
+    """
+    metrics = {
+        name: np.concatenate([metrics_W[name], metrics_C[name]])
+        for name in ["entropy", "polynuc"]
+    }
+    return pd.DataFrame(
+        get_metric_columns(metrics, polynuc_thres, entropy_thres),
+        index=get_raw_index(strain, chrom, pos_W, pos_C),
+    )
+
+
+def get_metric_columns(metrics, polynuc_thres, entropy_thres, motif_sets=None):
+    """Get the metric columns of the raw dataframe (see get_raw_columns) from
+    window metrics arrays, with the telomere prediction of the default metrics
+    or of each motif set. Thresholds are applied before the float32 conversion
+    so predictions are unchanged.
+
+    :param metrics: dictionary of metrics arrays, see compute_strand_metrics
+    :param polynuc_thres: polynucleotide threshold for telomere prediction
+    :param entropy_thres: entropy threshold for telomere prediction
+    :param motif_sets: list of MotifSet, each with its own thresholds, or None for
+        the default metrics
+    :return: dictionary of float32 arrays
+    """
+    predictions = get_predictions(metrics, polynuc_thres, entropy_thres, motif_sets)
+    if motif_sets is None:
+        return {
+            "entropy": metrics["entropy"].astype(np.float32),
+            "polynuc": metrics["polynuc"].astype(np.float32),
+            "predict_telom": predictions["predict_telom"].astype(np.float32),
+        }
+
+    columns = {"entropy": metrics["entropy"].astype(np.float32)}
+    for motif_set in motif_sets:
+        columns[f"polynuc_{motif_set.name}"] = metrics[motif_set.name].astype(
+            np.float32
         )
-        interval_C.remove(max(interval_C))
-        for interval in interval_C:
-            classif_dict_list.append(
-                {
-                    "start": interval[0] + 1 - 19,
-                    "end": interval[1] + 1,
-                    "side": "Right",
-                    "type": "intern",
-                }
-            )
+        column = get_predict_column(motif_set.name)
+        columns[column] = predictions[column].astype(np.float32)
+    return columns
+
+
+def get_predictions(metrics, polynuc_thres, entropy_thres, motif_sets=None):
+    """Get the telomere predictions of window metrics arrays, for the default
+    metrics or for each motif set
+
+    :param metrics: dictionary of metrics arrays, see compute_strand_metrics
+    :param polynuc_thres: polynucleotide threshold for telomere prediction
+    :param entropy_thres: entropy threshold for telomere prediction
+    :param motif_sets: list of MotifSet, each with its own thresholds, or None for
+        the default metrics
+    :return: dictionary of boolean arrays by prediction column name, see
+        get_predict_column
+    """
+    if motif_sets is None:
+        return {
+            "predict_telom": (metrics["entropy"] < entropy_thres)
+            & (metrics["polynuc"] > polynuc_thres)
+        }
+    return {
+        get_predict_column(motif_set.name): predict_motif_telom(metrics, motif_set)
+        for motif_set in motif_sets
+    }
 
-    else:
-        for interval in interval_C:
-            classif_dict_list.append(
-                {
-                    "start": interval[0] + 1 - 19,
-                    "end": interval[1] + 1,
-                    "side": "Right",
-                    "type": "intern",
-                }
-            )
 
-    return classif_dict_list
+def get_prediction_groups(predict_W, predict_C, chrom_len):
+    """Get the runs of telomeric windows of a sequence straight from the telomere
+    predictions of both strands, without building its raw dataframe, see
+    get_consecutive_groups
+
+    :param predict_W: boolean array of the predictions of the W strand windows,
+        by window position
+    :param predict_C: boolean array of the predictions of the C strand windows,
+        by distance from the chromosome end
+    :param chrom_len: length of the sequence
+    :return: dictionary of the runs of each strand
+    """
+    return {
+        "W": get_position_runs(np.flatnonzero(predict_W)),
+        "C": get_position_runs(chrom_len - 1 - np.flatnonzero(predict_C)[::-1]),
+    }
+
+
+def get_raw_index(strain, chrom, pos_W, pos_C):
+    """Build the (strain, chrom, position, strand) index of the raw dataframe of one
+    sequence, the W strand windows first
+
+    :param pos_W: positions of the W strand windows
+    :param pos_C: positions of the C strand windows
+    :return: a pandas MultiIndex
+    """
+    nb_W, nb_C = len(pos_W), len(pos_C)
+    return pd.MultiIndex.from_arrays(
+        [
+            pd.Categorical.from_codes(np.zeros(nb_W + nb_C, dtype=np.int8), [strain]),
+            pd.Categorical.from_codes(np.zeros(nb_W + nb_C, dtype=np.int8), [chrom]),
+            np.concatenate([pos_W, pos_C]).astype(np.int32),
+            pd.Categorical.from_codes(
+                np.repeat(np.array([0, 1], dtype=np.int8), [nb_W, nb_C]), ["W", "C"]
+            ),
+        ]
+    )
+
+
+def get_scratch_raw_df(strain, chrom, chrom_len, raw_arrays):
+    """Rebuild the raw dataframe of a sequence from the scratch file written by a
+    worker process (see run_seq_task). The metric columns are memory-mapped from
+    the file rather than copied.
+
+    :param chrom_len: length of the sequence
+    :param raw_arrays: a telofinder.scratch.RawArrays
+    :return: the raw dataframe indexed by (strain, chrom, position, strand)
+    """
+    values = open_raw_arrays(raw_arrays)
+    pos_W = np.arange(raw_arrays.nb_W)
+    pos_C = chrom_len - np.arange(raw_arrays.nb_C) - 1
+    return pd.DataFrame(
+        values.T,
+        index=get_raw_index(strain, chrom, pos_W, pos_C),
+        columns=raw_arrays.columns,
+        copy=False,
+    )
+
+
+def get_motif_raw_df(strain, chrom, pos_W, pos_C, metrics_W, metrics_C, motif_sets):
+    """Build the raw dataframe of one sequence from compute_motif_metrics results,
+    with an entropy column and a polynuc_<name> and a predict_telom_<name> column
+    for each motif set
+
+    :param metrics_W: dictionary of metrics arrays of the W strand windows
+    :param metrics_C: dictionary of metrics arrays of the C strand windows
+    :param motif_sets: list of MotifSet
+    :return: the raw dataframe indexed by (strain, chrom, position, strand)
+    """
+    metrics = {
+        name: np.concatenate([metrics_W[name], metrics_C[name]]) for name in metrics_W
+    }
+    return pd.DataFrame(
+        get_metric_columns(metrics, None, None, motif_sets),
+        index=get_raw_index(strain, chrom, pos_W, pos_C),
+    )
+
+
+def get_raw_columns(motif_sets=None):
+    """Metric columns of the raw dataframe
+
+    :param motif_sets: list of MotifSet, or None for the default metrics
+    :return: list of column names
+    """
+    if motif_sets is None:
+        return ["entropy", "polynuc", "predict_telom"]
+    columns = ["entropy"]
+    for motif_set in motif_sets:
+        columns += [f"polynuc_{motif_set.name}", get_predict_column(motif_set.name)]
+    return columns
+
+
+def write_table(df, path, append=False, **kwargs):
+    """Write a dataframe to a csv or bed file. When appending, all rows are
+    written at once and flushed, the header being written only to an empty
+    file; use sync_file once the last rows are appended. Otherwise the table is
+    synced to a temporary file renamed at the end, so that an interrupted run
+    never leaves a truncated file.
+
+    :param df: dataframe to write
+    :param path: path of the output file
+    :param append: append the rows to the file instead of replacing it
+    :param kwargs: arguments of DataFrame.to_csv
+    """
+    path = Path(path)
+    if append and path.exists() and path.stat().st_size > 0:
+        kwargs["header"] = None
+    text = df.to_csv(**kwargs)
+
+    out_path = path if append else path.with_name(f"{path.name}.tmp")
+    with open(out_path, "a" if append else "w") as out:
+        out.write(text)
+        out.flush()
+        if not append:
+            os.fsync(out.fileno())
+    if not append:
+        os.replace(out_path, path)
+
+
+def sync_file(path):
+    """Sync a file written with appends to disk, if it exists
+
+    :param path: path of the file
+    """
+    path = Path(path)
+    if path.exists():
+        with open(path, "rb") as out:
+            os.fsync(out.fileno())
+
+
+def clear_results(outdir="telofinder_results"):
+    """Remove the output table files of a previous run before appending results"""
+    outdir = Path(outdir)
+    for name in [
+        "telom_df.csv",
+        "merged_telom_df.csv",
+        "telom.bed",
+        "telom_merged.bed",
+        "raw_df.csv",
+        "raw_df.parquet",
+    ]:
+        try:
+            (outdir / name).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def get_bed_df(telom_df):
+    """Get the bed intervals of a telomere table, named after the telomere type,
+    prefixed by the motif set if any
+
+    :param telom_df: telomere table
+    :return: dataframe of chrom, start, end and name columns
+    """
+    bed_df = telom_df[["chrom", "start", "end", "type"]].copy()
+    if "motif_set" in telom_df:
+        bed_df["type"] = telom_df["motif_set"] + "_" + telom_df["type"]
+    bed_df.dropna(inplace=True)
+    return bed_df
 
 
 def export_results(
@@ -235,220 +765,1685 @@ def export_results(
     merged_telom_df,
     raw,
     outdir="telofinder_results",
+    append=False,
+    raw_format="csv",
 ):
-    """Produce output table files"""
+    """Produce output table files
+
+    :param append: append the results to the existing output files (see write_table)
+    :param raw_format: format of the raw output, 'csv' (raw_df.csv) or 'parquet'
+        (raw_df.parquet, with one row group per chromosome). Parquet files cannot
+        be appended to, see run_and_export.
+    """
     outdir = Path(outdir)
     try:
         outdir.mkdir()
     except FileExistsError:
         pass
 
-    telom_df.to_csv(outdir / "telom_df.csv", index=False)
-    merged_telom_df.to_csv(outdir / "merged_telom_df.csv", index=False)
+    write_table(telom_df, outdir / "telom_df.csv", append, index=False)
+    write_table(merged_telom_df, outdir / "merged_telom_df.csv", append, index=False)
 
-    bed_df = telom_df[["chrom", "start", "end", "type"]].copy()
-    bed_df.dropna(inplace=True)
-    bed_df.to_csv(outdir / "telom.bed", sep="\t", header=None, index=False)
+    bed_df = get_bed_df(telom_df)
+    write_table(
+        bed_df, outdir / "telom.bed", append, sep="\t", header=None, index=False
+    )
 
-    merged_bed_df = merged_telom_df[["chrom", "start", "end", "type"]].copy()
-    merged_bed_df.dropna(inplace=True)
-    merged_bed_df.to_csv(
-        outdir / "telom_merged.bed", sep="\t", header=None, index=False
+    merged_bed_df = get_bed_df(merged_telom_df)
+    write_table(
+        merged_bed_df,
+        outdir / "telom_merged.bed",
+        append,
+        sep="\t",
+        header=None,
+        index=False,
     )
 
-    if raw:
-        raw_df.to_csv(outdir / "raw_df.csv", index=True)
+    if raw and raw_format == "parquet":
+        write_raw_parquet(raw_df, outdir / "raw_df.parquet")
+    elif raw:
+        write_table(raw_df, outdir / "raw_df.csv", append, index=True)
 
 
-def run_on_single_seq(seq_record, strain, polynuc_thres, entropy_thres, nb_scanned_nt):
-    seqW = str(seq_record.seq)
-    revcomp = seq_record.reverse_complement()
-    seqC = str(revcomp.seq)
+def get_telomere_calls(
+    df_chro, strain, chrom, chrom_len, column="predict_telom", motif_set=None
+):
+    """Classify and merge the telomeric windows of the raw dataframe of a sequence
 
-    if nb_scanned_nt == -1:
-        limit_seq = len(seqW)
-    else:
-        limit_seq = min(nb_scanned_nt, len(seqW))
+    :param df_chro: raw dataframe of the sequence
+    :param column: telomere prediction column, default = predict_telom
+    :param motif_set: name of the motif set of the calls, if any
+    :return: a tuple of the lists of TelomereCall and of merged TelomereCall
+    """
+    with stage("grouping"):
+        telo_groups = get_consecutive_groups(df_chro, column)
 
-    seq_dict_W = {}
-    seq_dict_C = {}
+    return get_group_calls(telo_groups, strain, chrom, chrom_len, motif_set)
 
-    for i, window in sliding_window(seqW, 0, limit_seq, 20):
-        seq_dict_W[(strain, seq_record.name, i, "W")] = compute_metrics(window)
 
-    df_W = pd.DataFrame(seq_dict_W).transpose()
+def get_group_calls(telo_groups, strain, chrom, chrom_len, motif_set=None):
+    """Classify and merge the runs of telomeric windows of a sequence
 
-    for i, window in sliding_window(seqC, 0, limit_seq, 20):
-        seq_dict_C[
-            (strain, seq_record.name, (len(seqC) - i - 1), "C")
-        ] = compute_metrics(window)
+    :param telo_groups: dictionary of the runs of each strand, see get_consecutive_groups
+    :param motif_set: name of the motif set of the calls, if any
+    :return: a tuple of the lists of TelomereCall and of merged TelomereCall
+    """
+    with stage("classification"):
+        calls = classify_calls(telo_groups, chrom_len, strain, chrom, motif_set)
 
-    df_C = pd.DataFrame(seq_dict_C).transpose()
+    with stage("merge"):
+        merged_calls = merge_calls(calls, chrom_len, distance=20)
 
-    df_chro = pd.concat([df_W, df_C])
+    return calls, merged_calls
 
-    df_chro.loc[
-        (df_chro["entropy"] < entropy_thres) & (df_chro["polynuc"] > polynuc_thres),
-        "predict_telom",
-    ] = 1.0
 
-    df_chro["predict_telom"].fillna(0, inplace=True)
+def get_seq_metrics(
+    seq_record,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    stop_after=None,
+    motif_sets=None,
+):
+    """Compute the window metrics of both strands of a sequence, see run_on_single_seq
 
-    telo_groups = get_consecutive_groups(df_chro)
-    telo_list = classify_telomere(telo_groups, len(seq_record.seq))
-    telo_df = pd.DataFrame(telo_list)
-    telo_df["chrom"] = seq_record.name
-    telo_df["chrom_size"] = len(seq_record.seq)
+    :return: a tuple of the SeqEnds of the sequence and of the dictionaries of
+        metrics arrays of the W and C strands, indexed by distance from the
+        chromosome end
+    """
+    with stage("parsing"):
+        if isinstance(seq_record, (FastaSeq, BgzfSeq)):
+            seq_record = read_seq_ends(seq_record, nb_scanned_nt)
+        elif not isinstance(seq_record, SeqEnds):
+            # Biopython SeqRecord
+            seq_record = get_seq_ends(seq_record, nb_scanned_nt)
+
+    with stage("window_scoring"):
+        # Both strands are scored on the W strand: the C strand metrics are derived
+        # from the same encoded array, without building the reverse complement
+        left = encode_sequence(seq_record.left)
+        if len(left) == seq_record.length:
+            right = left
+        else:
+            right = encode_sequence(seq_record.right)
+
+        if stop_after is not None:
+            metrics_W, metrics_C = (
+                scan_windows_until_gap(
+                    seq,
+                    polynuc_thres,
+                    entropy_thres,
+                    stop_after,
+                    motif_sets=motif_sets,
+                    strand=strand,
+                )
+                for seq, strand in [(left, "W"), (right, "C")]
+            )
+        else:
+            if right is left:
+                # whole sequence, both strands in a single pass
+                metrics = compute_strand_metrics(left, motif_sets=motif_sets)
+            else:
+                metrics = {
+                    **compute_strand_metrics(left, motif_sets=motif_sets, strands="W"),
+                    **compute_strand_metrics(right, motif_sets=motif_sets, strands="C"),
+                }
+            metrics_W = metrics["W"]
+            # C windows from the right end of the chromosome
+            metrics_C = {name: values[::-1] for name, values in metrics["C"].items()}
+
+    return seq_record, metrics_W, metrics_C
+
+
+def run_on_single_seq(
+    seq_record,
+    strain,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    stop_after=None,
+    motif_sets=None,
+    track_store=None,
+):
+    """Run the telomere detection algorithm on a single sequence, see get_seq_calls
 
-    if telo_df["start"].isnull().sum() == 4:
-        telo_df_merged = telo_df.copy()
-    else:
-        bed_df = telo_df[["chrom", "start", "end", "type"]].copy()
-        bed_df.dropna(inplace=True)
-        bed_df = bed_df.astype({"start": int, "end": int})
-        bed_file = pybedtools.BedTool().from_dataframe(bed_df)
-        bed_sort = bed_file.sort()
-        bed_merge = bed_sort.merge(d=20)
-        bed_df_merged = bed_merge.to_dataframe()
-        telo_df_merged = pd.merge(
-            bed_df_merged,
-            telo_df.dropna()[["chrom", "side", "type", "start", "chrom_size"]],
-            on=["chrom", "start"],
-            how="left",
+    :return: a tuple of df_chro, telo_df and telo_df_merged
+    """
+    df_chro, calls, merged_calls = get_seq_calls(
+        seq_record,
+        strain,
+        polynuc_thres,
+        entropy_thres,
+        nb_scanned_nt,
+        stop_after,
+        motif_sets,
+        track_store,
+    )
+    return df_chro, get_calls_df(calls), get_calls_df(merged_calls, merged=True)
+
+
+def get_seq_calls(
+    seq_record,
+    strain,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    stop_after=None,
+    motif_sets=None,
+    track_store=None,
+    raw=True,
+):
+    """Run the telomere detection algorithm on a single sequence, returning the
+    telomere calls as TelomereCall tuples rather than dataframes (see
+    telofinder.calls.get_calls_df to convert them)
+
+    :param seq_record: a FastaSeq locating the sequence in an indexed fasta file, a SeqEnds
+        holding the scanned ends of the sequence, or a Biopython SeqRecord
+    :param stop_after: stop scanning each end after this number of non telomeric
+        windows past the last telomeric window (see scan_windows_until_gap), None
+        to scan all nb_scanned_nt nucleotides
+    :param motif_sets: list of MotifSet scanned in a single pass instead of the
+        default polynucleotides, each with its own thresholds (polynuc_thres and
+        entropy_thres are then unused). The telomere tables get a motif_set column
+        and the raw dataframe the columns of each set (see get_motif_raw_df).
+    :param track_store: path to a track store to write the metric tracks of the
+        sequence to (see telofinder.tracks), None not to write them
+    :param raw: build the raw dataframe of the sequence, otherwise df_chro is None
+    :return: a tuple of df_chro and of the lists of TelomereCall and of merged
+        TelomereCall. With motif_sets, the calls of each set follow each other.
+    """
+    seq_record, metrics_W, metrics_C = get_seq_metrics(
+        seq_record, polynuc_thres, entropy_thres, nb_scanned_nt, stop_after, motif_sets
+    )
+    result = get_metric_calls(
+        seq_record.name,
+        seq_record.length,
+        strain,
+        metrics_W,
+        metrics_C,
+        polynuc_thres,
+        entropy_thres,
+        motif_sets,
+        track_store,
+        raw,
+    )
+    log_seq_done(seq_record.name, seq_record.length, strain)
+    return result
+
+
+def get_metric_calls(
+    chrom,
+    chrom_len,
+    strain,
+    metrics_W,
+    metrics_C,
+    polynuc_thres,
+    entropy_thres,
+    motif_sets=None,
+    track_store=None,
+    raw=True,
+):
+    """Call the telomeres of a sequence from the window metrics of both strands,
+    see get_seq_calls. The runs of telomeric windows are found on the prediction
+    arrays, the raw dataframe is only built for the raw output or the tracks.
+
+    :param chrom: name of the sequence
+    :param chrom_len: length of the sequence
+    :param metrics_W: dictionary of metrics arrays of the W strand, see get_seq_metrics
+    :param metrics_C: dictionary of metrics arrays of the C strand, see get_seq_metrics
+    :param raw: build the raw dataframe, otherwise df_chro is None
+    :return: a tuple of df_chro and of the lists of TelomereCall and of merged
+        TelomereCall
+    """
+    df_chro = None
+    if raw or track_store is not None:
+        pos_W = np.arange(len(metrics_W["entropy"]))
+        pos_C = chrom_len - np.arange(len(metrics_C["entropy"])) - 1
+        with stage("raw_df"):
+            if motif_sets is None:
+                df_chro = get_raw_df(
+                    strain,
+                    chrom,
+                    pos_W,
+                    pos_C,
+                    metrics_W,
+                    metrics_C,
+                    polynuc_thres,
+                    entropy_thres,
+                )
+            else:
+                df_chro = get_motif_raw_df(
+                    strain, chrom, pos_W, pos_C, metrics_W, metrics_C, motif_sets
+                )
+
+    with stage("grouping"):
+        predictions_W, predictions_C = (
+            get_predictions(metrics, polynuc_thres, entropy_thres, motif_sets)
+            for metrics in [metrics_W, metrics_C]
         )
-        telo_df_merged.loc[
-            telo_df_merged.end > len(seq_record.seq) - 20, "type"
-        ] = "term"
-        telo_df_merged.loc[telo_df_merged.start < 20, "type"] = "term"
-
-    telo_df_merged["strain"] = strain
-    telo_df_merged = telo_df_merged[
-        ["strain", "chrom", "side", "type", "start", "end", "chrom_size"]
-    ]
+    calls, merged_calls = [], []
+    for motif_set in get_motif_set_names(motif_sets):
+        column = get_predict_column(motif_set)
+        with stage("grouping"):
+            telo_groups = get_prediction_groups(
+                predictions_W[column], predictions_C[column], chrom_len
+            )
+        set_calls, set_merged_calls = get_group_calls(
+            telo_groups, strain, chrom, chrom_len, motif_set
+        )
+        calls.extend(set_calls)
+        merged_calls.extend(set_merged_calls)
+
+    if track_store is not None:
+        with stage("tracks"):
+            write_tracks(track_store, df_chro, chrom_len, motif_sets=motif_sets)
+
+    return (df_chro, calls, merged_calls)
+
+
+def get_motif_set_names(motif_sets=None):
+    """Names of the motif sets called in a run, [None] for the default metrics"""
+    if motif_sets is None:
+        return [None]
+    return [motif_set.name for motif_set in motif_sets]
+
+
+def run_seq_task(
+    task,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    stop_after=None,
+    motif_sets=None,
+    track_store=None,
+    profile=False,
+    cprofile_dir=None,
+    raw=True,
+    scratch_dir=None,
+):
+    """Run get_seq_calls on a task of iter_fasta_results, keeping its indices.
+    Only the telomere calls and a small descriptor of the raw dataframe are sent
+    back to the parent process, the raw metrics being written to a scratch file.
+
+    :param task: a tuple of fasta index, sequence index, sequence and strain
+    :param profile: profile the sequence (see telofinder.profiling.profile_task)
+    :param cprofile_dir: directory to write the cProfile statistics of the sequence
+        to, None not to use cProfile
+    :param raw: return the raw dataframe, otherwise None is returned in its place
+    :param scratch_dir: scratch directory to write the raw metrics to (see
+        telofinder.scratch), None to return the raw dataframe itself
+    :return: a tuple of fasta index, sequence index, the get_seq_calls results
+        and the profile record of the sequence, None when not profiling. With a
+        scratch_dir, the raw dataframe of the results is replaced by a RawArrays.
+        Chunk tasks (see get_chunk_tasks) are run by run_chunk_task.
+    """
+    if len(task) == 5:
+        return run_chunk_task(
+            task,
+            polynuc_thres,
+            entropy_thres,
+            motif_sets,
+            scratch_dir,
+            profile,
+            cprofile_dir,
+        )
+    fasta_index, seq_index, seq_record, strain = task
+    log_seq_start(seq_record, strain)
+    cprofile_path = None
+    if cprofile_dir is not None:
+        cprofile_path = get_cprofile_path(cprofile_dir, strain, seq_record.name)
+
+    with profile_task(profile, cprofile_path) as record:
+        result = get_seq_calls(
+            seq_record,
+            strain,
+            polynuc_thres,
+            entropy_thres,
+            nb_scanned_nt,
+            stop_after,
+            motif_sets,
+            track_store,
+            raw,
+        )
+        df_chro, calls, merged_calls = result
+        if not raw:
+            result = (None, calls, merged_calls)
+        elif scratch_dir is not None:
+            with stage("transport"):
+                nb_W = int((df_chro.index.codes[3] == 0).sum())
+                raw_arrays = write_raw_arrays(
+                    scratch_dir, f"{fasta_index}_{seq_index}", df_chro, nb_W
+                )
+            result = (raw_arrays, calls, merged_calls)
+    if record is not None:
+        record.update(strain=strain, chrom=seq_record.name, length=seq_record.length)
+    return fasta_index, seq_index, result, record
+
+
+def get_chunk_tasks(task, chunk_size, size=20):
+    """Split the task of a whole sequence scan into tasks scoring the windows of
+    chunks of the sequence in parallel (see run_chunk_task). Chunks overlap by
+    size - 1 bases, so that each window is scored once, with all its bases.
+
+    :param task: a task of get_seq_tasks
+    :param chunk_size: number of windows of each chunk
+    :param size: size of the sliding window
+    :return: list of (fasta index, sequence index, sequence, strain, (start, end))
+        tuples, start and end being the W strand starts of the first and past the
+        last windows of the chunk
+    """
+    fasta_index, seq_index, seq, strain = task
+    nb_windows = seq.length - size + 1
+    chunk_tasks = []
+    for start in range(0, nb_windows, chunk_size):
+        end = min(start + chunk_size, nb_windows)
+        chunk_seq = seq
+        if isinstance(seq, SeqEnds):
+            # sequence read in memory: only the bases of the chunk are sent
+            chunk_seq = seq._replace(left=seq.left[start : end + size - 1], right=None)
+        chunk_tasks.append((fasta_index, seq_index, chunk_seq, strain, (start, end)))
+    return chunk_tasks
+
+
+def split_seq_tasks(tasks, chunk_size, nb_scanned_nt, size=20):
+    """Replace the tasks of the sequences longer than chunk_size by chunk tasks,
+    see get_chunk_tasks
+
+    :param tasks: list of tasks of get_seq_tasks
+    :param chunk_size: number of windows of each chunk
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :return: a tuple of the list of tasks, the largest first, and of a dictionary
+        of the number of chunks of each split sequence by (fasta index, sequence index)
+    """
+    split_tasks = []
+    nb_chunks = {}
+    for task in tasks:
+        if task[2].length - size + 1 > chunk_size:
+            chunk_tasks = get_chunk_tasks(task, chunk_size, size)
+            nb_chunks[(task[0], task[1])] = len(chunk_tasks)
+            split_tasks.extend(chunk_tasks)
+        else:
+            split_tasks.append(task)
+
+    def get_task_size(task):
+        if len(task) == 5:
+            return task[4][1] - task[4][0]
+        return get_scan_limit(task[2].length, nb_scanned_nt)
+
+    split_tasks.sort(key=get_task_size, reverse=True)
+    return split_tasks, nb_chunks
+
+
+ChunkResult = namedtuple("ChunkResult", ["start", "groups", "metric_chunk"])
+ChunkResult.__doc__ = """Result of a chunk task sent back to the parent process (see
+run_chunk_task): the W strand start of the first window of the chunk, the runs of
+telomeric windows of the chunk for each prediction column and strand, in
+positions of the whole sequence, and the MetricChunk of the raw dataframe columns
+of the chunk, None when the raw dataframe is not needed."""
+
+
+def run_chunk_task(
+    task,
+    polynuc_thres,
+    entropy_thres,
+    motif_sets,
+    scratch_dir,
+    profile=False,
+    cprofile_dir=None,
+    size=20,
+):
+    """Score the windows of a chunk task of get_chunk_tasks on both strands and
+    find the runs of telomeric windows of the chunk, so that only these runs are
+    sent back to the parent process. With a scratch_dir, the raw dataframe
+    columns of the chunk are also written to a scratch file.
+
+    :param task: a chunk task of get_chunk_tasks
+    :param motif_sets: see run_on_single_seq
+    :param scratch_dir: scratch directory of the run (see telofinder.scratch), None
+        not to write the raw dataframe columns
+    :param profile: profile the chunk (see telofinder.profiling.profile_task)
+    :param cprofile_dir: see run_seq_task
+    :return: a tuple of fasta index, sequence index, ChunkResult and the profile
+        record of the chunk, None when not profiling
+    """
+    fasta_index, seq_index, seq, strain, (start, end) = task
+    log_event(
+        "chunk_start",
+        f"chromosome {seq.name} chunk {start}-{end} started",
+        logging.DEBUG,
+        strain=strain,
+        chrom=seq.name,
+        start=start,
+        end=end,
+    )
+    cprofile_path = None
+    if cprofile_dir is not None:
+        cprofile_path = get_cprofile_path(cprofile_dir, strain, seq.name, start)
+
+    with profile_task(profile, cprofile_path) as record:
+        with stage("parsing"):
+            if isinstance(seq, SeqEnds):
+                bases = seq.left
+            else:
+                bases = read_seq_chunk(seq, start, end + size - 1)
+        with stage("window_scoring"):
+            metrics = compute_strand_metrics(
+                encode_sequence(bases), size, motif_sets=motif_sets
+            )
+            columns = {
+                strand: get_metric_columns(
+                    metrics[strand], polynuc_thres, entropy_thres, motif_sets
+                )
+                for strand in ["W", "C"]
+            }
+        with stage("grouping"):
+            groups = get_chunk_groups(columns, start, size)
+        metric_chunk = None
+        if scratch_dir is not None:
+            with stage("transport"):
+                metric_chunk = write_metric_chunk(
+                    scratch_dir, f"{fasta_index}_{seq_index}_{start}", start, columns
+                )
+
+    log_event(
+        "chunk_done",
+        f"chromosome {seq.name} chunk {start}-{end} done",
+        logging.DEBUG,
+        strain=strain,
+        chrom=seq.name,
+        start=start,
+        end=end,
+    )
+    if record is not None:
+        # the last chunk also holds the bases of the last window
+        length = (seq.length if end == seq.length - size + 1 else end) - start
+        record.update(strain=strain, chrom=seq.name, length=length, chunk=[start, end])
+    return fasta_index, seq_index, ChunkResult(start, groups, metric_chunk), record
 
-    telo_df["strain"] = strain
-    telo_df = telo_df[["strain", "chrom", "side", "type", "start", "end"]]
 
-    print(f"chromosome {seq_record.name} done")
+def get_chunk_groups(columns, start, size=20):
+    """Get the runs of telomeric windows of a chunk, see get_consecutive_groups
 
-    return (df_chro, telo_df, telo_df_merged)
+    :param columns: dictionary of the raw dataframe columns of each strand of the
+        chunk (see get_metric_columns), ordered by W strand window start
+    :param start: W strand start of the first window of the chunk
+    :param size: size of the sliding window
+    :return: dictionary of the runs of each strand for each prediction column, in
+        positions of the whole sequence. The position of a C strand window is the
+        position of its last base on the W strand.
+    """
+    offsets = {"W": start, "C": start + size - 1}
+    return {
+        name: {
+            strand: get_position_runs(
+                offsets[strand] + np.flatnonzero(columns[strand][name] == 1)
+            )
+            for strand in ["W", "C"]
+        }
+        for name in columns["W"]
+        if name.startswith("predict_telom")
+    }
 
 
-def run_on_single_fasta(
-    fasta_path, polynuc_thres, entropy_thres, nb_scanned_nt, threads
-):
-    """Run the telomere detection algorithm on a single fasta file
+def join_chunk_groups(chunk_groups):
+    """Join the runs of telomeric windows of the consecutive chunks of a sequence:
+    a run ending at the last window of a chunk goes on with the run starting at
+    the first window of the next chunk
 
-    :param fasta_path: path to fasta file
-    :return: a tuple of df, telo_df and telo_df_merged
+    :param chunk_groups: list of the runs of each strand of the chunks, in the
+        order of the chunks (see get_chunk_groups)
+    :return: dictionary of the runs of each strand of the sequence, see
+        get_consecutive_groups
+    """
+    telo_groups = {"W": [], "C": []}
+    for groups in chunk_groups:
+        for strand, runs in telo_groups.items():
+            for run_start, run_end in groups[strand]:
+                if runs and run_start == runs[-1][1] + 1:
+                    runs[-1] = (runs[-1][0], run_end)
+                else:
+                    runs.append((run_start, run_end))
+    return telo_groups
+
+
+def get_chunk_calls(chunk_results, seq, strain, motif_sets=None, track_store=None):
+    """Call the telomeres of a sequence scored in chunks from the runs of
+    telomeric windows of its chunks, see get_seq_calls. The raw dataframe is only
+    rebuilt when the chunks wrote their columns to scratch files.
+
+    :param chunk_results: list of the ChunkResult of all the chunks of the sequence
+    :param seq: the sequence of the chunks
+    :return: a tuple of df_chro, None without scratch files, and of the lists of
+        TelomereCall and of merged TelomereCall
     """
-    strain = get_strain_name(fasta_path)
-    print("\n", "-------------------------------", "\n")
-    print(f"file {strain} executed")
+    chunk_results = sorted(chunk_results, key=lambda result: result.start)
+    df_chro = None
+    if chunk_results[0].metric_chunk is not None:
+        with stage("stitch"):
+            df_chro = stitch_metric_chunks(
+                strain,
+                seq.name,
+                seq.length,
+                [result.metric_chunk for result in chunk_results],
+            )
+
+    calls, merged_calls = [], []
+    for motif_set in get_motif_set_names(motif_sets):
+        column = get_predict_column(motif_set)
+        with stage("grouping"):
+            telo_groups = join_chunk_groups(
+                [result.groups[column] for result in chunk_results]
+            )
+        set_calls, set_merged_calls = get_group_calls(
+            telo_groups, strain, seq.name, seq.length, motif_set
+        )
+        calls.extend(set_calls)
+        merged_calls.extend(set_merged_calls)
+
+    if track_store is not None:
+        with stage("tracks"):
+            write_tracks(track_store, df_chro, seq.length, motif_sets=motif_sets)
+
+    log_seq_done(seq.name, seq.length, strain)
+    return df_chro, calls, merged_calls
+
+
+def stitch_metric_chunks(strain, chrom, chrom_len, metric_chunks, size=20):
+    """Stitch the raw dataframe columns of the chunks of a sequence back together
+    into the raw dataframe of the sequence. The scratch file of each chunk is
+    copied and released before the next one is opened.
 
-    partial_ross = partial(
-        run_on_single_seq,
+    :param metric_chunks: list of the MetricChunk of all the chunks of the sequence
+    :param size: size of the sliding window
+    :return: the raw dataframe indexed by (strain, chrom, position, strand)
+    """
+    nb_W = chrom_len - size + 1
+    names = metric_chunks[0].names
+    # one row per column, as the scratch files of get_scratch_raw_df
+    values = np.empty((len(names), 2 * nb_W), dtype=np.float32)
+    for chunk in metric_chunks:
+        columns = open_metric_chunk(chunk)
+        end = chunk.start + len(columns["W"][names[0]])
+        for i, name in enumerate(names):
+            values[i, chunk.start : end] = columns["W"][name]
+            # C windows from the right end of the chromosome
+            values[i, 2 * nb_W - end : 2 * nb_W - chunk.start] = columns["C"][name][::-1]
+        del columns
+
+    pos_W = np.arange(nb_W)
+    pos_C = chrom_len - np.arange(nb_W) - 1
+    return pd.DataFrame(
+        values.T,
+        index=get_raw_index(strain, chrom, pos_W, pos_C),
+        columns=names,
+        copy=False,
+    )
+
+
+def log_seq_start(seq_record, strain):
+    """Log the start of a sequence by a worker process (see telofinder.progress)"""
+    log_event(
+        "sequence_start",
+        f"chromosome {seq_record.name} started",
+        logging.DEBUG,
         strain=strain,
+        chrom=seq_record.name,
+        length=seq_record.length,
+    )
+
+
+def log_seq_done(chrom, chrom_len, strain):
+    """Log the end of a sequence, see log_seq_start"""
+    log_event(
+        "sequence_done",
+        f"chromosome {chrom} done",
+        logging.DEBUG,
+        strain=strain,
+        chrom=chrom,
+        length=chrom_len,
+    )
+
+
+def concat_seq_results(results):
+    """Concatenate the get_seq_calls results of the sequences of a fasta file,
+    the telomere calls being converted to dataframes only here
+
+    :param results: list of (df_chro, calls, merged_calls) tuples
+    :return: a tuple of df, telo_df and telo_df_merged
+    """
+    raw_dfs = [r[0] for r in results if r[0] is not None]
+    raw_df = pd.concat(raw_dfs) if raw_dfs else None
+
+    telo_df = get_calls_df([call for r in results for call in r[1]])
+    telo_df_merged = get_calls_df(
+        [call for r in results for call in r[2]], merged=True
+    )
+    # rows are indexed within their sequence, as when concatenating per sequence tables
+    telo_df.index = [i for r in results for i in range(len(r[1]))]
+    telo_df_merged.index = [i for r in results for i in range(len(r[2]))]
+
+    return raw_df, telo_df, telo_df_merged
+
+
+StreamedFasta = namedtuple("StreamedFasta", ["fasta_index", "path", "strain"])
+StreamedFasta.__doc__ = """A fasta file that cannot be indexed, e.g. gzip compressed or the
+standard input, listed by get_seq_tasks instead of its sequences. Its sequences are
+parsed one at a time while the pool runs, see iter_streamed_tasks."""
+
+
+def log_fasta_seqs(fasta_path, strain, nb_seqs):
+    """Log the number of sequences of a fasta file, with a warning if there are none"""
+    if not nb_seqs:
+        log_event(
+            "no_sequence",
+            f"No sequence found in '{fasta_path}'",
+            logging.WARNING,
+            fasta=str(fasta_path),
+        )
+    else:
+        log_event(
+            "file",
+            f"file {strain}: {nb_seqs} sequences",
+            fasta=str(fasta_path),
+            strain=strain,
+            nb_sequences=nb_seqs,
+        )
+
+
+def get_seq_tasks(fasta_paths, nb_scanned_nt, profile=None):
+    """List the sequences of several fasta files as tasks for run_seq_task,
+    the largest first. The files that cannot be indexed are not parsed here but
+    listed after the tasks as a StreamedFasta, so that whole sequences are not all
+    held in memory before the run.
+
+    :param fasta_paths: list of paths to fasta files
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :param profile: a run report (see telofinder.profiling.new_report) or None
+    :return: a list of (fasta index, sequence index, sequence, strain) tuples,
+        followed by a StreamedFasta for each file to parse as a stream
+    """
+    tasks = []
+    streamed_fastas = []
+
+    for fasta_index, fasta_path in enumerate(fasta_paths):
+        strain = get_strain_name(fasta_path)
+        add_file_info(profile, fasta_index, fasta=str(fasta_path), strain=strain)
+        with collect_stages(get_report_stages(profile, fasta_index)), stage("parsing"):
+            seqs = get_indexed_seqs(fasta_path)
+        if seqs is None:
+            streamed_fastas.append(StreamedFasta(fasta_index, fasta_path, strain))
+            continue
+        log_fasta_seqs(fasta_path, strain, len(seqs))
+        for seq_index, seq in enumerate(seqs):
+            tasks.append((fasta_index, seq_index, seq, strain))
+
+    tasks.sort(
+        key=lambda task: get_scan_limit(task[2].length, nb_scanned_nt), reverse=True
+    )
+    return tasks + streamed_fastas
+
+
+def split_streamed_fastas(tasks):
+    """Separate the tasks of get_seq_tasks from its StreamedFasta
+
+    :param tasks: list of tasks from get_seq_tasks
+    :return: a tuple of the list of tasks and of the list of StreamedFasta
+    """
+    streamed_fastas = [task for task in tasks if isinstance(task, StreamedFasta)]
+    tasks = [task for task in tasks if not isinstance(task, StreamedFasta)]
+    return tasks, streamed_fastas
+
+
+def iter_streamed_tasks(streamed_fastas, nb_scanned_nt, progress, profile=None):
+    """Parse the sequences of fasta files listed as StreamedFasta by get_seq_tasks
+    into tasks for run_seq_task, one sequence at a time, adding each sequence to
+    the progress of the run. Meant to be iterated by the task feeder thread of a
+    pool (see Pool.imap_unordered), so that a sequence is only parsed once the
+    workers took the previous ones.
+
+    :param streamed_fastas: list of StreamedFasta
+    :param nb_scanned_nt: number of scanned nucleotides at each end, -1 for the whole sequence
+    :param progress: progress of the run, see telofinder.progress.new_progress
+    :param profile: a run report (see telofinder.profiling.new_report) or None
+    :return: a generator of (fasta index, sequence index, sequence, strain) tuples
+    """
+    for fasta_index, fasta_path, strain in streamed_fastas:
+        seqs = parse_fasta(fasta_path, nb_scanned_nt)
+        seq_index = 0
+        while True:
+            with thread_stage(get_report_stages(profile, fasta_index), "parsing"):
+                seq = next(seqs, None)
+            if seq is None:
+                break
+            task = (fasta_index, seq_index, seq, strain)
+            add_progress_task(progress, task, nb_scanned_nt)
+            yield task
+            seq_index += 1
+        log_fasta_seqs(fasta_path, strain, seq_index)
+
+
+def iter_cached_results(cached_results, progress, motif_sets=None, track_store=None):
+    """Yield the results of the sequences loaded from the cache, counting them in
+    the progress of the run and writing their tracks
+
+    :param cached_results: deque of (fasta index, sequence index, sequence,
+        run_on_single_seq results) tuples, emptied
+    :param progress: progress of the run, see telofinder.progress.new_progress
+    :return: a generator of (fasta index, sequence index, run_on_single_seq results)
+    """
+    while cached_results:
+        fasta_index, seq_index, seq, result = cached_results.popleft()
+        update_progress(progress, (fasta_index, seq_index), cached=True)
+        if track_store is not None:
+            write_tracks(track_store, result[0], seq.length, motif_sets=motif_sets)
+        yield fasta_index, seq_index, result
+
+
+def iter_seq_results(
+    tasks,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    threads,
+    fasta_paths=None,
+    cache=None,
+    stop_after=None,
+    motif_sets=None,
+    track_store=None,
+    profile=None,
+    raw=True,
+    chunk_size=CHUNK_SIZE,
+):
+    """Run the telomere detection algorithm on the sequences of several fasta
+    files with a single pool of processes. With a cache, the sequences already
+    computed with the same parameters are loaded instead, and the others are
+    saved as soon as they are done so that interrupted runs can be resumed.
+    The raw metrics of the computed sequences are passed from the worker
+    processes through memory-mapped scratch files rather than pickled. In whole
+    sequence scans, the sequences longer than chunk_size are scored in chunks
+    in parallel. Each chunk only sends back its runs of telomeric windows, which
+    are joined to call the telomeres once all chunks are done. The sequences of
+    the files parsed as a stream are parsed while the pool runs, after the
+    sequences of the indexed files, so that only the sequences being run are
+    held in memory.
+
+    :param tasks: list of tasks from get_seq_tasks
+    :param threads: total number of processes
+    :param fasta_paths: list of paths to the fasta files of the tasks, needed with a cache
+    :param cache: a ResultCache or None to disable caching
+    :param stop_after: see run_on_single_seq
+    :param motif_sets: see run_on_single_seq
+    :param track_store: see run_on_single_seq
+    :param profile: a run report (see telofinder.profiling.new_report) to add the
+        profile of each computed sequence to, None not to profile the run
+    :param raw: get the raw dataframe of the computed sequences, otherwise None is
+        yielded in its place. Without raw, the cache only holds the telomere calls,
+        in entries of their own. With a track_store, the cached raw dataframes are
+        needed to write the tracks of the sequences loaded from the cache, raw is
+        then always on.
+    :param chunk_size: number of windows of the chunks of the sequences scanned
+        whole (nb_scanned_nt=-1 without stop_after), None not to split sequences
+    :return: a generator of (fasta index, sequence index, run_on_single_seq results), in order of completion
+    """
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError(f"The chunk size must be at least 1 window, got {chunk_size}")
+    tasks, streamed_fastas = split_streamed_fastas(tasks)
+    progress = new_progress(tasks, nb_scanned_nt)
+    entry_dirs = {}
+    cached_results = deque()
+    if cache is not None:
+        raw = raw or track_store is not None
+        strains = {task[0]: task[3] for task in tasks}
+        strains.update(
+            (streamed_fasta.fasta_index, streamed_fasta.strain)
+            for streamed_fasta in streamed_fastas
+        )
+        for fasta_index, strain in strains.items():
+            entry_dirs[fasta_index] = get_entry_dir(
+                cache,
+                fasta_paths[fasta_index],
+                strain,
+                polynuc_thres,
+                entropy_thres,
+                nb_scanned_nt,
+                POLYNUCLEOTIDE_LIST,
+                stop_after,
+                motif_sets,
+                raw,
+            )
+
+        remaining_tasks = []
+        for task in tasks:
+            fasta_index, seq_index, seq, _ = task
+            with collect_stages(get_report_stages(profile, fasta_index)):
+                with stage("cache"):
+                    result = load_seq_result(entry_dirs[fasta_index], seq_index)
+            if result is None:
+                remaining_tasks.append(task)
+            else:
+                cached_results.append((fasta_index, seq_index, seq, result))
+                yield from iter_cached_results(
+                    cached_results, progress, motif_sets, track_store
+                )
+        tasks = remaining_tasks
+
+    partial_task = partial(
+        run_seq_task,
         polynuc_thres=polynuc_thres,
         entropy_thres=entropy_thres,
         nb_scanned_nt=nb_scanned_nt,
+        stop_after=stop_after,
+        motif_sets=motif_sets,
+        track_store=track_store,
+        profile=profile is not None,
+        cprofile_dir=None if profile is None else profile["cprofile_dir"],
     )
 
-    with Pool(threads) as p:
+    if tasks or streamed_fastas:
+        seqs = {(task[0], task[1]): (task[2], task[3]) for task in tasks}
+        nb_chunks = {}
+        split = (
+            chunk_size is not None
+            and threads > 1
+            and nb_scanned_nt == -1
+            and stop_after is None
+        )
+        if split:
+            tasks, nb_chunks = split_seq_tasks(tasks, chunk_size, nb_scanned_nt)
+
+        def iter_pool_tasks():
+            # run by the task feeder thread of the pool: the sequences of the
+            # streamed files are parsed, looked up in the cache and split there
+            yield from tasks
+            for task in iter_streamed_tasks(
+                streamed_fastas, nb_scanned_nt, progress, profile
+            ):
+                fasta_index, seq_index, seq, strain = task
+                # only the name and length of the sequence are kept
+                seq_info = seq._replace(left=None, right=None)
+                if cache is not None:
+                    result = load_seq_result(entry_dirs[fasta_index], seq_index)
+                    if result is not None:
+                        cached_results.append(
+                            (fasta_index, seq_index, seq_info, result)
+                        )
+                        continue
+                seqs[(fasta_index, seq_index)] = (seq_info, strain)
+                if split:
+                    seq_tasks, seq_chunks = split_seq_tasks(
+                        [task], chunk_size, nb_scanned_nt
+                    )
+                    nb_chunks.update(seq_chunks)
+                    yield from seq_tasks
+                else:
+                    yield task
+
+        # the raw dataframe of a sequence scored in chunks is rebuilt in the parent
+        # process to write its tracks
+        keep_raw = raw or (split and track_store is not None)
+        scratch_dir = new_scratch_dir() if keep_raw else None
+        partial_task = partial(partial_task, raw=raw, scratch_dir=scratch_dir)
+        chunks = {}
+        try:
+            with worker_events(progress) as (initializer, initargs):
+                with Pool(threads, initializer, initargs) as p:
+                    for fasta_index, seq_index, result, record in iter_with_heartbeat(
+                        p.imap_unordered(partial_task, iter_pool_tasks()), progress
+                    ):
+                        yield from iter_cached_results(
+                            cached_results, progress, motif_sets, track_store
+                        )
+                        key = (fasta_index, seq_index)
+                        add_sequence_record(profile, fasta_index, record)
+                        if isinstance(result, ChunkResult):
+                            chunks.setdefault(key, []).append(result)
+                            if len(chunks[key]) < nb_chunks[key]:
+                                continue
+                            result = chunks.pop(key)
+                        seq, strain = seqs.pop(key)
+                        with collect_stages(get_report_stages(profile, fasta_index)):
+                            result = get_pool_result(
+                                result, seq, strain, motif_sets, track_store, raw
+                            )
+                        update_progress(progress, key)
+                        if cache is not None:
+                            save_seq_result(entry_dirs[fasta_index], seq_index, result)
+                        yield fasta_index, seq_index, result
+                    # let the workers send their last events before they are stopped
+                    p.close()
+                    p.join()
+            yield from iter_cached_results(
+                cached_results, progress, motif_sets, track_store
+            )
+        finally:
+            if scratch_dir is not None:
+                remove_scratch_dir(scratch_dir)
 
-        results = p.map(partial_ross, SeqIO.parse(fasta_path, "fasta"))
+    if cache is not None:
+        evict(cache)
 
-    raw_df = pd.concat([r[0] for r in results])
 
-    telo_df = pd.concat([r[1] for r in results])
-    telo_df["len"] = telo_df["end"] - telo_df["start"] + 1
-    telo_df = telo_df.astype({"start": "Int64", "end": "Int64", "len": "Int64"})
+def get_pool_result(result, seq, strain, motif_sets=None, track_store=None, raw=True):
+    """Get the get_seq_calls results of a sequence in the parent process from
+    the results of its pool tasks: the raw dataframe is rebuilt from its
+    RawArrays, and the telomeres of a sequence scored in chunks are called from
+    the runs of telomeric windows of its chunks (see get_chunk_calls)
 
-    telo_df_merged = pd.concat([r[2] for r in results])
-    telo_df_merged["len"] = telo_df_merged["end"] - telo_df_merged["start"] + 1
-    telo_df_merged = telo_df_merged.astype(
-        {"start": "Int64", "end": "Int64", "len": "Int64", "chrom_size": "Int64"}
+    :param result: the results of run_seq_task, or the list of the ChunkResult
+        of all the chunks of the sequence
+    :param seq: the sequence of the task
+    :param raw: keep the raw dataframe, otherwise None is returned in its place
+    :return: the get_seq_calls results
+    """
+    if isinstance(result, list):
+        df_chro, calls, merged_calls = get_chunk_calls(
+            result, seq, strain, motif_sets, track_store
+        )
+        return (df_chro if raw else None, calls, merged_calls)
+    if isinstance(result[0], RawArrays):
+        with stage("transport"):
+            df_chro = get_scratch_raw_df(strain, seq.name, seq.length, result[0])
+        return (df_chro, *result[1:])
+    return result
+
+
+def iter_fasta_results(
+    fasta_paths,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    threads,
+    cache=None,
+    stop_after=None,
+    motif_sets=None,
+    track_store=None,
+    profile=None,
+    chunk_size=CHUNK_SIZE,
+):
+    """Run the telomere detection algorithm on several fasta files with a single
+    pool of processes. The sequences of all files are scheduled together, the
+    largest first, and those of the files parsed as a stream last. The results of
+    these files are yielded at the end of the run.
+
+    :param fasta_paths: list of paths to fasta files
+    :param threads: total number of processes
+    :param cache: a ResultCache or None to disable caching
+    :param stop_after: see run_on_single_seq
+    :param motif_sets: see run_on_single_seq
+    :param track_store: see run_on_single_seq
+    :param profile: see iter_seq_results
+    :param chunk_size: see iter_seq_results
+    :return: a generator of (fasta index, (df, telo_df, telo_df_merged)), in order of completion
+    """
+    tasks = get_seq_tasks(fasta_paths, nb_scanned_nt, profile)
+    seq_tasks, streamed_fastas = split_streamed_fastas(tasks)
+    remaining = Counter(task[0] for task in seq_tasks)
+    results = {fasta_index: {} for fasta_index in remaining}
+    results.update(
+        (streamed_fasta.fasta_index, {}) for streamed_fasta in streamed_fastas
     )
-    telo_df_merged = telo_df_merged[
-        ["strain", "chrom", "side", "type", "start", "end", "len", "chrom_size"]
-    ]
 
-    return raw_df, telo_df, telo_df_merged
+    for fasta_index, seq_index, result in iter_seq_results(
+        tasks,
+        polynuc_thres,
+        entropy_thres,
+        nb_scanned_nt,
+        threads,
+        fasta_paths,
+        cache,
+        stop_after,
+        motif_sets,
+        track_store,
+        profile,
+        chunk_size=chunk_size,
+    ):
+        results[fasta_index][seq_index] = result
+        if fasta_index not in remaining:
+            continue
+        remaining[fasta_index] -= 1
+        if remaining[fasta_index] == 0:
+            fasta_results = results.pop(fasta_index)
+            yield fasta_index, concat_seq_results(
+                [fasta_results[i] for i in sorted(fasta_results)]
+            )
+
+    # the number of sequences of the files parsed as a stream is only known once
+    # they are parsed
+    for fasta_index, fasta_results in results.items():
+        if fasta_results:
+            yield fasta_index, concat_seq_results(
+                [fasta_results[i] for i in sorted(fasta_results)]
+            )
+
+
+def run_and_export(
+    fasta_paths,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    threads,
+    raw,
+    outdir="telofinder_results",
+    cache=None,
+    raw_format="csv",
+    stop_after=None,
+    motif_sets=None,
+    track_store=None,
+    profile=None,
+    chunk_size=CHUNK_SIZE,
+):
+    """Run the telomere detection algorithm on fasta files, appending the results
+    of each sequence to the output files as soon as it is done. Only the telomere
+    tables are kept in memory, they are rewritten in the order of the input files
+    and sequences at the end of the run.
+
+    :param fasta_paths: list of paths to fasta files
+    :param raw: also output the raw dataframe
+    :param cache: a ResultCache or None to disable caching
+    :param raw_format: 'csv' or 'parquet'. In parquet, each sequence is written as
+        a row group of raw_df.parquet, which is only valid once the run is over.
+    :param stop_after: see run_on_single_seq
+    :param motif_sets: see run_on_single_seq
+    :param track_store: see run_on_single_seq
+    :param profile: see iter_seq_results
+    :param chunk_size: see iter_seq_results
+    :return: a tuple of telo_df and telo_df_merged
+    """
+    outdir = Path(outdir)
+    clear_results(outdir)
+    outdir.mkdir(exist_ok=True)
+    seq_calls = {}
+
+    raw_writer = None
+    if raw and raw_format == "parquet":
+        raw_writer = open_raw_writer(
+            outdir / "raw_df.parquet", get_raw_columns(motif_sets)
+        )
+
+    tasks = get_seq_tasks(fasta_paths, nb_scanned_nt, profile)
+
+    try:
+        for fasta_index, seq_index, result in iter_seq_results(
+            tasks,
+            polynuc_thres,
+            entropy_thres,
+            nb_scanned_nt,
+            threads,
+            fasta_paths,
+            cache,
+            stop_after,
+            motif_sets,
+            track_store,
+            profile,
+            raw,
+            chunk_size,
+        ):
+            raw_df, calls, merged_calls = result
+            with collect_stages(get_report_stages(profile, fasta_index)):
+                with stage("export"):
+                    # the calls are appended without building dataframes
+                    append_calls(calls, merged_calls, outdir)
+                    if raw_writer is not None:
+                        write_raw_row_group(raw_writer, raw_df)
+                    elif raw:
+                        write_table(raw_df, outdir / "raw_df.csv", True, index=True)
+            seq_calls[(fasta_index, seq_index)] = (calls, merged_calls)
+    finally:
+        if raw_writer is not None:
+            raw_writer.close()
+        elif raw:
+            # the raw rows are only flushed per sequence, sync them once
+            sync_file(outdir / "raw_df.csv")
+
+    if not seq_calls:
+        raise ValueError("No sequence found in the fasta files")
+
+    _, total_telom_df, total_merged_telom_df = concat_seq_results(
+        [(None, *seq_calls[key]) for key in sorted(seq_calls)]
+    )
+    with collect_stages(get_report_stages(profile)), stage("export"):
+        export_results(None, total_telom_df, total_merged_telom_df, False, outdir)
+
+    return total_telom_df, total_merged_telom_df
+
+
+def run_on_single_fasta(
+    fasta_path,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    threads,
+    cache=None,
+    stop_after=None,
+    motif_sets=None,
+    track_store=None,
+    profile=None,
+    chunk_size=CHUNK_SIZE,
+):
+    """Run the telomere detection algorithm on a single fasta file
+
+    :param fasta_path: path to fasta file
+    :param cache: a ResultCache or None to disable caching
+    :param stop_after: see run_on_single_seq
+    :param motif_sets: see run_on_single_seq
+    :param track_store: see run_on_single_seq
+    :param profile: see iter_seq_results
+    :param chunk_size: see iter_seq_results
+    :return: a tuple of df, telo_df and telo_df_merged
+    """
+    for _, fasta_results in iter_fasta_results(
+        [fasta_path],
+        polynuc_thres,
+        entropy_thres,
+        nb_scanned_nt,
+        threads,
+        cache,
+        stop_after,
+        motif_sets,
+        track_store,
+        profile,
+        chunk_size,
+    ):
+        return fasta_results
+
+    raise ValueError(f"No sequence found in '{fasta_path}'")
+
+
+FASTA_PATTERNS = ["*.fasta", "*.fas", "*.fa", "*.fsa"]
+
+
+def get_fasta_paths(fasta_dir_path):
+    """List the fasta files of a directory
+
+    :param fasta_dir_path: path to fasta directory
+    :return: list of paths to the '*.fasta', '*.fas', '*.fa' and '*.fsa' files,
+        and to these files compressed with gzip or bgzip ('*.fa.gz', '*.fa.bgz'...)
+    """
+    fasta_paths = []
+    for ext in FASTA_PATTERNS:
+        fasta_paths.extend(Path(fasta_dir_path).glob(ext))
+    for ext in FASTA_PATTERNS:
+        for suffix in COMPRESSED_SUFFIXES:
+            fasta_paths.extend(Path(fasta_dir_path).glob(ext + suffix))
+    return fasta_paths
 
 
 def run_on_fasta_dir(
-    fasta_dir_path, polynuc_thres, entropy_thres, nb_scanned_nt, threads
+    fasta_dir_path,
+    polynuc_thres,
+    entropy_thres,
+    nb_scanned_nt,
+    threads,
+    cache=None,
+    stop_after=None,
+    motif_sets=None,
+    track_store=None,
+    profile=None,
+    chunk_size=CHUNK_SIZE,
 ):
-    """Run iteratively the telemore detection algorithm on all fasta files in a directory
+    """Run the telemore detection algorithm on all fasta files in a directory.
+    All sequences of all files are processed by a single pool of processes.
 
     :param fasta_dir: path to fasta directory
+    :param threads: total number of processes
+    :param cache: a ResultCache or None to disable caching
+    :param stop_after: see run_on_single_seq
+    :param motif_sets: see run_on_single_seq
+    :param track_store: see run_on_single_seq
+    :param profile: see iter_seq_results
+    :param chunk_size: see iter_seq_results
     :return: a tuple of df, telo_df and telo_df_merged
     """
-    raw_dfs = []
-    telom_dfs = []
-    merged_telom_dfs = []
+    fasta_paths = get_fasta_paths(fasta_dir_path)
+    fasta_results = [None] * len(fasta_paths)
+
+    for fasta_index, results in iter_fasta_results(
+        fasta_paths,
+        polynuc_thres,
+        entropy_thres,
+        nb_scanned_nt,
+        threads,
+        cache,
+        stop_after,
+        motif_sets,
+        track_store,
+        profile,
+        chunk_size,
+    ):
+        fasta_results[fasta_index] = results
+
+    # keep the results in the order of the files
+    fasta_results = [results for results in fasta_results if results is not None]
+    total_raw_df = pd.concat([r[0] for r in fasta_results])
+    total_telom_df = pd.concat([r[1] for r in fasta_results])
+    total_merged_telom_df = pd.concat([r[2] for r in fasta_results])
+
+    return total_raw_df, total_telom_df, total_merged_telom_df
 
-    for ext in ["*.fasta", "*.fas", "*.fa", "*.fsa"]:
-        for fasta in fasta_dir_path.glob(ext):
 
-            raw_df, telom_df, merged_telom_df = run_on_single_fasta(
-                fasta, polynuc_thres, entropy_thres, nb_scanned_nt, threads
+def run_on_track_store(
+    store_dir, polynuc_thres, entropy_thres, strains=None, chroms=None
+):
+    """Run the telomere detection on the metric tracks of a track store instead of
+    scanning the fasta files again. Predictions use the stored float32 metrics.
+    The tracks of a run with motif sets are called for each set, with the
+    thresholds of the set stored in the track store (polynuc_thres and
+    entropy_thres are then unused), see telofinder.tracks.load_raw_region.
+
+    :param store_dir: path to a track store written with track_store
+    :param strains: list of strains, default is all strains of the store
+    :param chroms: list of chromosomes, default is all chromosomes of the store
+    :return: a tuple of telo_df and telo_df_merged
+    :raises ValueError: if the tracks of a sequence have no telomere prediction,
+        e.g. motif set tracks stored without the thresholds of their sets
+    """
+    results = []
+    for strain, chrom, chrom_size in list_tracks(store_dir)[
+        ["strain", "chrom", "chrom_size"]
+    ].itertuples(index=False):
+        if (strains is not None and strain not in strains) or (
+            chroms is not None and chrom not in chroms
+        ):
+            continue
+        df_chro = load_raw_region(
+            store_dir,
+            strain,
+            chrom,
+            polynuc_thres=polynuc_thres,
+            entropy_thres=entropy_thres,
+        )
+        columns = [
+            name for name in df_chro.columns if name.startswith("predict_telom")
+        ]
+        if not columns:
+            raise ValueError(
+                f"No telomere prediction for the tracks of '{chrom}' of '{strain}'"
+                f" in the track store '{store_dir}'"
+            )
+        calls, merged_calls = [], []
+        for column in columns:
+            motif_set = None
+            if column != "predict_telom":
+                motif_set = column[len("predict_telom_") :]
+            set_calls, set_merged_calls = get_telomere_calls(
+                df_chro, strain, chrom, chrom_size, column, motif_set
             )
-            raw_dfs.append(raw_df)
-            telom_dfs.append(telom_df)
-            merged_telom_dfs.append(merged_telom_df)
+            calls.extend(set_calls)
+            merged_calls.extend(set_merged_calls)
+        results.append((None, calls, merged_calls))
+    if not results:
+        raise ValueError(f"No sequence found in the track store '{store_dir}'")
+    _, telo_df, telo_df_merged = concat_seq_results(results)
+    return telo_df, telo_df_merged
 
-    total_raw_df = pd.concat(raw_dfs)
-    total_telom_df = pd.concat(telom_dfs)
-    total_merged_telom_df = pd.concat(merged_telom_dfs)
 
-    return total_raw_df, total_telom_df, total_merged_telom_df
+def sweep_single_seq(
+    seq_record, strain, thresholds, nb_scanned_nt, stop_after=None, motif_sets=None
+):
+    """Run the telomere detection algorithm on a single sequence for several
+    threshold pairs, computing the window metrics only once. With stop_after, the
+    scanned windows depend on the thresholds and the ends are scanned again for
+    each pair.
+
+    :param seq_record: see run_on_single_seq
+    :param thresholds: list of (polynuc_thres, entropy_thres) tuples
+    :param stop_after: see run_on_single_seq
+    :param motif_sets: see run_on_single_seq, each threshold pair replacing the
+        thresholds of every set
+    :return: list of (polynuc_thres, entropy_thres, merged TelomereCall) tuples of
+        all threshold pairs
+    """
+    metrics = None
+    threshold_calls = []
+    for polynuc_thres, entropy_thres in thresholds:
+        pair_motif_sets = None
+        if motif_sets is not None:
+            pair_motif_sets = [
+                motif_set._replace(
+                    polynuc_thres=polynuc_thres, entropy_thres=entropy_thres
+                )
+                for motif_set in motif_sets
+            ]
+        if metrics is None or stop_after is not None:
+            seq_record, *metrics = get_seq_metrics(
+                seq_record,
+                polynuc_thres,
+                entropy_thres,
+                nb_scanned_nt,
+                stop_after,
+                pair_motif_sets,
+            )
+        _, _, merged_calls = get_metric_calls(
+            seq_record.name,
+            seq_record.length,
+            strain,
+            *metrics,
+            polynuc_thres,
+            entropy_thres,
+            pair_motif_sets,
+            raw=False,
+        )
+        threshold_calls.extend(
+            (polynuc_thres, entropy_thres, call) for call in merged_calls
+        )
 
+    log_seq_done(seq_record.name, seq_record.length, strain)
+    return threshold_calls
 
-def get_telomeric_reads(bam_file, telo_df_merged, outdir="telofinder_telomeric_reads"):
-    """Extract telomeric reads from a bam file corresponding to telomere detected
-    and reported in telo_df_merged
 
-    :param bam_file: An indexed bam alignment file.  :param telo_df_merged:
-    Merged DataFrame with telomeric informations (from one of the run_telofinder
-    functions)
+def run_sweep_task(task, thresholds, nb_scanned_nt, stop_after=None, motif_sets=None):
+    """Run sweep_single_seq on a task of get_seq_tasks, keeping its indices
+
+    :return: a tuple of fasta index, sequence index and the sweep_single_seq results
     """
+    fasta_index, seq_index, seq_record, strain = task
+    log_seq_start(seq_record, strain)
+    return (
+        fasta_index,
+        seq_index,
+        sweep_single_seq(
+            seq_record, strain, thresholds, nb_scanned_nt, stop_after, motif_sets
+        ),
+    )
 
-    outdir = Path(outdir)
-    outdir.mkdir()
 
-    stats = []
+def summarize_sweep(merged_df):
+    """Summarize the telomeres found with each threshold pair of a sweep
 
-    for chro, start, end in telo_df_merged.apply(
-        lambda x: (x.chrom, x.start, x.end), axis=1
-    ):
+    :param merged_df: merged telomere table of sweep_thresholds
+    :return: a dataframe with, for each strain, motif set if any and threshold
+        pair, the number of
+        chromosomes, the number and fraction of chromosome ends with a terminal
+        telomere, the number of internal telomeres and the mean and median
+        lengths of the terminal and internal telomeres
+    """
+    keys = ["strain", "polynuc_thres", "entropy_thres"]
+    if "motif_set" in merged_df:
+        keys.insert(1, "motif_set")
+    calls = merged_df.dropna(subset=["start"]).astype({"len": float})
+    term = calls[calls.type == "term"]
+    intern = calls[calls.type == "intern"]
+
+    summary = merged_df.groupby(keys, sort=False).agg(nb_chrom=("chrom", "nunique"))
+    summary["nb_term_ends"] = (
+        term[keys + ["chrom", "side"]].drop_duplicates().groupby(keys).size()
+    )
+    summary["term_ends_fraction"] = summary["nb_term_ends"] / (2 * summary["nb_chrom"])
+    summary["nb_intern"] = intern.groupby(keys).size()
+    summary["term_len_mean"] = term.groupby(keys)["len"].mean()
+    summary["term_len_median"] = term.groupby(keys)["len"].median()
+    summary["intern_len_mean"] = intern.groupby(keys)["len"].mean()
+    summary["intern_len_median"] = intern.groupby(keys)["len"].median()
+    summary = summary.fillna(
+        {"nb_term_ends": 0, "term_ends_fraction": 0, "nb_intern": 0}
+    )
+    return summary.astype({"nb_term_ends": int, "nb_intern": int}).reset_index()
+
+
+def sweep_thresholds(
+    fasta_paths,
+    polynuc_thresholds,
+    entropy_thresholds,
+    nb_scanned_nt,
+    threads,
+    outdir=None,
+    stop_after=None,
+    motif_sets=None,
+):
+    """Run the telomere detection algorithm on fasta files for all pairs of
+    thresholds of a grid. The window metrics of each sequence are computed once
+    and the telomeres are called and merged for each pair.
+
+    :param fasta_paths: list of paths to fasta files
+    :param polynuc_thresholds: list of polynucleotide thresholds
+    :param entropy_thresholds: list of entropy thresholds
+    :param threads: total number of processes
+    :param outdir: directory to write sweep_summary.csv and sweep_merged_telom_df.csv
+        to, default is not to write them
+    :param stop_after: see run_on_single_seq
+    :param motif_sets: see run_on_single_seq, each threshold pair replacing the
+        thresholds of every set. The summary is then given for each set.
+    :return: a tuple of the summary of each pair (see summarize_sweep) and of the
+        merged telomere table of all pairs, with polynuc_thres and entropy_thres columns
+    """
+    thresholds = [
+        (polynuc_thres, entropy_thres)
+        for polynuc_thres in polynuc_thresholds
+        for entropy_thres in entropy_thresholds
+    ]
+    tasks, streamed_fastas = split_streamed_fastas(
+        get_seq_tasks(fasta_paths, nb_scanned_nt)
+    )
+    if not tasks and not streamed_fastas:
+        raise ValueError("No sequence found in the fasta files")
 
-        out_sam = outdir / f"telomeric_reads_{chro}_{start}_{end}.sam"
-        out_fas = outdir / f"telomeric_reads_{chro}_{start}_{end}.fas"
+    partial_task = partial(
+        run_sweep_task,
+        thresholds=thresholds,
+        nb_scanned_nt=nb_scanned_nt,
+        stop_after=stop_after,
+        motif_sets=motif_sets,
+    )
+    results = {}
+    progress = new_progress(tasks, nb_scanned_nt)
+    pool_tasks = chain(
+        tasks, iter_streamed_tasks(streamed_fastas, nb_scanned_nt, progress)
+    )
+    with worker_events(progress) as (initializer, initargs):
+        with Pool(threads, initializer, initargs) as p:
+            for fasta_index, seq_index, result in iter_with_heartbeat(
+                p.imap_unordered(partial_task, pool_tasks), progress
+            ):
+                update_progress(progress, (fasta_index, seq_index))
+                results[(fasta_index, seq_index)] = result
+            p.close()
+            p.join()
+    if not results:
+        raise ValueError("No sequence found in the fasta files")
+
+    # rows of each file by threshold pair, then in the order of the sequences
+    rows = sorted(
+        (
+            (key[0], polynuc_thres, entropy_thres, call)
+            for key in sorted(results)
+            for polynuc_thres, entropy_thres, call in results[key]
+        ),
+        key=lambda row: row[:3],
+    )
+    merged_df = get_calls_df([row[3] for row in rows], merged=True)
+    merged_df.insert(1, "polynuc_thres", [row[1] for row in rows])
+    merged_df.insert(2, "entropy_thres", [row[2] for row in rows])
+    summary = summarize_sweep(merged_df)
 
-        with open(out_sam, "w") as sam:
-            with open(out_fas, "w") as fas:
-                with pysam.AlignmentFile(bam_file) as bam:
-                    for rd in bam.fetch(chro, start, end):
+    if outdir is not None:
+        outdir = Path(outdir)
+        outdir.mkdir(exist_ok=True)
+        write_table(summary, outdir / "sweep_summary.csv", index=False)
+        write_table(merged_df, outdir / "sweep_merged_telom_df.csv", index=False)
 
-                        if rd.mapq > 0:
+    return summary, merged_df
 
-                            sam.write(str(rd))
-                            fas.write(f">{rd.qname}\n{rd.query_sequence}\n")
 
-                            stats.append(
-                                {
-                                    "bam": Path(bam_file).stem,
-                                    "chro": chro,
-                                    "start": start,
-                                    "end": end,
-                                    "read_len": len(rd.query_sequence),
-                                }
-                            )
+def get_interval_name(chrom, start, end):
+    """Name of an interval of telo_df_merged, as used in the telomeric reads outputs"""
+    return f"{chrom}_{start}_{end}"
 
-        df, telo_df, merged_telo_df = run_on_single_fasta(
-            out_fas, 0.8, 0.8, 8000, threads=4
-        )
-    return merged_telo_df
 
+def run_read_task(task, polynuc_thres, entropy_thres, nb_scanned_nt):
+    """Run the telomere detection algorithm on a read of get_telomeric_reads
+
+    :param task: a tuple of interval index, read name and read sequence
+    :return: a tuple of the interval index and the merged TelomereCall of the read
+    """
+    interval_index, name, seq = task
+    _, _, merged_calls = get_seq_calls(
+        get_str_seq_ends(name, seq, nb_scanned_nt),
+        "read",
+        polynuc_thres,
+        entropy_thres,
+        nb_scanned_nt,
+        raw=False,
+    )
+    return interval_index, merged_calls
+
+
+def iter_interval_reads(bam, intervals, min_len=20):
+    """Fetch the reads with a mapping quality above 0 of several intervals from
+    an open bam file
+
+    :param bam: a pysam AlignmentFile
+    :param intervals: list of (chrom, start, end) tuples
+    :param min_len: minimum read length, default = 20, the sliding window size
+    :return: a generator of (interval index, read) tuples
+    """
+    for interval_index, (chrom, start, end) in enumerate(intervals):
+        for read in bam.fetch(chrom, start, end):
+            seq = read.query_sequence
+            if read.mapping_quality > 0 and seq is not None and len(seq) >= min_len:
+                yield interval_index, read
+
+
+INTERVAL_TAG = "ZI"
+
+
+def write_reads_fasta(bam_path, fasta_path=None):
+    """Write the reads of a bam file of get_telomeric_reads to a fasta file, with
+    the interval of each read in its description
+
+    :param bam_path: path to the telomeric_reads.bam file
+    :param fasta_path: path to the fasta file, default is the bam path with a .fasta extension
+    :return: the path to the fasta file
+    """
+    if fasta_path is None:
+        fasta_path = Path(bam_path).with_suffix(".fasta")
+    import pysam
+
+    with pysam.AlignmentFile(bam_path) as bam, open(fasta_path, "w") as fas:
+        for read in bam:
+            interval = read.get_tag(INTERVAL_TAG) if read.has_tag(INTERVAL_TAG) else ""
+            fas.write(f">{read.query_name} {interval}\n{read.query_sequence}\n")
+    return fasta_path
+
+
+def get_telomeric_reads(
+    bam_file,
+    telo_df_merged,
+    outdir="telofinder_telomeric_reads",
+    polynuc_thres=0.8,
+    entropy_thres=0.8,
+    nb_scanned_nt=8000,
+    threads=4,
+    reads_format="sam",
+    fasta=False,
+):
+    """Extract telomeric reads from a bam file corresponding to telomere detected
+    and reported in telo_df_merged, and run the telomere detection algorithm on
+    each read. The bam file is opened once and the reads of all intervals are
+    scored in memory by a single pool of processes.
+
+    :param bam_file: An indexed bam alignment file.
+    :param telo_df_merged: Merged DataFrame with telomeric informations (from one
+        of the run_telofinder functions)
+    :param outdir: output directory of the reads and of the telomere table of the
+        reads (telomeric_reads.csv)
+    :param threads: number of processes scoring the reads
+    :param reads_format: 'sam' to write the reads of each interval to a .sam and
+        a .fas file, or 'bam' to write all reads to a single sorted and indexed
+        telomeric_reads.bam with the header of bam_file, the interval of each
+        read being in its ZI tag (see get_interval_name)
+    :param fasta: with reads_format='bam', also write the reads to
+        telomeric_reads.fasta (see write_reads_fasta)
+    :return: the merged telomere table of all reads, one read being a chromosome
+        of a strain named after the bam file, with the interval_chrom,
+        interval_start and interval_end columns of its interval
+    """
+    if reads_format not in ["sam", "bam"]:
+        raise ValueError(f"Unknown reads format '{reads_format}', expected sam or bam")
+    import pysam
+
+    outdir = Path(outdir)
+    outdir.mkdir()
+
+    intervals = [
+        (chrom, int(start), int(end))
+        for chrom, start, end in telo_df_merged[["chrom", "start", "end"]]
+        .dropna()
+        # the same interval may be called by several motif sets
+        .drop_duplicates()
+        .itertuples(index=False)
+    ]
+    reads_bam_path = outdir / "telomeric_reads.bam"
+    unsorted_bam_path = outdir / "telomeric_reads.unsorted.bam"
+
+    def iter_read_tasks():
+        sam = fas = None
+        current_index = None
+        try:
+            for interval_index, read in iter_interval_reads(bam, intervals):
+                name = get_interval_name(*intervals[interval_index])
+                if reads_format == "bam":
+                    read.set_tag(INTERVAL_TAG, name, value_type="Z")
+                    reads_bam.write(read)
+                    yield interval_index, read.query_name, read.query_sequence
+                    continue
+                if interval_index != current_index:
+                    for handle in [sam, fas]:
+                        if handle is not None:
+                            handle.close()
+                    sam = open(outdir / f"telomeric_reads_{name}.sam", "w")
+                    fas = open(outdir / f"telomeric_reads_{name}.fas", "w")
+                    current_index = interval_index
+                sam.write(str(read))
+                fas.write(f">{read.query_name}\n{read.query_sequence}\n")
+                yield interval_index, read.query_name, read.query_sequence
+        finally:
+            for handle in [sam, fas]:
+                if handle is not None:
+                    handle.close()
+
+    partial_task = partial(
+        run_read_task,
+        polynuc_thres=polynuc_thres,
+        entropy_thres=entropy_thres,
+        nb_scanned_nt=nb_scanned_nt,
+    )
+
+    read_calls = []
+    with pysam.AlignmentFile(bam_file) as bam:
+        reads_bam = None
+        if reads_format == "bam":
+            reads_bam = pysam.AlignmentFile(unsorted_bam_path, "wb", template=bam)
+        try:
+            with Pool(threads) as p:
+                # reads are fetched lazily while the pool scores the previous ones
+                for interval_index, merged_calls in p.imap(
+                    partial_task, iter_read_tasks(), chunksize=64
+                ):
+                    read_calls.extend(
+                        (intervals[interval_index], call) for call in merged_calls
+                    )
+        finally:
+            if reads_bam is not None:
+                reads_bam.close()
+
+    if reads_format == "bam":
+        # intervals are not in coordinate order and may overlap
+        pysam.sort("-o", str(reads_bam_path), str(unsorted_bam_path))
+        pysam.index(str(reads_bam_path))
+        unsorted_bam_path.unlink()
+        if fasta:
+            write_reads_fasta(reads_bam_path)
+
+    reads_df = get_calls_df(
+        [call._replace(strain=Path(bam_file).stem) for _, call in read_calls],
+        merged=True,
+    )
+    for column_index, column in enumerate(
+        ["interval_chrom", "interval_start", "interval_end"]
+    ):
+        reads_df.insert(
+            column_index, column, [interval[column_index] for interval, _ in read_calls]
+        )
+    write_table(reads_df, outdir / "telomeric_reads.csv", index=False)
 
+    return reads_df
@@ -0,0 +1,232 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def get_track_dir(store_dir, strain, chrom, strand):
+    """Directory of the tracks of a strand of a chromosome in a track store
+
+    :param store_dir: path to the track store
+    :return: path to the track directory
+    """
+    return Path(store_dir) / quote(strain, safe="") / quote(chrom, safe="") / strand
+
+
+def write_tracks(
+    store_dir, raw_df, chrom_size, chunk_size=DEFAULT_CHUNK_SIZE, motif_sets=None
+):
+    """Write the metric tracks of the raw dataframe of one sequence to a track
+    store. Each metric of each strand is stored as float32 chunks of chunk_size
+    windows, ordered by distance from the chromosome end, so that regions can be
+    loaded without reading the whole track. Tracks already in the store are
+    replaced.
+
+    :param store_dir: path to the track store
+    :param raw_df: raw dataframe of a single sequence (see run_on_single_seq)
+    :param chrom_size: length of the sequence
+    :param chunk_size: number of windows per chunk
+    :param motif_sets: list of the MotifSet of the raw dataframe, if any. Their
+        thresholds are stored with the tracks (see load_raw_region).
+    """
+    strain = str(raw_df.index.get_level_values(0)[0])
+    chrom = str(raw_df.index.get_level_values(1)[0])
+    strands = raw_df.index.get_level_values(3)
+    metrics = [name for name in raw_df.columns if not name.startswith("predict_telom")]
+
+    for strand in ["W", "C"]:
+        strand_df = raw_df[strands == strand]
+        track_dir = get_track_dir(store_dir, strain, chrom, strand)
+        tmp_dir = track_dir.with_name(f"{strand}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        for name in metrics:
+            values = strand_df[name].to_numpy(dtype=np.float32)
+            for chunk_index, start in enumerate(range(0, len(values), chunk_size)):
+                np.save(
+                    tmp_dir / f"{name}.{chunk_index}.npy",
+                    values[start : start + chunk_size],
+                )
+        with open(tmp_dir / "meta.json", "w") as meta:
+            json.dump(
+                {
+                    "strain": strain,
+                    "chrom": chrom,
+                    "strand": strand,
+                    "chrom_size": int(chrom_size),
+                    "nb_windows": len(strand_df),
+                    "chunk_size": chunk_size,
+                    "metrics": metrics,
+                    "motif_thresholds": {
+                        motif_set.name: [
+                            motif_set.polynuc_thres,
+                            motif_set.entropy_thres,
+                        ]
+                        for motif_set in motif_sets or []
+                    },
+                },
+                meta,
+            )
+
+        shutil.rmtree(track_dir, ignore_errors=True)
+        os.replace(tmp_dir, track_dir)
+
+
+def read_track_meta(track_dir):
+    """Read the metadata of a track directory written by write_tracks"""
+    with open(Path(track_dir) / "meta.json") as meta:
+        return json.load(meta)
+
+
+def list_tracks(store_dir):
+    """List the sequences of a track store
+
+    :param store_dir: path to the track store
+    :return: dataframe of the strain, chrom, chrom_size and number of W and C
+        strand windows of each sequence
+    """
+    rows = []
+    for strain_dir in sorted(Path(store_dir).iterdir()):
+        for chrom_dir in sorted(strain_dir.iterdir()):
+            row = {
+                "strain": unquote(strain_dir.name),
+                "chrom": unquote(chrom_dir.name),
+            }
+            for strand in ["W", "C"]:
+                if (chrom_dir / strand / "meta.json").exists():
+                    meta = read_track_meta(chrom_dir / strand)
+                    row["chrom_size"] = meta["chrom_size"]
+                    row[f"nb_windows_{strand}"] = meta["nb_windows"]
+            rows.append(row)
+    return pd.DataFrame(
+        rows, columns=["strain", "chrom", "chrom_size", "nb_windows_W", "nb_windows_C"]
+    )
+
+
+def load_track(track_dir, first=0, last=None):
+    """Load the windows first to last (excluded), by distance from the chromosome
+    end, of the tracks of a strand. Only the chunks holding these windows are read.
+
+    :param track_dir: path to the track directory
+    :return: a dictionary of the metric arrays
+    """
+    meta = read_track_meta(track_dir)
+    chunk_size = meta["chunk_size"]
+    last = meta["nb_windows"] if last is None else min(last, meta["nb_windows"])
+    first = max(first, 0)
+
+    chunk_indices = []
+    if last > first:
+        chunk_indices = range(first // chunk_size, (last - 1) // chunk_size + 1)
+
+    tracks = {}
+    for name in meta["metrics"]:
+        chunks = []
+        for chunk_index in chunk_indices:
+            chunk = np.load(
+                Path(track_dir) / f"{name}.{chunk_index}.npy", mmap_mode="r"
+            )
+            chunk_start = chunk_index * chunk_size
+            chunks.append(
+                chunk[max(first - chunk_start, 0) : last - chunk_start].copy()
+            )
+        tracks[name] = (
+            np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        )
+    return tracks
+
+
+def get_predict_column(motif_set=None):
+    """Name of the telomere prediction column of a motif set in the raw dataframe
+
+    :param motif_set: name of the motif set, None for the default polynucleotides
+    :return: the column name
+    """
+    return "predict_telom" if motif_set is None else f"predict_telom_{motif_set}"
+
+
+def predict_track_telom(tracks, polynuc_name, polynuc_thres, entropy_thres):
+    """Telomere prediction of stored tracks. The thresholds are compared as
+    float32, like the stored metrics, so that a metric equal to a threshold is
+    not telomeric, as in the runs that wrote the tracks.
+
+    :param tracks: dictionary of the metric arrays, see load_track
+    :param polynuc_name: name of the polynucleotide track
+    :return: float32 array, 1 for telomeric windows
+    """
+    predict_telom = (tracks["entropy"] < np.float32(entropy_thres)) & (
+        tracks[polynuc_name] > np.float32(polynuc_thres)
+    )
+    return predict_telom.astype(np.float32)
+
+
+def load_raw_region(
+    store_dir,
+    strain,
+    chrom,
+    start=None,
+    end=None,
+    polynuc_thres=0.8,
+    entropy_thres=0.8,
+):
+    """Load the windows of a region of a sequence from a track store as a raw
+    dataframe. With the default metrics, predict_telom is computed with the
+    given thresholds from the stored float32 values. With motif sets, the
+    predict_telom column of each set is computed with the thresholds of the set
+    stored by write_tracks.
+
+    :param store_dir: path to the track store
+    :param start: first window position of the region (0-based), default is the
+        start of the sequence
+    :param end: position after the last window of the region, default is the end
+        of the sequence
+    :return: raw dataframe indexed by (strain, chrom, position, strand), in the
+        order of the raw dataframe of run_on_single_seq
+    """
+    dfs = []
+    for strand in ["W", "C"]:
+        track_dir = get_track_dir(store_dir, strain, chrom, strand)
+        chrom_size = read_track_meta(track_dir)["chrom_size"]
+        region_start = 0 if start is None else start
+        region_end = chrom_size if end is None else end
+        if strand == "W":
+            first, last = region_start, region_end
+        else:
+            # C strand windows are stored from the end of the chromosome
+            first, last = chrom_size - region_end, chrom_size - region_start
+        tracks = load_track(track_dir, first, last)
+        nb_windows = len(next(iter(tracks.values()), []))
+        distances = np.arange(max(first, 0), max(first, 0) + nb_windows)
+        positions = distances if strand == "W" else chrom_size - distances - 1
+
+        thresholds = read_track_meta(track_dir).get("motif_thresholds", {})
+        if "polynuc" in tracks:
+            thresholds = {None: [polynuc_thres, entropy_thres]}
+        columns = {}
+        for name, values in tracks.items():
+            columns[name] = values
+            motif_set = None if name == "polynuc" else name[len("polynuc_") :]
+            if name.startswith("polynuc") and motif_set in thresholds:
+                columns[get_predict_column(motif_set)] = predict_track_telom(
+                    tracks, name, *thresholds[motif_set]
+                )
+        df = pd.DataFrame(columns)
+        df.index = pd.MultiIndex.from_arrays(
+            [
+                pd.Categorical([strain] * nb_windows, categories=[strain]),
+                pd.Categorical([chrom] * nb_windows, categories=[chrom]),
+                positions.astype(np.int32),
+                pd.Categorical([strand] * nb_windows, categories=["W", "C"]),
+            ]
+        )
+        dfs.append(df)
+
+    return pd.concat(dfs)
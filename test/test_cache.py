@@ -0,0 +1,67 @@
+import pickle
+import shutil
+
+import pandas as pd
+
+from . import test_dir
+
+import telofinder.telofinder as tf
+from telofinder.cache import ResultCache, evict
+
+filename = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+
+
+def test_run_on_single_fasta_cache(tmp_path, monkeypatch):
+    fasta_path = tmp_path / "S288C.fasta"
+    shutil.copy(filename, fasta_path)
+    cache = ResultCache(tmp_path / "cache")
+
+    expected = tf.run_on_single_fasta(fasta_path, 0.8, 0.8, 8000, 1, cache)
+    (entry_dir,) = (tmp_path / "cache").iterdir()
+    assert len(list(entry_dir.iterdir())) == 3
+
+    # an interrupted run only recomputes the missing sequences
+    (entry_dir / "1.pkl").unlink()
+    results = tf.run_on_single_fasta(fasta_path, 0.8, 0.8, 8000, 1, cache)
+    for result, expected_result in zip(results, expected):
+        pd.testing.assert_frame_equal(result, expected_result)
+
+    monkeypatch.setattr(tf, "Pool", None)
+    results = tf.run_on_single_fasta(fasta_path, 0.8, 0.8, 8000, 1, cache)
+    for result, expected_result in zip(results, expected):
+        pd.testing.assert_frame_equal(result, expected_result)
+
+    # other parameters are not read from the cache
+    monkeypatch.undo()
+    tf.run_on_single_fasta(fasta_path, 0.8, 0.7, 8000, 1, cache)
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+
+def test_run_and_export_cache_calls(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    outdir = tmp_path / "out"
+    expected = tf.run_and_export([filename], 0.8, 0.8, 8000, 1, False, outdir, cache)
+
+    # without raw output, only the telomere calls are cached
+    (entry_dir,) = (tmp_path / "cache").iterdir()
+    with open(entry_dir / "0.pkl", "rb") as pkl:
+        raw_df, calls, _ = pickle.load(pkl)
+    assert raw_df is None and calls
+
+    results = tf.run_and_export([filename], 0.8, 0.8, 8000, 1, False, outdir, cache)
+    for result, expected_result in zip(results, expected):
+        pd.testing.assert_frame_equal(result, expected_result)
+
+    # the raw output is not read from the entries of the calls
+    tf.run_and_export([filename], 0.8, 0.8, 8000, 1, True, outdir, cache)
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+    assert (outdir / "raw_df.csv").stat().st_size > 0
+
+
+def test_evict(tmp_path):
+    cache = ResultCache(tmp_path, 150)
+    for entry in ["a", "b", "c"]:
+        (tmp_path / entry).mkdir()
+        (tmp_path / entry / "0.pkl").write_bytes(b"0" * 100)
+    evict(cache)
+    assert len(list(tmp_path.iterdir())) == 1
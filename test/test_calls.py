@@ -0,0 +1,43 @@
+import pandas as pd
+
+from telofinder.calls import TelomereCall, append_calls, get_calls_df, merge_calls
+
+
+def test_merge_calls():
+    calls = [
+        TelomereCall("s", "c", "Left", "term", 1, 300, 10000),
+        TelomereCall("s", "c", "Left", "intern", 310, 400, 10000),
+        TelomereCall("s", "c", "Left", "intern", 2000, 2100, 10000),
+        TelomereCall("s", "c", "Right", "intern", 9500, 9990, 10000),
+    ]
+    merged = merge_calls(calls, 10000)
+    assert [(call.side, call.type, call.start, call.end) for call in merged] == [
+        ("Left", "term", 1, 400),
+        ("Left", "intern", 2000, 2100),
+        ("Right", "term", 9500, 9990),
+    ]
+
+    placeholders = [
+        TelomereCall("s", "c", "Left", "no_telo", None, None, 10000),
+        TelomereCall("s", "c", "Right", "no_telo", None, None, 10000),
+    ]
+    assert merge_calls(placeholders, 10000) == placeholders
+
+
+def test_calls_df_and_append(tmp_path):
+    calls = [
+        TelomereCall("s", "c", "Left", "term", 1, 300, 10000, "yeast"),
+        TelomereCall("s", "c", "Right", "no_telo", None, None, 10000, "yeast"),
+    ]
+    df = get_calls_df(calls, merged=True)
+    assert list(df.columns) == [
+        "strain", "motif_set", "chrom", "side", "type", "start", "end", "len", "chrom_size"
+    ]
+    assert df["len"].tolist() == [300, pd.NA]
+    assert str(df["start"].dtype) == "Int64"
+
+    append_calls(calls[:1], calls[:1], tmp_path)
+    append_calls(calls[1:], calls[1:], tmp_path)
+    read_df = pd.read_csv(tmp_path / "merged_telom_df.csv", dtype={"start": "Int64"})
+    assert read_df["start"].tolist() == [1, pd.NA]
+    assert (tmp_path / "telom_merged.bed").read_text() == "c\t1\t300\tyeast_term\n"
@@ -0,0 +1,120 @@
+import gzip
+import io
+import sys
+
+import pytest
+from Bio import SeqIO
+
+from . import test_dir
+
+import telofinder.fasta as fasta
+
+filename = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+
+sequences = {"seq1": "ACGTACGTAC" * 5 + "TTG", "seq2": "CCCACACA" * 3}
+
+
+def to_str(seq):
+    return seq if isinstance(seq, str) else seq.tobytes().decode()
+
+
+def as_str(seq_ends):
+    return seq_ends._replace(left=to_str(seq_ends.left), right=to_str(seq_ends.right))
+
+
+@pytest.fixture
+def indexed_fasta(tmp_path):
+    fasta_path = tmp_path / "test.fasta"
+    fai_lines = []
+    with open(fasta_path, "w") as fas:
+        for name, seq in sequences.items():
+            fas.write(f">{name} description\n")
+            fai_lines.append(f"{name}\t{len(seq)}\t{fas.tell()}\t10\t11\n")
+            for i in range(0, len(seq), 10):
+                fas.write(seq[i : i + 10] + "\n")
+    with open(f"{fasta_path}.fai", "w") as fai:
+        fai.writelines(fai_lines)
+    return fasta_path
+
+
+@pytest.mark.parametrize("nb_scanned_nt", [8000, 1000, 1, -1])
+def test_iter_seq_ends(nb_scanned_nt):
+    expected = [
+        fasta.get_seq_ends(seq_record, nb_scanned_nt)
+        for seq_record in SeqIO.parse(filename, "fasta")
+    ]
+    assert [as_str(seq) for seq in fasta.iter_seq_ends(filename, nb_scanned_nt)] == expected
+    with open(filename) as handle:
+        assert list(fasta.parse_seq_ends(handle, nb_scanned_nt)) == expected
+
+
+@pytest.mark.parametrize("nb_scanned_nt", [25, 15, 10, 1, -1])
+def test_iter_seq_ends_indexed(indexed_fasta, nb_scanned_nt):
+    for seq_ends in fasta.iter_seq_ends(indexed_fasta, nb_scanned_nt):
+        seq_ends = as_str(seq_ends)
+        seq = sequences[seq_ends.name]
+        limit_seq = fasta.get_scan_limit(len(seq), nb_scanned_nt)
+        assert seq_ends.length == len(seq)
+        assert seq_ends.left == seq[:limit_seq]
+        assert seq_ends.right == seq[len(seq) - limit_seq :]
+
+
+def test_build_fai(indexed_fasta):
+    expected = fasta.read_fai(f"{indexed_fasta}.fai")
+    assert fasta.build_fai(indexed_fasta) == expected
+
+
+def test_build_fai_different_line_length(tmp_path):
+    fasta_path = tmp_path / "test.fasta"
+    fasta_path.write_text(">seq1\nACGT\nAC\nACGT\n")
+    with pytest.raises(ValueError):
+        fasta.build_fai(fasta_path)
+    # falls back on parsing the file
+    seq_ends = next(fasta.iter_seq_ends(fasta_path, 3))
+    assert (seq_ends.left, seq_ends.right) == ("ACG", "CGT")
+
+
+@pytest.mark.parametrize("start, end", [(0, 53), (3, 9), (7, 33), (10, 20), (40, 53)])
+def test_read_bases(indexed_fasta, start, end):
+    fasta_seq = fasta.list_fasta_seqs(indexed_fasta)[0]
+    assert to_str(fasta.read_bases(fasta_seq, start, end)) == sequences["seq1"][start:end]
+
+
+@pytest.fixture
+def compressed_fastas(tmp_path):
+    pysam = pytest.importorskip("pysam")
+    gz_path = tmp_path / "S288C.fa.gz"
+    with open(filename, "rb") as fas, gzip.open(gz_path, "wb") as gz:
+        gz.write(fas.read())
+    bgz_path = tmp_path / "S288C.fa.bgz"
+    pysam.tabix_compress(filename, str(bgz_path))
+    return gz_path, bgz_path
+
+
+@pytest.mark.parametrize("nb_scanned_nt", [8000, -1])
+def test_iter_seq_ends_compressed(compressed_fastas, nb_scanned_nt):
+    gz_path, bgz_path = compressed_fastas
+    assert fasta.get_compression(filename) is None
+    assert fasta.get_compression(gz_path) == "gzip"
+    assert fasta.get_compression(bgz_path) == "bgzf"
+    assert all(
+        isinstance(seq, fasta.BgzfSeq) for seq in fasta.iter_fasta(bgz_path, 8000)
+    )
+
+    expected = [as_str(seq) for seq in fasta.iter_seq_ends(filename, nb_scanned_nt)]
+    for path in compressed_fastas:
+        seqs = [as_str(seq) for seq in fasta.iter_seq_ends(path, nb_scanned_nt)]
+        assert seqs == expected
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_iter_seq_ends_stdin(monkeypatch, compress):
+    with open(filename, "rb") as fas:
+        data = fas.read()
+    if compress:
+        data = gzip.compress(data)
+    stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(data)))
+    monkeypatch.setattr(sys, "stdin", stdin)
+
+    expected = [as_str(seq) for seq in fasta.iter_seq_ends(filename, 1000)]
+    assert [as_str(seq) for seq in fasta.iter_seq_ends("-", 1000)] == expected
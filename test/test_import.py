@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+# cumulative import time of the telofinder package and command line, in seconds
+IMPORT_TIME_BUDGET = 0.3
+HEAVY_MODULES = ["pandas", "numpy", "pysam", "pybedtools", "Bio", "matplotlib", "pyarrow"]
+
+
+def get_import_times(statement):
+    """Run an import statement in a new interpreter with -X importtime
+
+    :return: dictionary of the cumulative import time of each module in seconds
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+@pytest.mark.parametrize(
+    "statement",
+    ["import telofinder.main", "from telofinder import classify_telomere"],
+)
+def test_import_budget(statement):
+    times = get_import_times(statement)
+    heavy = [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+    assert heavy == []
+    assert times["telofinder"] < IMPORT_TIME_BUDGET
@@ -0,0 +1,91 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from . import test_dir
+
+from telofinder.calls import TelomereCall, merge_calls
+
+doc_results = f"{test_dir}/../doc/telofinder_results"
+CHROM_LEN = 10 ** 6
+
+
+def to_bed_df(intervals):
+    return pd.DataFrame(intervals, columns=["chrom", "start", "end"])
+
+
+def merge_bed_df(bed_df, distance):
+    """Merge the intervals of each chromosome of a bed dataframe with merge_calls
+
+    :return: sorted list of the (chrom, start, end) tuples of the merged intervals
+    """
+    merged = set()
+    for chrom, chrom_df in bed_df.groupby("chrom"):
+        calls = [
+            TelomereCall("s", chrom, "Left", "intern", start, end, CHROM_LEN)
+            for start, end in zip(chrom_df["start"].tolist(), chrom_df["end"].tolist())
+        ]
+        merged.update(
+            (call.chrom, call.start, call.end)
+            for call in merge_calls(calls, CHROM_LEN, distance=distance)
+        )
+    return sorted(merged)
+
+
+@pytest.mark.parametrize(
+    "intervals, distance, expected",
+    [
+        # overlapping
+        ([("c", 1, 10), ("c", 5, 15)], 0, [("c", 1, 15)]),
+        # book-ended
+        ([("c", 1, 10), ("c", 10, 15)], 0, [("c", 1, 15)]),
+        # separated by one base more than the distance
+        ([("c", 1, 10), ("c", 31, 40)], 20, [("c", 1, 10), ("c", 31, 40)]),
+        # separated by exactly the distance
+        ([("c", 1, 10), ("c", 30, 40)], 20, [("c", 1, 40)]),
+        # unsorted input and interval contained in a previous one
+        ([("c", 50, 60), ("c", 1, 100), ("c", 200, 210)], 20, [("c", 1, 100), ("c", 200, 210)]),
+        # intervals on different chromosomes are never merged
+        ([("c2", 11, 20), ("c1", 1, 10)], 20, [("c1", 1, 10), ("c2", 11, 20)]),
+        ([], 20, []),
+    ],
+)
+def test_merge_calls(intervals, distance, expected):
+    assert merge_bed_df(to_bed_df(intervals), distance) == expected
+
+
+def test_merge_calls_reference_output():
+    """telom_merged.bed was produced with 'bedtools merge -d 20' on telom.bed"""
+    names = ["chrom", "start", "end", "type"]
+    bed_df = pd.read_csv(f"{doc_results}/telom.bed", sep="\t", names=names)
+    expected = pd.read_csv(f"{doc_results}/telom_merged.bed", sep="\t", names=names)
+    assert merge_bed_df(bed_df, 20) == list(
+        expected[["chrom", "start", "end"]].itertuples(index=False, name=None)
+    )
+
+
+@pytest.mark.skipif(shutil.which("bedtools") is None, reason="bedtools is not installed")
+def test_merge_calls_bedtools():
+    pybedtools = pytest.importorskip("pybedtools")
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, 10000, 500)
+    bed_df = pd.DataFrame(
+        {
+            "chrom": rng.choice(["chrI", "chrII", "chrIII"], 500),
+            "start": starts,
+            "end": starts + rng.integers(1, 100, 500),
+        }
+    )
+    for distance in [0, 20, 50]:
+        expected = (
+            pybedtools.BedTool()
+            .from_dataframe(bed_df)
+            .sort()
+            .merge(d=distance)
+            .to_dataframe()
+        )
+        assert merge_bed_df(bed_df, distance) == [
+            tuple(row) for row in expected.values.tolist()
+        ]
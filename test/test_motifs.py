@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from . import test_dir
+
+import telofinder.telofinder as tf
+from telofinder.motifs import MOTIF_SETS, MotifSet, parse_motif_set
+
+filename = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+
+
+def test_parse_motif_set():
+    assert parse_motif_set("vertebrate") == MOTIF_SETS["vertebrate"]
+    assert parse_motif_set("x=aac,acc:0.7") == MotifSet("x", ["AAC", "ACC"], 0.7, 0.8)
+    for text in ["unknown", "x=AC,CAC", "x=ACN", "x=AC:0.8:0.8:0.8"]:
+        with pytest.raises(ValueError):
+            parse_motif_set(text)
+
+
+def test_compute_motif_metrics():
+    sequence = "CCACACCACACCCACACACCCNNACACCCTAACCCTAACCCTAACCCTAAACGTTTAGGG" * 3
+    metrics = tf.compute_motif_metrics(
+        sequence, [MOTIF_SETS["yeast"], MOTIF_SETS["vertebrate"]]
+    )
+    expected = tf.compute_window_metrics(sequence)
+    assert np.array_equal(metrics["entropy"], expected["entropy"])
+    assert np.array_equal(metrics["yeast"], expected["polynuc"])
+
+    kmers = MOTIF_SETS["vertebrate"].motifs
+    for i, window in tf.sliding_window(sequence, 0, len(sequence), 20):
+        nb_motifs = sum(window[j : j + 6] in kmers for j in range(15))
+        assert metrics["vertebrate"][i] == nb_motifs / 15
+
+
+def test_run_on_single_fasta_motif_sets():
+    expected = tf.run_on_single_fasta(filename, 0.8, 0.8, 8000, 1)
+    motif_sets = [MOTIF_SETS["vertebrate"], MOTIF_SETS["yeast"]]
+    raw_df, telom_df, merged_telom_df = tf.run_on_single_fasta(
+        filename, 0.8, 0.8, 8000, 1, motif_sets=motif_sets
+    )
+    assert list(raw_df.columns) == tf.get_raw_columns(motif_sets)
+    assert np.array_equal(raw_df["predict_telom_yeast"], expected[0]["predict_telom"])
+    yeast_df = merged_telom_df[merged_telom_df.motif_set == "yeast"]
+    pd.testing.assert_frame_equal(
+        yeast_df.drop(columns="motif_set").reset_index(drop=True),
+        expected[2].reset_index(drop=True),
+    )
+    assert merged_telom_df[merged_telom_df.motif_set == "vertebrate"].start.isna().all()
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from . import test_dir
+
+import telofinder.telofinder as tf
+from telofinder.parquet import load_raw_df, write_raw_parquet
+
+pytest.importorskip("pyarrow")
+
+filename = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+
+
+def assert_raw_equal(raw_df, expected):
+    assert (raw_df.values == expected.values).all()
+    for level in range(4):
+        assert np.array_equal(
+            raw_df.index.get_level_values(level).astype(str),
+            expected.index.get_level_values(level).astype(str),
+        )
+
+
+@pytest.fixture(scope="module")
+def raw_df():
+    return tf.run_on_single_fasta(filename, 0.8, 0.8, 2000, 1)[0]
+
+
+def test_load_raw_df(tmp_path, raw_df):
+    write_raw_parquet(raw_df, tmp_path / "raw_df.parquet")
+    assert_raw_equal(load_raw_df(tmp_path / "raw_df.parquet"), raw_df)
+
+    chrom = "tpg|BK006937.2|"
+    chrom_df = load_raw_df(tmp_path / "raw_df.parquet", chroms=[chrom])
+    assert_raw_equal(chrom_df, raw_df.xs(chrom, level=1, drop_level=False))
+
+
+def test_run_and_export_parquet(tmp_path, raw_df):
+    tf.run_and_export([filename], 0.8, 0.8, 2000, 2, True, tmp_path, raw_format="parquet")
+    streamed = load_raw_df(tmp_path / "raw_df.parquet")
+    # sequences are written in order of completion
+    assert_raw_equal(streamed.sort_index(), raw_df.sort_index())
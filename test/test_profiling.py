@@ -0,0 +1,48 @@
+import json
+
+from . import test_dir
+
+import telofinder.telofinder as tf
+from telofinder.profiling import get_cprofile_path, new_report, write_report
+
+filename = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+
+
+def test_run_report(tmp_path):
+    expected = tf.run_on_single_fasta(filename, 0.8, 0.8, 2000, 1)
+
+    profile = new_report(tmp_path / "cprofile")
+    results = tf.run_and_export(
+        [filename], 0.8, 0.8, 2000, 2, True, tmp_path / "results", profile=profile
+    )
+    assert results[0].equals(expected[1])
+    assert results[1].equals(expected[2])
+
+    write_report(profile, tmp_path / "run_report.json")
+    with open(tmp_path / "run_report.json") as report_file:
+        report = json.load(report_file)
+
+    assert report["nb_sequences"] == 3
+    assert sorted(seq["chrom"] for seq in report["sequences"]) == [
+        "tpg|BK006935.2|",
+        "tpg|BK006937.2|",
+        "tpg|BK006940.2|",
+    ]
+    assert {
+        "parsing",
+        "window_scoring",
+        "raw_df",
+        "grouping",
+        "classification",
+        "merge",
+        "export",
+    } <= set(report["stages"])
+    assert report["files"][0]["nb_sequences"] == 3
+    assert report["files"][0]["length"] == 816999
+    for seq in report["sequences"]:
+        assert seq["wall"] >= sum(stats["wall"] for stats in seq["stages"].values())
+        assert seq["peak_rss"] > 0
+        assert get_cprofile_path(
+            tmp_path / "cprofile", "S288C_chr01_03_06", seq["chrom"]
+        ).exists()
+    assert (tmp_path / "cprofile" / "main.prof").exists()
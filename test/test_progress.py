@@ -0,0 +1,36 @@
+import io
+import json
+import logging
+
+from . import test_dir
+
+import telofinder.telofinder as tf
+from telofinder.progress import logger, setup_logging
+
+filename = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+
+
+def test_json_lines_progress():
+    stream = io.StringIO()
+    setup_logging("json", stream=stream)
+    try:
+        tf.run_on_single_fasta(filename, 0.8, 0.8, 2000, 2)
+    finally:
+        logger.handlers = []
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [event["event"] for event in events] == ["file"] + ["progress"] * 3
+    assert events[0]["nb_sequences"] == 3
+
+    progress = events[1:]
+    assert [event["nb_done"] for event in progress] == [1, 2, 3]
+    assert {event["nb_total"] for event in progress} == {3}
+    assert progress[-1]["bases_done"] == progress[-1]["bases_total"] == 3 * 4000
+    assert progress[-1]["eta"] == 0
+    assert sorted(event["chrom"] for event in progress) == [
+        "tpg|BK006935.2|",
+        "tpg|BK006937.2|",
+        "tpg|BK006940.2|",
+    ]
@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+
+from . import test_dir
+
+import telofinder.telofinder as tf
+from telofinder.fasta import iter_seq_ends
+
+pysam = pytest.importorskip("pysam")
+
+filename = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+
+
+@pytest.fixture(scope="module")
+def bam_file(tmp_path_factory):
+    """Reads of the first 2 kb of each end of the chromosomes"""
+    seqs = list(iter_seq_ends(filename, 2000))
+    header = {
+        "HD": {"VN": "1.6", "SO": "coordinate"},
+        "SQ": [{"SN": seq.name, "LN": seq.length} for seq in seqs],
+    }
+    bam_path = tmp_path_factory.mktemp("bam") / "reads.bam"
+    with pysam.AlignmentFile(bam_path, "wb", header=header) as bam:
+        for ref_id, seq in enumerate(seqs):
+            for i, (start, bases) in enumerate(
+                [(0, seq.left), (seq.length - len(seq.right), seq.right)]
+            ):
+                for mapq in [60, 0]:
+                    read = pysam.AlignedSegment(bam.header)
+                    read.query_name = f"{seq.name}_{i}_{mapq}"
+                    read.query_sequence = bases.tobytes().decode()
+                    read.reference_id = ref_id
+                    read.reference_start = start
+                    read.mapping_quality = mapq
+                    read.cigarstring = f"{len(bases)}M"
+                    bam.write(read)
+    pysam.index(str(bam_path))
+    return bam_path
+
+
+def test_get_telomeric_reads(tmp_path, bam_file):
+    telo_df_merged = tf.run_on_single_fasta(filename, 0.8, 0.8, 8000, 1)[2]
+    reads_df = tf.get_telomeric_reads(
+        bam_file, telo_df_merged, tmp_path / "reads", threads=2
+    )
+    assert (tmp_path / "reads" / "telomeric_reads.csv").exists()
+    # reads with a null mapping quality are skipped
+    assert not reads_df.chrom.str.endswith("_0").any()
+    # the reads of the chromosome ends hold the terminal telomeres
+    term_df = reads_df[(reads_df.type == "term") & reads_df.start.notna()]
+    left_df = term_df[term_df.chrom == "tpg|BK006937.2|_0_60"]
+    assert left_df[["start", "end"]].values.tolist() == [[1, 364]]
+    right_df = term_df[term_df.chrom == "tpg|BK006937.2|_1_60"]
+    assert right_df[["end", "len"]].values.tolist() == [[2000, 105]]
+
+
+def test_get_telomeric_reads_duplicate_intervals(tmp_path, bam_file):
+    telo_df_merged = tf.run_on_single_fasta(filename, 0.8, 0.8, 8000, 1)[2]
+    reads_df = tf.get_telomeric_reads(bam_file, telo_df_merged, tmp_path / "reads")
+    dup_df = tf.get_telomeric_reads(
+        bam_file,
+        pd.concat([telo_df_merged, telo_df_merged]),
+        tmp_path / "dup_reads",
+    )
+    # each interval is fetched and scored once
+    assert len(dup_df) == len(reads_df)
+    assert sorted(path.name for path in (tmp_path / "dup_reads").iterdir()) == sorted(
+        path.name for path in (tmp_path / "reads").iterdir()
+    )
+
+
+def test_get_telomeric_reads_bam(tmp_path, bam_file):
+    telo_df_merged = tf.run_on_single_fasta(filename, 0.8, 0.8, 8000, 1)[2]
+    outdir = tmp_path / "reads"
+    reads_df = tf.get_telomeric_reads(
+        bam_file, telo_df_merged, outdir, reads_format="bam", fasta=True
+    )
+    assert sorted(path.name for path in outdir.iterdir()) == [
+        "telomeric_reads.bam",
+        "telomeric_reads.bam.bai",
+        "telomeric_reads.csv",
+        "telomeric_reads.fasta",
+    ]
+    with pysam.AlignmentFile(outdir / "telomeric_reads.bam") as bam, pysam.AlignmentFile(bam_file) as src:
+        assert bam.header.to_dict()["SQ"] == src.header.to_dict()["SQ"]
+        assert bam.check_index()
+        reads = list(bam)
+    coords = [(read.reference_id, read.reference_start) for read in reads]
+    assert coords == sorted(coords)
+    assert sorted(read.get_tag("ZI") for read in reads) == sorted(
+        f"{chrom}_{start}_{end}"
+        for chrom, start, end in reads_df[["interval_chrom", "interval_start", "interval_end"]]
+        .drop_duplicates()
+        .itertuples(index=False)
+    )
+    fasta_lines = (outdir / "telomeric_reads.fasta").read_text().splitlines()
+    assert len(fasta_lines) == 2 * len(reads)
@@ -1,9 +1,243 @@
 from . import test_dir
 
+import argparse
+import gzip
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
 import telofinder.telofinder as tf
+from telofinder.main import parse_arguments, parse_chunk_size, parse_stop_after
+from telofinder.motifs import MOTIF_SETS
 
 filename = f"{test_dir}/data/AFH_chrI.fasta"
 
 
 def test_run_on_single_fasta():
     df = tf.run_on_single_fasta(filename, 0.8, 0.8, 8000, 1)
+
+
+def test_get_strain_name():
+    assert tf.get_strain_name("data/AFH_chrI.fasta") == "AFH_chrI"
+    assert tf.get_strain_name("data/AFH_chrI.fa.gz") == "AFH_chrI"
+    assert tf.get_strain_name("data/AFH_chrI.fa.bgz") == "AFH_chrI"
+    assert tf.get_strain_name("-") == "stdin"
+
+
+def test_compute_window_metrics():
+    sequence = "CCACACCACACCCACACACCCACACACCNNacgtTTAGGGTTAGGGATGCATGCAAAA" * 3
+    metrics = tf.compute_window_metrics(sequence)
+    for i, window in tf.sliding_window(sequence, 0, len(sequence), 20):
+        expected = tf.compute_metrics(window)
+        assert abs(metrics["entropy"][i] - expected["entropy"]) < 1e-9
+        assert abs(metrics["polynuc"][i] - expected["polynuc"]) < 1e-9
+
+
+def test_get_raw_df():
+    metrics = tf.compute_window_metrics("CACCACACCCACACACCACACCCACACAATGC")
+    pos = np.arange(len(metrics["entropy"]))
+    raw_df = tf.get_raw_df("strain", "chrom", pos, pos[::-1], metrics, metrics, 0.8, 0.8)
+    assert list(raw_df.columns) == ["entropy", "polynuc", "predict_telom"]
+    assert (raw_df.dtypes == np.float32).all()
+    assert raw_df.reset_index().level_2.dtype == np.int32
+    assert raw_df.predict_telom.sum() == 2 * ((metrics["entropy"] < 0.8) & (metrics["polynuc"] > 0.8)).sum()
+
+
+def test_scratch_transport(tmp_path):
+    seq = next(tf.iter_fasta(filename, -1))
+    expected = tf.run_on_single_seq(seq, "AFH_chrI", 0.8, 0.8, -1)
+    task = (0, 0, seq, "AFH_chrI")
+    _, _, (raw_arrays, calls, _), _ = tf.run_seq_task(
+        task, 0.8, 0.8, -1, scratch_dir=tmp_path
+    )
+    assert raw_arrays.nb_W + raw_arrays.nb_C == len(expected[0])
+    raw_df = tf.get_scratch_raw_df("AFH_chrI", seq.name, seq.length, raw_arrays)
+    pd.testing.assert_frame_equal(raw_df, expected[0])
+    assert list(tmp_path.iterdir()) == []
+    pd.testing.assert_frame_equal(tf.get_calls_df(calls), expected[1])
+
+
+def test_run_on_fasta_dir(tmp_path):
+    for name in ["AFH_chrI.fasta", "S288C_chr01_03_06.fasta"]:
+        shutil.copy(f"{test_dir}/data/{name}", tmp_path)
+    results = tf.run_on_fasta_dir(tmp_path, 0.8, 0.8, 8000, 2)
+    expected = [
+        tf.run_on_single_fasta(fasta_path, 0.8, 0.8, 8000, 1)
+        for fasta_path in tf.get_fasta_paths(tmp_path)
+    ]
+    for i in range(3):
+        pd.testing.assert_frame_equal(results[i], pd.concat([r[i] for r in expected]))
+
+
+def test_run_and_export(tmp_path):
+    fasta_path = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+    raw_df, telom_df, merged_telom_df = tf.run_on_single_fasta(fasta_path, 0.8, 0.8, 8000, 1)
+    tf.export_results(raw_df, telom_df, merged_telom_df, True, tmp_path / "expected")
+    tf.run_and_export([fasta_path], 0.8, 0.8, 8000, 2, True, tmp_path / "streamed")
+    for name in ["telom_df.csv", "merged_telom_df.csv", "telom.bed", "telom_merged.bed"]:
+        expected = (tmp_path / "expected" / name).read_text()
+        assert (tmp_path / "streamed" / name).read_text() == expected
+    # raw windows are appended in order of completion
+    expected = (tmp_path / "expected" / "raw_df.csv").read_text().splitlines()
+    streamed = (tmp_path / "streamed" / "raw_df.csv").read_text().splitlines()
+    assert streamed[0] == expected[0]
+    assert sorted(streamed) == sorted(expected)
+
+
+def test_get_consecutive_groups():
+    predict_W = np.array([1, 1, 0, 0, 1, 0, 1, 1, 1, 0], dtype=np.float32)
+    predict_C = np.array([0, 0, 0, 0, 0, 0, 0, 0, 1, 1], dtype=np.float32)
+    pos = np.arange(10)
+    metrics_W = {"entropy": 1 - predict_W, "polynuc": predict_W}
+    metrics_C = {"entropy": 1 - predict_C, "polynuc": predict_C}
+    raw_df = tf.get_raw_df("strain", "chrom", pos, 28 - pos, metrics_W, metrics_C, 0.5, 0.5)
+    assert tf.get_consecutive_groups(raw_df) == {
+        "W": [(0, 1), (4, 4), (6, 8)],
+        "C": [(19, 20)],
+    }
+    assert tf.get_consecutive_groups(raw_df.iloc[:0]) == {"W": [], "C": []}
+
+
+def test_join_chunk_groups():
+    predict = np.array([1, 1, 0, 0, 1, 1, 1, 1, 0, 1, 1], dtype=np.float32)
+    chunk_groups = [
+        tf.get_chunk_groups(
+            {strand: {"predict_telom": predict[start:end]} for strand in "WC"}, start
+        )["predict_telom"]
+        for start, end in [(0, 5), (5, 7), (7, 8), (8, 11)]
+    ]
+    assert tf.join_chunk_groups(chunk_groups) == {
+        "W": [(0, 1), (4, 7), (9, 10)],
+        "C": [(19, 20), (23, 26), (28, 29)],
+    }
+
+
+def test_scan_windows_until_gap():
+    sequence = tf.encode_sequence("CCACACCACACCCACACACCCACACACC" * 4 + "ATGCAGTCGATCGATTGCAA" * 20)
+    metrics = tf.compute_window_metrics(sequence)
+    nb_telom = ((metrics["entropy"] < 0.8) & (metrics["polynuc"] > 0.8)).sum()
+    for block_size in [1, 7, 256]:
+        scanned = tf.scan_windows_until_gap(sequence, 0.8, 0.8, 30, block_size=block_size)
+        nb_scanned = len(scanned["entropy"])
+        assert nb_scanned == nb_telom + 30
+        for metric in ["entropy", "polynuc"]:
+            assert np.array_equal(scanned[metric], metrics[metric][:nb_scanned])
+
+
+def test_run_on_single_fasta_stop_after():
+    fasta_path = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+    expected = tf.run_on_single_fasta(fasta_path, 0.8, 0.8, 20000, 1)[2]
+    merged_telom_df = tf.run_on_single_fasta(fasta_path, 0.8, 0.8, 20000, 1, stop_after=40)[2]
+    pd.testing.assert_frame_equal(
+        merged_telom_df[merged_telom_df.type == "term"].reset_index(drop=True),
+        expected[expected.type == "term"].reset_index(drop=True),
+    )
+
+
+def test_stop_after_below_zero():
+    with pytest.raises(ValueError):
+        tf.scan_windows_until_gap(tf.encode_sequence("ACGT" * 20), 0.8, 0.8, -1)
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_stop_after("-1")
+    assert parse_stop_after("0") == 0
+
+
+def test_chunked_whole_scan():
+    fasta_path = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+    expected = tf.run_on_single_fasta(fasta_path, 0.8, 0.8, -1, 2, chunk_size=None)
+    results = tf.run_on_single_fasta(fasta_path, 0.8, 0.8, -1, 3, chunk_size=50000)
+    for i in range(3):
+        pd.testing.assert_frame_equal(results[i], expected[i])
+
+
+def test_streamed_whole_scan(tmp_path):
+    fasta_path = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+    gz_path = tmp_path / "S288C_chr01_03_06.fasta.gz"
+    with open(fasta_path, "rb") as fas, gzip.open(gz_path, "wb") as gz:
+        gz.write(fas.read())
+    tasks = tf.get_seq_tasks([fasta_path, gz_path], -1)
+    assert tasks[-1] == tf.StreamedFasta(1, gz_path, "S288C_chr01_03_06")
+    assert [task[0] for task in tasks] == [0, 0, 0, 1]
+
+    expected = tf.run_on_single_fasta(fasta_path, 0.8, 0.8, -1, 2, chunk_size=None)
+    results = tf.run_on_single_fasta(gz_path, 0.8, 0.8, -1, 3, chunk_size=50000)
+    for i in range(3):
+        pd.testing.assert_frame_equal(results[i], expected[i])
+
+
+def test_chunk_size_below_one():
+    fasta_path = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+    for chunk_size in [0, -1]:
+        with pytest.raises(ValueError):
+            tf.run_on_single_fasta(fasta_path, 0.8, 0.8, -1, 2, chunk_size=chunk_size)
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_chunk_size("-1")
+    assert parse_chunk_size("0") is None
+    assert parse_chunk_size("1000") == 1000
+
+
+def test_compute_strand_metrics():
+    sequence = tf.encode_sequence("CCACACCACACCCACACACCNNacgtTTAGGGTTAGGGATGCAGGTGTGGTGTG" * 3)
+    metrics = tf.compute_strand_metrics(sequence)
+    expected_W = tf.compute_window_metrics(sequence)
+    expected_C = tf.compute_window_metrics(tf.reverse_complement_encoded(sequence))
+    for metric in ["entropy", "polynuc"]:
+        assert np.array_equal(metrics["W"][metric], expected_W[metric])
+        assert np.array_equal(metrics["C"][metric][::-1], expected_C[metric])
+
+
+def test_sweep_thresholds(tmp_path):
+    fasta_path = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+    summary, merged_df = tf.sweep_thresholds([fasta_path], [0.7, 0.8], [0.8, 0.9], 8000, 2, tmp_path)
+    assert len(summary) == 4
+    assert (tmp_path / "sweep_summary.csv").exists()
+    for polynuc_thres, entropy_thres in [(0.7, 0.9), (0.8, 0.8)]:
+        expected = tf.run_on_single_fasta(fasta_path, polynuc_thres, entropy_thres, 8000, 1)[2]
+        pair_df = merged_df[
+            (merged_df.polynuc_thres == polynuc_thres) & (merged_df.entropy_thres == entropy_thres)
+        ]
+        pd.testing.assert_frame_equal(
+            pair_df.drop(columns=["polynuc_thres", "entropy_thres"]).reset_index(drop=True),
+            expected.reset_index(drop=True),
+        )
+        row = summary[(summary.polynuc_thres == polynuc_thres) & (summary.entropy_thres == entropy_thres)]
+        nb_term_ends = len(expected[(expected.type == "term") & expected.start.notna()][["chrom", "side"]].drop_duplicates())
+        assert row.nb_term_ends.item() == nb_term_ends
+
+
+def test_sweep_motif_sets_stop_after():
+    fasta_path = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+    motif_sets = [MOTIF_SETS["yeast"], MOTIF_SETS["vertebrate"]]
+    summary, merged_df = tf.sweep_thresholds(
+        [fasta_path], [0.7, 0.8], [0.9], 20000, 2, stop_after=40, motif_sets=motif_sets
+    )
+    assert len(summary) == 4
+    assert set(summary.motif_set) == {"yeast", "vertebrate"}
+    for polynuc_thres in [0.7, 0.8]:
+        pair_sets = [
+            motif_set._replace(polynuc_thres=polynuc_thres, entropy_thres=0.9)
+            for motif_set in motif_sets
+        ]
+        expected = tf.run_on_single_fasta(
+            fasta_path, None, None, 20000, 1, stop_after=40, motif_sets=pair_sets
+        )[2]
+        pair_df = merged_df[merged_df.polynuc_thres == polynuc_thres]
+        pd.testing.assert_frame_equal(
+            pair_df.drop(columns=["polynuc_thres", "entropy_thres"]).reset_index(drop=True),
+            expected.reset_index(drop=True),
+        )
+
+
+def test_sweep_unsupported_options(monkeypatch):
+    for option in [["-r"], ["--track_store", "ts"], ["--chunk_size", "1000"], ["--profile"]]:
+        monkeypatch.setattr(
+            sys, "argv", ["telofinder", "x.fasta", "--sweep_polynuc_thresholds", "0.7", *option]
+        )
+        with pytest.raises(SystemExit):
+            parse_arguments()
+    monkeypatch.setattr(
+        sys, "argv", ["telofinder", "x.fasta", "--sweep_polynuc_thresholds", "0.7", "--stop_after", "40"]
+    )
+    assert parse_arguments().stop_after == 40
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from . import test_dir
+
+import telofinder.telofinder as tf
+from telofinder.motifs import MOTIF_SETS
+from telofinder.tracks import list_tracks, load_raw_region, write_tracks
+
+filename = f"{test_dir}/data/S288C_chr01_03_06.fasta"
+strain = "S288C_chr01_03_06"
+chrom = "tpg|BK006935.2|"
+
+
+@pytest.fixture(scope="module")
+def results():
+    return tf.run_on_single_fasta(filename, 0.8, 0.8, 2000, 1)
+
+
+def test_load_raw_region(tmp_path, results):
+    raw_df = results[0].xs(chrom, level=1, drop_level=False)
+    chrom_size = 230218
+    write_tracks(tmp_path, raw_df, chrom_size, chunk_size=300)
+
+    region_df = load_raw_region(tmp_path, strain, chrom)
+    assert (region_df.values == raw_df.values).all()
+    assert np.array_equal(
+        region_df.index.get_level_values(2), raw_df.index.get_level_values(2)
+    )
+
+    region_df = load_raw_region(tmp_path, strain, chrom, 250, 700)
+    positions = region_df.index.get_level_values(2)
+    assert positions.min() == 250 and positions.max() == 699
+    assert (region_df.values == raw_df.values[250:700]).all()
+
+    region_df = load_raw_region(tmp_path, strain, chrom, chrom_size - 1000)
+    assert (region_df.index.get_level_values(3) == "C").all()
+    assert len(region_df) == 1000
+
+    assert list_tracks(tmp_path).values.tolist() == [
+        [strain, chrom, chrom_size, 1981, 1981]
+    ]
+
+
+def test_run_on_track_store(tmp_path, results):
+    tf.run_on_single_fasta(filename, 0.8, 0.8, 2000, 2, track_store=tmp_path)
+    assert len(list_tracks(tmp_path)) == 3
+
+    telo_df, telo_df_merged = tf.run_on_track_store(tmp_path, 0.8, 0.8)
+    assert telo_df.equals(results[1])
+    assert telo_df_merged.equals(results[2])
+
+
+def test_run_on_track_store_motif_sets(tmp_path):
+    motif_sets = [MOTIF_SETS["yeast"], MOTIF_SETS["vertebrate"]]
+    _, expected, expected_merged = tf.run_on_single_fasta(
+        filename, 0.8, 0.8, 2000, 2, motif_sets=motif_sets, track_store=tmp_path
+    )
+    telo_df, telo_df_merged = tf.run_on_track_store(tmp_path, 0.5, 0.5)
+    pd.testing.assert_frame_equal(telo_df, expected)
+    pd.testing.assert_frame_equal(telo_df_merged, expected_merged)
+
+    region_df = load_raw_region(tmp_path, strain, chrom, 0, 100)
+    assert list(region_df.columns) == tf.get_raw_columns(motif_sets)